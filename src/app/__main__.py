@@ -9,14 +9,17 @@ def _find_open_port() -> int:
         return s.getsockname()[1]
 
 
-port = _find_open_port()
-print(f"PORT={port}", flush=True)
+def _serve(port: int) -> None:
+    """Import the app (routers, DB, ML wrappers) and run uvicorn on *port*."""
+    import uvicorn
 
-import uvicorn  # noqa: E402
+    from app import paths
+    from app.main import app
 
-from app import paths  # noqa: E402
-from app.main import app  # noqa: E402
+    paths.init()
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
 
-paths.init()
 
-uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+port = _find_open_port()
+print(f"PORT={port}", flush=True)
+_serve(port)
@@ -1,18 +1,33 @@
 """Shared mappers for converting DB dicts to Pydantic models."""
 
-from app.models import FileRecord
+from app.models import (
+    AnalysisResult,
+    BextInfo,
+    ClassificationMatch,
+    FileRecord,
+    RiffInfo,
+    TechnicalInfo,
+)
 
 
 def dict_to_file_record(d: dict) -> FileRecord:
-    """Convert a repository dict to a FileRecord model."""
-    return FileRecord(
+    """Convert a repository dict to a FileRecord model.
+
+    Rows come from our own SQLite store (or the import path that feeds it),
+    so validation is skipped via ``model_construct``. Nested models are
+    constructed explicitly since ``model_construct`` does not recurse.
+    """
+    bext = d.get("bext")
+    info = d.get("info")
+    analysis = d.get("analysis")
+    return FileRecord.model_construct(
         id=d["id"],
         path=d["path"],
         filename=d["filename"],
         directory=d["directory"],
-        status=d.get("status", "unmodified"),
+        status=d.get("status") or "unmodified",
         changed_fields=d.get("changed_fields") or [],
-        technical=d["technical"],
+        technical=TechnicalInfo.model_construct(**d["technical"]),
         category=d.get("category"),
         subcategory=d.get("subcategory"),
         cat_id=d.get("cat_id"),
@@ -37,7 +52,20 @@ def dict_to_file_record(d: dict) -> FileRecord:
         source_id=d.get("source_id"),
         suggested_filename=d.get("suggested_filename"),
         custom_fields=d.get("custom_fields"),
-        bext=d.get("bext"),
-        info=d.get("info"),
-        analysis=d.get("analysis"),
+        bext=BextInfo.model_construct(**bext) if bext is not None else None,
+        info=RiffInfo.model_construct(**info) if info is not None else None,
+        analysis=_dict_to_analysis(analysis) if analysis is not None else None,
+    )
+
+
+def _dict_to_analysis(d: dict) -> AnalysisResult:
+    """Convert a stored analysis dict to an AnalysisResult without validation."""
+    return AnalysisResult.model_construct(
+        classification=[
+            ClassificationMatch.model_construct(**m)
+            for m in d.get("classification") or []
+        ],
+        caption=d.get("caption"),
+        model_version=d["model_version"],
+        analyzed_at=d["analyzed_at"],
     )
@@ -1,9 +1,17 @@
 """Async SQLite repository for file records."""
 
+import asyncio
+import itertools
 import json
 import logging
+import time
 import uuid
+from collections.abc import AsyncIterator, Sequence
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
 from datetime import datetime, timezone
+from functools import lru_cache
+from pathlib import Path
 
 import aiosqlite
 
@@ -14,6 +22,24 @@ logger = logging.getLogger(__name__)
 _db: aiosqlite.Connection | None = None
 _db_path: str = ""
 
+# Every request shares the one writer connection, so each write runs inside
+# write_transaction(): the lock keeps other requests from committing or
+# rolling back a transaction that is still half-written
+_write_lock: asyncio.Lock | None = None
+# Set while the current task holds the write transaction (nested use joins it)
+_in_write_transaction: ContextVar[bool] = ContextVar(
+    "_in_write_transaction", default=False
+)
+
+# (unix second, formatted "YYYY-MM-DDTHH:MM:SS") last used by _now_iso()
+_iso_second_cache: tuple[int, str] = (-1, "")
+
+# Read-only connections for SELECTs (file-backed DBs only — WAL lets them
+# run alongside the single writer connection)
+_READER_COUNT = 4
+_readers: list[aiosqlite.Connection] = []
+_reader_cycle: itertools.cycle | None = None
+
 # Columns that store JSON
 _JSON_COLS = {
     "technical",
@@ -24,6 +50,11 @@ _JSON_COLS = {
     "analysis",
 }
 
+# Bound codec methods for JSON columns — skips json.dumps/json.loads argument
+# handling per call, and compact separators keep stored blobs small.
+_json_encode = json.JSONEncoder(separators=(",", ":")).encode
+_json_decode = json.JSONDecoder().decode
+
 # All 22 nullable metadata field column names
 _META_COLS = [
     "category",
@@ -83,14 +114,94 @@ _UPDATABLE_COLS = {
     "analysis",
 }
 
+# Every column of the files table, for validating projected SELECTs
+_FILE_COLUMNS = {"id", "imported_at", "modified_at", *_UPDATABLE_COLS}
+
+# Positions of JSON columns within the _INSERT_SQL parameters (after id)
+_INSERT_JSON_PARAMS = tuple(
+    i for i, col in enumerate(_INSERT_COLS, start=1) if col in _JSON_COLS
+)
+
+# Prebuilt SQL for the fixed-shape statements
+_INSERT_SQL = (
+    f"INSERT INTO files (id, {', '.join(_INSERT_COLS)}, imported_at, modified_at) "
+    f"VALUES ({', '.join(['?'] * (len(_INSERT_COLS) + 3))})"
+)
+# path is the conflict key; id and imported_at keep their original values
+_UPSERT_MANY_SQL = (
+    _INSERT_SQL
+    + " ON CONFLICT(path) DO UPDATE SET "
+    + ", ".join(f"{col} = excluded.{col}" for col in _INSERT_COLS if col != "path")
+    + ", modified_at = excluded.modified_at"
+)
+# executemany() cannot return rows, so only the single-row form has RETURNING
+_UPSERT_SQL = _UPSERT_MANY_SQL + " RETURNING id"
+
+# Rows fetched per round trip when streaming query results
+_FETCH_BATCH_SIZE = 100
+
+# Max paths per DELETE ... IN (...) statement
+_DELETE_CHUNK_SIZE = 500
+
+# Max IDs/paths per files SELECT ... IN (...) statement
+_ID_LOOKUP_CHUNK_SIZE = 500
+
+# Max hashes per analysis-cache SELECT ... IN (...) statement
+_CACHE_LOOKUP_CHUNK_SIZE = 500
+
+# Per-connection tuning: WAL lets readers run alongside the writer and,
+# with synchronous=NORMAL, avoids an fsync on every commit.
+_CONNECTION_PRAGMAS = """
+PRAGMA journal_mode=WAL;
+PRAGMA synchronous=NORMAL;
+PRAGMA temp_store=MEMORY;
+PRAGMA cache_size=-65536;
+PRAGMA mmap_size=268435456;
+PRAGMA busy_timeout=5000;
+"""
+
+_READER_PRAGMAS = """
+PRAGMA cache_size=-16384;
+PRAGMA mmap_size=268435456;
+PRAGMA busy_timeout=5000;
+"""
+
+
+@lru_cache(maxsize=128)
+def _update_sql(cols: tuple[str, ...], returning: bool = False) -> str:
+    """Build (and cache) a partial UPDATE statement for the given columns.
+
+    With returning, the statement also yields the updated row.
+    """
+    sets = [f"{col} = ?" for col in cols]
+    sets.append("modified_at = ?")
+    sql = f"UPDATE files SET {', '.join(sets)} WHERE id = ?"
+    return sql + " RETURNING *" if returning else sql
+
 
 async def connect(db_path: str) -> None:
     """Open DB connection and initialize schema."""
-    global _db, _db_path
+    global _db, _db_path, _write_lock
     _db_path = db_path
+    _write_lock = asyncio.Lock()
     _db = await aiosqlite.connect(db_path)
     _db.row_factory = aiosqlite.Row
+    await _db.executescript(_CONNECTION_PRAGMAS)
     await init_db(_db)
+    if db_path != ":memory:":
+        await _open_readers(db_path)
+
+
+async def _open_readers(db_path: str) -> None:
+    """Open the read-only connection pool used by SELECT queries."""
+    global _reader_cycle
+    uri = Path(db_path).resolve().as_uri() + "?mode=ro"
+    for _ in range(_READER_COUNT):
+        reader = await aiosqlite.connect(uri, uri=True)
+        reader.row_factory = aiosqlite.Row
+        await reader.executescript(_READER_PRAGMAS)
+        _readers.append(reader)
+    _reader_cycle = itertools.cycle(_readers)
 
 
 def get_db_path() -> str:
@@ -100,7 +211,11 @@ def get_db_path() -> str:
 
 async def close() -> None:
     """Close DB connection."""
-    global _db
+    global _db, _reader_cycle
+    for reader in _readers:
+        await reader.close()
+    _readers.clear()
+    _reader_cycle = None
     if _db is not None:
         await _db.close()
         _db = None
@@ -113,39 +228,184 @@ def get_db() -> aiosqlite.Connection:
     return _db
 
 
+def _get_reader() -> aiosqlite.Connection:
+    """Return the next read-only connection, or the writer if there is no pool."""
+    if _reader_cycle is None:
+        return get_db()
+    return next(_reader_cycle)
+
+
+@asynccontextmanager
+async def write_transaction() -> AsyncIterator[aiosqlite.Connection]:
+    """Run the enclosed writes as one transaction on the writer connection.
+
+    Commits on exit and rolls back on error. Writes made inside it, including
+    the write functions below, join the transaction rather than committing.
+    """
+    db = get_db()
+    if _in_write_transaction.get():
+        yield db
+        return
+    async with _write_lock:
+        token = _in_write_transaction.set(True)
+        try:
+            yield db
+        except BaseException:
+            await db.rollback()
+            raise
+        else:
+            await db.commit()
+        finally:
+            _in_write_transaction.reset(token)
+
+
+@asynccontextmanager
+async def bulk_import_mode() -> AsyncIterator[None]:
+    """Skip fsyncs on the writer connection for the duration of a bulk import.
+
+    WAL stays on so the reader pool keeps working; only synchronous is relaxed
+    (an OS crash mid-import can lose the tail of the import, which is safe to
+    re-run).
+    """
+    async with write_transaction() as db:
+        await db.execute("PRAGMA synchronous=OFF")
+    try:
+        yield
+    finally:
+        async with write_transaction() as db:
+            await db.execute("PRAGMA synchronous=NORMAL")
+
+
 async def insert_file(record: dict) -> str:
     """Insert a new file record. Returns the generated UUID."""
-    db = get_db()
     file_id = str(uuid.uuid4())
-    now = datetime.now(timezone.utc).isoformat()
+    now = _now_iso()
 
-    values = [file_id]
-    for col in _INSERT_COLS:
-        values.append(_serialize(col, record.get(col)))
-    values.extend([now, now])
+    async with write_transaction() as db:
+        await db.execute(_INSERT_SQL, _insert_params(file_id, record, now))
+    return file_id
 
-    placeholders = ", ".join(["?"] * len(values))
-    cols = "id, " + ", ".join(_INSERT_COLS) + ", imported_at, modified_at"
 
-    await db.execute(f"INSERT INTO files ({cols}) VALUES ({placeholders})", values)
-    await db.commit()
-    return file_id
+async def insert_files_many(records: list[dict]) -> list[str]:
+    """Insert many new file records in one transaction. Returns UUIDs in order."""
+    if not records:
+        return []
+    now = _now_iso()
+    file_ids = [str(uuid.uuid4()) for _ in records]
+    values_list = [
+        _insert_params(file_id, record, now)
+        for file_id, record in zip(file_ids, records)
+    ]
+
+    async with write_transaction() as db:
+        await db.executemany(_INSERT_SQL, values_list)
+    return file_ids
+
+
+async def upsert_files_many(records: list[dict]) -> list[str]:
+    """Insert or replace many file records (matched on path) in one transaction.
+
+    Returns IDs in order; a path that already exists, or repeats within
+    records, keeps a single row and ID.
+    """
+    if not records:
+        return []
+    now = _now_iso()
+    values_list = [_insert_params(str(uuid.uuid4()), record, now) for record in records]
+    paths = list(dict.fromkeys(record["path"] for record in records))
+
+    # Held for the read-back too, so no other write can commit, roll back or
+    # delete these rows between the statements
+    id_by_path: dict[str, str] = {}
+    async with write_transaction() as db:
+        await db.executemany(_UPSERT_MANY_SQL, values_list)
+        # New rows keep the generated UUID, conflicting ones the existing row's
+        for start in range(0, len(paths), _ID_LOOKUP_CHUNK_SIZE):
+            chunk = paths[start : start + _ID_LOOKUP_CHUNK_SIZE]
+            placeholders = ", ".join(["?"] * len(chunk))
+            rows = await db.execute_fetchall(
+                f"SELECT path, id FROM files WHERE path IN ({placeholders})", chunk
+            )
+            id_by_path.update((row[0], row[1]) for row in rows)
+    return [id_by_path[record["path"]] for record in records]
 
 
 async def get_file(file_id: str) -> dict | None:
     """Get a file record by ID."""
-    db = get_db()
+    db = _get_reader()
     cursor = await db.execute("SELECT * FROM files WHERE id = ?", (file_id,))
     row = await cursor.fetchone()
-    return _row_to_dict(row) if row else None
+    return _row_to_dict(row, _row_layout(cursor)) if row else None
+
+
+async def get_files_by_ids(
+    file_ids: list[str], *, columns: Sequence[str] | None = None
+) -> list[dict]:
+    """Get file records for many IDs, in request order.
+
+    Unknown IDs are skipped. columns limits the fields loaded (``id`` is
+    always included).
+    """
+    db = _get_reader()
+    select = _select_list(columns, required=("id",))
+    unique = list(dict.fromkeys(file_ids))
+    by_id: dict[str, dict] = {}
+    for start in range(0, len(unique), _ID_LOOKUP_CHUNK_SIZE):
+        chunk = unique[start : start + _ID_LOOKUP_CHUNK_SIZE]
+        placeholders = ", ".join(["?"] * len(chunk))
+        cursor = await db.execute(
+            f"SELECT {select} FROM files WHERE id IN ({placeholders})", chunk
+        )
+        layout = _row_layout(cursor)
+        for row in await cursor.fetchall():
+            record = _row_to_dict(row, layout)
+            by_id[record["id"]] = record
+    return [by_id[fid] for fid in file_ids if fid in by_id]
 
 
 async def get_file_by_path(path: str) -> dict | None:
     """Get a file record by absolute path."""
-    db = get_db()
+    db = _get_reader()
     cursor = await db.execute("SELECT * FROM files WHERE path = ?", (path,))
     row = await cursor.fetchone()
-    return _row_to_dict(row) if row else None
+    return _row_to_dict(row, _row_layout(cursor)) if row else None
+
+
+async def get_files_by_paths(paths: list[str]) -> dict[str, dict]:
+    """Get file records for many absolute paths, keyed by path.
+
+    Paths without a record are absent from the returned dict.
+    """
+    db = _get_reader()
+    unique = list(dict.fromkeys(paths))
+    results: dict[str, dict] = {}
+    for start in range(0, len(unique), _ID_LOOKUP_CHUNK_SIZE):
+        chunk = unique[start : start + _ID_LOOKUP_CHUNK_SIZE]
+        placeholders = ", ".join(["?"] * len(chunk))
+        cursor = await db.execute(
+            f"SELECT * FROM files WHERE path IN ({placeholders})", chunk
+        )
+        layout = _row_layout(cursor)
+        for row in await cursor.fetchall():
+            record = _row_to_dict(row, layout)
+            results[record["path"]] = record
+    return results
+
+
+async def get_paths_under(prefix: str) -> list[str]:
+    """Paths of all records starting with *prefix* (e.g. a directory + sep).
+
+    Matched as a half-open range on path, so the lookup stays on the path
+    index and, unlike LIKE, treats %/_ literally and is case-sensitive.
+    """
+    if not prefix:
+        raise ValueError("prefix must not be empty")
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    db = _get_reader()
+    cursor = await db.execute(
+        "SELECT path FROM files WHERE path >= ? AND path < ?", (prefix, upper)
+    )
+    return [row[0] for row in await cursor.fetchall()]
 
 
 async def get_all_files(
@@ -155,9 +415,37 @@ async def get_all_files(
     search: str | None = None,
     offset: int = 0,
     limit: int = 1000,
+    columns: Sequence[str] | None = None,
 ) -> list[dict]:
-    """Query file records with optional filters."""
-    db = get_db()
+    """Query file records with optional filters.
+
+    columns limits the fields loaded; the default loads every column.
+    """
+    return [
+        row
+        async for row in iter_files(
+            status=status,
+            category=category,
+            search=search,
+            offset=offset,
+            limit=limit,
+            columns=columns,
+        )
+    ]
+
+
+async def iter_files(
+    *,
+    status: str | None = None,
+    category: str | None = None,
+    search: str | None = None,
+    offset: int = 0,
+    limit: int = 1000,
+    columns: Sequence[str] | None = None,
+) -> AsyncIterator[dict]:
+    """Like get_all_files(), but yields rows as they are fetched in batches."""
+    db = _get_reader()
+    select = _select_list(columns, table="files")
     where_clauses: list[str] = []
     params: list[str | int] = []
 
@@ -167,49 +455,40 @@ async def get_all_files(
     if category is not None:
         where_clauses.append("category = ?")
         params.append(category)
-    if search is not None:
-        like = f"%{search}%"
-        where_clauses.append(
-            "(filename LIKE ? OR fx_name LIKE ? OR description LIKE ? OR keywords LIKE ?)"
+    fts_query = _fts_query(search) if search is not None else None
+
+    sql = f"SELECT {select} FROM files"
+    if fts_query:
+        # Resolve matches via the FTS index first, then join back to files
+        sql = (
+            "WITH m AS (SELECT rowid FROM files_fts WHERE files_fts MATCH ?) "
+            f"SELECT {select} FROM files JOIN m ON files.rowid = m.rowid"
         )
-        params.extend([like, like, like, like])
-
-    sql = "SELECT * FROM files"
+        params.insert(0, fts_query)
     if where_clauses:
         sql += " WHERE " + " AND ".join(where_clauses)
     sql += " ORDER BY path"
     sql += f" LIMIT {limit} OFFSET {offset}"
 
     cursor = await db.execute(sql, params)
-    rows = await cursor.fetchall()
-    return [_row_to_dict(row) for row in rows]
+    layout = _row_layout(cursor)
+    try:
+        while rows := await cursor.fetchmany(_FETCH_BATCH_SIZE):
+            for row in rows:
+                yield _row_to_dict(row, layout)
+    finally:
+        await cursor.close()
 
 
 async def upsert_file(record: dict) -> str:
     """Insert or replace a file record (matched on path). Returns ID."""
-    db = get_db()
-    now = datetime.now(timezone.utc).isoformat()
-
-    # Check if record already exists
-    existing = await get_file_by_path(record["path"])
-    if existing is not None:
-        file_id = existing["id"]
-        sets = []
-        values = []
-        for col in _INSERT_COLS:
-            if col == "path":
-                continue  # path is the match key
-            sets.append(f"{col} = ?")
-            values.append(_serialize(col, record.get(col)))
-        sets.append("modified_at = ?")
-        values.append(now)
-        values.append(file_id)
-
-        await db.execute(f"UPDATE files SET {', '.join(sets)} WHERE id = ?", values)
-        await db.commit()
-        return file_id
-
-    return await insert_file(record)
+    now = _now_iso()
+
+    async with write_transaction() as db:
+        row = await _execute_returning(
+            db, _UPSERT_SQL, _insert_params(str(uuid.uuid4()), record, now)
+        )
+    return row["id"]
 
 
 async def update_file(file_id: str, updates: dict) -> None:
@@ -217,58 +496,177 @@ async def update_file(file_id: str, updates: dict) -> None:
 
     Raises ValueError if any key not in _UPDATABLE_COLS.
     """
+    values = _update_params(file_id, updates)
+    async with write_transaction() as db:
+        await db.execute(_update_sql(tuple(updates)), values)
+
+
+async def update_file_returning(file_id: str, updates: dict) -> dict | None:
+    """update_file(), then return the updated record (None if no such ID).
+
+    One UPDATE ... RETURNING statement on the writer connection instead of
+    an update followed by a get_file() round trip.
+    """
+    values = _update_params(file_id, updates)
+    async with write_transaction() as db:
+        return await _execute_returning(db, _update_sql(tuple(updates), True), values)
+
+
+async def update_files_returning(updates: list[tuple[str, dict]]) -> list[dict]:
+    """Apply many (file_id, updates) pairs in one transaction.
+
+    Returns the updated records in input order; unknown IDs are skipped.
+    """
+    params = [
+        (_update_sql(tuple(u), True), _update_params(fid, u)) for fid, u in updates
+    ]
+    records: list[dict] = []
+    async with write_transaction() as db:
+        for sql, values in params:
+            record = await _execute_returning(db, sql, values)
+            if record is not None:
+                records.append(record)
+    return records
+
+
+async def _execute_returning(
+    db: aiosqlite.Connection, sql: str, params: list
+) -> dict | None:
+    """Run a single-row ... RETURNING statement; return the row as a dict.
+
+    execute_fetchall steps the statement to completion in one call on the
+    connection thread. With fetchone() it could still be in progress when a
+    concurrent request commits, which SQLite rejects.
+    """
+    rows = await db.execute_fetchall(sql, params)
+    if not rows:
+        return None
+    return _row_to_dict(rows[0], _columns_layout(tuple(rows[0].keys())))
+
+
+def _update_params(file_id: str, updates: dict) -> list:
+    """Validate update keys; return the parameters for _update_sql()."""
     bad_keys = set(updates) - _UPDATABLE_COLS
     if bad_keys:
         raise ValueError(f"Invalid columns for update: {bad_keys}")
-
-    db = get_db()
-    now = datetime.now(timezone.utc).isoformat()
-
-    sets = []
-    values = []
-    for col, val in updates.items():
-        sets.append(f"{col} = ?")
-        values.append(_serialize(col, val))
-    sets.append("modified_at = ?")
-    values.append(now)
+    values = [_serialize(col, val) for col, val in updates.items()]
+    values.append(_now_iso())
     values.append(file_id)
-
-    await db.execute(f"UPDATE files SET {', '.join(sets)} WHERE id = ?", values)
-    await db.commit()
+    return values
 
 
 async def delete_files_by_paths(paths: list[str]) -> None:
-    """Delete records by path list."""
+    """Delete records by path list.
+
+    Paths are deleted in chunks (keeping each statement under SQLite's bound
+    parameter limit) inside a single transaction.
+    """
     if not paths:
         return
-    db = get_db()
-    placeholders = ", ".join(["?"] * len(paths))
-    await db.execute(f"DELETE FROM files WHERE path IN ({placeholders})", paths)
-    await db.commit()
+    async with write_transaction() as db:
+        for start in range(0, len(paths), _DELETE_CHUNK_SIZE):
+            chunk = paths[start : start + _DELETE_CHUNK_SIZE]
+            placeholders = ", ".join(["?"] * len(chunk))
+            await db.execute(f"DELETE FROM files WHERE path IN ({placeholders})", chunk)
 
 
 async def count_files() -> int:
     """Return total number of file records."""
-    db = get_db()
+    db = _get_reader()
     cursor = await db.execute("SELECT COUNT(*) FROM files")
     row = await cursor.fetchone()
     return row[0]
 
 
+def _now_iso() -> str:
+    """Current UTC time, formatted exactly like datetime.now(utc).isoformat().
+
+    The date/time part is formatted once per second; later calls in the same
+    second only append the microseconds.
+    """
+    global _iso_second_cache
+    second, micros = divmod(time.time_ns() // 1000, 1_000_000)
+    cached_second, prefix = _iso_second_cache
+    if second != cached_second:
+        prefix = datetime.fromtimestamp(second, timezone.utc).strftime(
+            "%Y-%m-%dT%H:%M:%S"
+        )
+        _iso_second_cache = (second, prefix)
+    if micros:
+        return f"{prefix}.{micros:06d}+00:00"
+    return f"{prefix}+00:00"
+
+
+def _fts_query(search: str) -> str:
+    """Turn free text into an FTS5 query: every term must match as a prefix."""
+    terms = search.split()
+    return " ".join('"' + term.replace('"', '""') + '"*' for term in terms)
+
+
+def _insert_params(file_id: str, record: dict, now: str) -> list:
+    """Build the bound parameters for _INSERT_SQL / _UPSERT_SQL from a record."""
+    params = [file_id, *map(record.get, _INSERT_COLS), now, now]
+    for i in _INSERT_JSON_PARAMS:
+        if params[i] is not None:
+            params[i] = _json_encode(params[i])
+    return params
+
+
 def _serialize(col: str, value) -> str | None:
     """Serialize a value for storage. JSON-encode dicts."""
     if col in _JSON_COLS and value is not None:
-        return json.dumps(value)
+        return _json_encode(value)
     return value
 
 
-def _row_to_dict(row: aiosqlite.Row) -> dict:
-    """Convert an aiosqlite.Row to a plain dict, deserializing JSON columns."""
-    d = dict(row)
-    for col in _JSON_COLS:
-        if d.get(col) is not None:
-            d[col] = json.loads(d[col])
-    return d
+# (column names, positions of JSON columns) for one result-set shape
+_RowLayout = tuple[tuple[str, ...], tuple[int, ...]]
+
+
+def _select_list(
+    columns: Sequence[str] | None,
+    *,
+    table: str | None = None,
+    required: tuple[str, ...] = (),
+) -> str:
+    """Build a SELECT list for *columns* (all columns when None).
+
+    Column names come from code, never from requests, but are still checked
+    against the files schema before being interpolated.
+    """
+    prefix = f"{table}." if table else ""
+    if columns is None:
+        return f"{prefix}*"
+    names = list(dict.fromkeys((*required, *columns)))
+    unknown = set(names) - _FILE_COLUMNS
+    if unknown:
+        raise ValueError(f"Unknown file columns: {sorted(unknown)}")
+    return ", ".join(prefix + name for name in names)
+
+
+def _row_layout(cursor: aiosqlite.Cursor) -> _RowLayout:
+    """Return (column names, JSON column positions) for a cursor's result set."""
+    return _columns_layout(tuple(d[0] for d in cursor.description))
+
+
+@lru_cache(maxsize=16)
+def _columns_layout(names: tuple[str, ...]) -> _RowLayout:
+    """Build (and cache) the layout for a column list — there are only a few."""
+    return names, tuple(i for i, name in enumerate(names) if name in _JSON_COLS)
+
+
+def _row_to_dict(row: aiosqlite.Row, layout: _RowLayout) -> dict:
+    """Convert a row to a plain dict, deserializing JSON columns.
+
+    Values are decoded positionally and zipped with the cached column names,
+    which avoids the Row -> dict copy plus a second pass over _JSON_COLS.
+    """
+    names, json_positions = layout
+    values = list(row)
+    for i in json_positions:
+        if values[i] is not None:
+            values[i] = _json_decode(values[i])
+    return dict(zip(names, values))
 
 
 # ---------------------------------------------------------------------------
@@ -278,7 +676,7 @@ def _row_to_dict(row: aiosqlite.Row) -> dict:
 
 async def get_cached_analysis(file_hash: str) -> dict | None:
     """Get cached analysis result by file hash."""
-    db = get_db()
+    db = _get_reader()
     cursor = await db.execute(
         "SELECT * FROM analysis_cache WHERE file_hash = ?", (file_hash,)
     )
@@ -286,26 +684,50 @@ async def get_cached_analysis(file_hash: str) -> dict | None:
     return dict(row) if row else None
 
 
+async def get_cached_analyses(
+    file_hashes: list[str], *, model_version: str | None = None
+) -> dict[str, dict]:
+    """Get cached analysis results for many file hashes, keyed by hash.
+
+    Hashes without a cached result (from model_version, when given) are
+    absent from the returned dict.
+    """
+    db = _get_reader()
+    unique = list(dict.fromkeys(file_hashes))
+    version_clause = " AND model_version = ?" if model_version is not None else ""
+    results: dict[str, dict] = {}
+    for start in range(0, len(unique), _CACHE_LOOKUP_CHUNK_SIZE):
+        chunk = unique[start : start + _CACHE_LOOKUP_CHUNK_SIZE]
+        placeholders = ", ".join(["?"] * len(chunk))
+        params = chunk if model_version is None else [*chunk, model_version]
+        cursor = await db.execute(
+            "SELECT * FROM analysis_cache "
+            f"WHERE file_hash IN ({placeholders}){version_clause}",
+            params,
+        )
+        for row in await cursor.fetchall():
+            results[row["file_hash"]] = dict(row)
+    return results
+
+
 async def store_cached_analysis(
     file_hash: str,
-    classification: str,
+    classification: str | bytes,
     caption: str | None,
     model_version: str,
 ) -> None:
     """Store or replace cached analysis result."""
-    db = get_db()
-    now = datetime.now(timezone.utc).isoformat()
-    await db.execute(
-        "INSERT OR REPLACE INTO analysis_cache "
-        "(file_hash, classification, caption, model_version, created_at) "
-        "VALUES (?, ?, ?, ?, ?)",
-        (file_hash, classification, caption, model_version, now),
-    )
-    await db.commit()
+    now = _now_iso()
+    async with write_transaction() as db:
+        await db.execute(
+            "INSERT OR REPLACE INTO analysis_cache "
+            "(file_hash, classification, caption, model_version, created_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (file_hash, classification, caption, model_version, now),
+        )
 
 
 async def clear_analysis_cache() -> None:
     """Delete all cached analysis results."""
-    db = get_db()
-    await db.execute("DELETE FROM analysis_cache")
-    await db.commit()
+    async with write_transaction() as db:
+        await db.execute("DELETE FROM analysis_cache")
@@ -46,7 +46,39 @@ CREATE TABLE IF NOT EXISTS files (
 );
 """
 
-FILES_INDEX_DDL = "CREATE INDEX IF NOT EXISTS idx_files_path ON files (path);"
+FILES_INDEX_DDL = """
+CREATE INDEX IF NOT EXISTS idx_files_path ON files (path);
+CREATE INDEX IF NOT EXISTS idx_files_status_category_path
+    ON files (status, category, path);
+CREATE INDEX IF NOT EXISTS idx_files_file_hash ON files (file_hash);
+"""
+
+# Full-text index over the searchable text columns. External-content table
+# kept in sync with `files` by triggers.
+FILES_FTS_DDL = """
+CREATE VIRTUAL TABLE IF NOT EXISTS files_fts USING fts5(
+    filename, fx_name, description, keywords,
+    content='files', content_rowid='rowid', tokenize='unicode61'
+);
+
+CREATE TRIGGER IF NOT EXISTS files_fts_ai AFTER INSERT ON files BEGIN
+    INSERT INTO files_fts (rowid, filename, fx_name, description, keywords)
+    VALUES (new.rowid, new.filename, new.fx_name, new.description, new.keywords);
+END;
+
+CREATE TRIGGER IF NOT EXISTS files_fts_ad AFTER DELETE ON files BEGIN
+    INSERT INTO files_fts (files_fts, rowid, filename, fx_name, description, keywords)
+    VALUES ('delete', old.rowid, old.filename, old.fx_name, old.description, old.keywords);
+END;
+
+CREATE TRIGGER IF NOT EXISTS files_fts_au
+AFTER UPDATE OF filename, fx_name, description, keywords ON files BEGIN
+    INSERT INTO files_fts (files_fts, rowid, filename, fx_name, description, keywords)
+    VALUES ('delete', old.rowid, old.filename, old.fx_name, old.description, old.keywords);
+    INSERT INTO files_fts (rowid, filename, fx_name, description, keywords)
+    VALUES (new.rowid, new.filename, new.fx_name, new.description, new.keywords);
+END;
+"""
 
 ANALYSIS_CACHE_DDL = """
 CREATE TABLE IF NOT EXISTS analysis_cache (
@@ -59,41 +91,48 @@ CREATE TABLE IF NOT EXISTS analysis_cache (
 """
 
 
+# Columns added after the original schema, in migration order:
+#   custom_fields — pre-2C schema
+#   analysis — pre-Phase 4 schema
+#   manufacturer, rec_type, creator_id, source_id — ASWG extended fields
+_ADDED_COLUMNS: list[tuple[str, str]] = [
+    ("custom_fields", "TEXT"),
+    ("analysis", "TEXT"),
+    ("manufacturer", "TEXT"),
+    ("rec_type", "TEXT"),
+    ("creator_id", "TEXT"),
+    ("source_id", "TEXT"),
+]
+
+
 async def init_db(db: aiosqlite.Connection) -> None:
     """Create tables and indexes, then run migrations."""
     await db.executescript(FILES_DDL + FILES_INDEX_DDL + ANALYSIS_CACHE_DDL)
     await db.commit()
-    await _migrate_custom_fields(db)
-    await _migrate_analysis_column(db)
-    await _migrate_aswg_extended_fields(db)
-
+    await _migrate_columns(db)
+    await _migrate_files_fts(db)
 
-async def _migrate_custom_fields(db: aiosqlite.Connection) -> None:
-    """Add custom_fields column if missing (migration from pre-2C schema)."""
-    cursor = await db.execute("PRAGMA table_info(files)")
-    columns = {row[1] for row in await cursor.fetchall()}
-    if "custom_fields" not in columns:
-        await db.execute("ALTER TABLE files ADD COLUMN custom_fields TEXT")
-        await db.commit()
 
-
-async def _migrate_analysis_column(db: aiosqlite.Connection) -> None:
-    """Add analysis column if missing (migration from pre-Phase 4 schema)."""
+async def _migrate_columns(db: aiosqlite.Connection) -> None:
+    """Add any missing columns from _ADDED_COLUMNS in a single pass."""
     cursor = await db.execute("PRAGMA table_info(files)")
     columns = {row[1] for row in await cursor.fetchall()}
-    if "analysis" not in columns:
-        await db.execute("ALTER TABLE files ADD COLUMN analysis TEXT")
-        await db.commit()
-
-
-_ASWG_EXTENDED_COLUMNS = ["manufacturer", "rec_type", "creator_id", "source_id"]
+    missing = [(col, typ) for col, typ in _ADDED_COLUMNS if col not in columns]
+    if not missing:
+        return
+    await db.execute("BEGIN")
+    for col, typ in missing:
+        await db.execute(f"ALTER TABLE files ADD COLUMN {col} {typ}")
+    await db.commit()
 
 
-async def _migrate_aswg_extended_fields(db: aiosqlite.Connection) -> None:
-    """Add manufacturer, rec_type, creator_id, source_id columns if missing."""
-    cursor = await db.execute("PRAGMA table_info(files)")
-    columns = {row[1] for row in await cursor.fetchall()}
-    for col in _ASWG_EXTENDED_COLUMNS:
-        if col not in columns:
-            await db.execute(f"ALTER TABLE files ADD COLUMN {col} TEXT")
+async def _migrate_files_fts(db: aiosqlite.Connection) -> None:
+    """Create the files_fts index + triggers if missing, indexing existing rows."""
+    cursor = await db.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'files_fts'"
+    )
+    exists = await cursor.fetchone() is not None
+    await db.executescript(FILES_FTS_DDL)
+    if not exists:
+        await db.execute("INSERT INTO files_fts (files_fts) VALUES ('rebuild')")
     await db.commit()
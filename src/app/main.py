@@ -2,7 +2,6 @@
 
 from contextlib import asynccontextmanager
 
-import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
@@ -59,15 +58,3 @@ async def app_error_handler(request, exc: AppError):
 @app.get("/health")
 def health() -> dict[str, str]:
     return {"status": "ok", "version": VERSION}
-
-
-if __name__ == "__main__":
-    # Prefer running via `python -m app` (__main__.py prints PORT before
-    # heavy imports).  This fallback is kept for convenience / tests.
-    import socket as _sock
-
-    with _sock.socket(_sock.AF_INET, _sock.SOCK_STREAM) as _s:
-        _s.bind(("127.0.0.1", 0))
-        _port = _s.getsockname()[1]
-    print(f"PORT={_port}", flush=True)
-    uvicorn.run(app, host="127.0.0.1", port=_port, log_level="warning")
@@ -1,11 +1,13 @@
 """Metadata reader — extracts WAV metadata into a flat dict via wavinfo."""
 
+import asyncio
 import hashlib
 import logging
 import os
-import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
+from lxml import etree
 from wavinfo import WavInfoReader
 
 logger = logging.getLogger(__name__)
@@ -83,6 +85,12 @@ METADATA_KEYS: list[str] = [
 
 _HASH_READ_SIZE = 4096
 
+# Worker pool for bulk metadata scans (created on first use). Threads rather
+# than processes: wavinfo's file reads and lxml's parser release the GIL, and
+# a process pool would need to re-import the app in every frozen-exe worker.
+_SCAN_WORKERS = os.cpu_count() or 4
+_scan_pool: ThreadPoolExecutor | None = None
+
 
 def read_metadata(path: str) -> dict[str, Any]:
     """Read all metadata from a WAV file into a flat dict.
@@ -107,16 +115,69 @@ def read_metadata(path: str) -> dict[str, Any]:
     return result
 
 
+async def read_metadata_many(paths: list[str]) -> list[dict[str, Any] | None]:
+    """Read metadata for many WAV files concurrently on the scan pool.
+
+    Results are in input order; unreadable files yield None (and are logged).
+    """
+    return await _scan_many(_read_metadata_or_none, paths)
+
+
+async def compute_file_hashes(paths: list[str]) -> list[str | None]:
+    """compute_file_hash() for many files concurrently on the scan pool.
+
+    Results are in input order; unreadable files yield None (and are logged).
+    """
+    return await _scan_many(_compute_file_hash_or_none, paths)
+
+
+async def _scan_many(func, paths: list[str]) -> list:
+    """Map *func* over *paths* on the scan pool, preserving order."""
+    global _scan_pool
+    if _scan_pool is None:
+        _scan_pool = ThreadPoolExecutor(
+            max_workers=_SCAN_WORKERS, thread_name_prefix="metadata-scan"
+        )
+    loop = asyncio.get_running_loop()
+    return await asyncio.gather(
+        *(loop.run_in_executor(_scan_pool, func, p) for p in paths)
+    )
+
+
+def _read_metadata_or_none(path: str) -> dict[str, Any] | None:
+    """read_metadata() for pool workers — logs and returns None on failure."""
+    try:
+        return read_metadata(path)
+    except Exception:
+        logger.warning("Skipping unreadable file: %s", path, exc_info=True)
+        return None
+
+
+def _compute_file_hash_or_none(path: str) -> str | None:
+    """compute_file_hash() for pool workers — logs and returns None on failure."""
+    try:
+        return compute_file_hash(path)
+    except Exception:
+        logger.warning("Skipping unreadable file: %s", path, exc_info=True)
+        return None
+
+
 def compute_file_hash(path: str) -> str:
-    """SHA-256 of first 4KB + file_size + mtime — fast cache key."""
-    stat = os.stat(path)
-    hasher = hashlib.sha256()
+    """SHA-256 of first 4KB + file_size + mtime — fast cache key.
 
-    with open(path, "rb") as f:
-        hasher.update(f.read(_HASH_READ_SIZE))
+    Uses a raw fd (fstat + one read) rather than a buffered file object.
+    The digest must stay stable: it keys analysis_cache and detects
+    external modification on save.
+    """
+    fd = os.open(path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+    try:
+        stat = os.fstat(fd)
+        head = os.read(fd, _HASH_READ_SIZE)
+    finally:
+        os.close(fd)
 
-    hasher.update(str(stat.st_size).encode())
-    hasher.update(str(stat.st_mtime).encode())
+    hasher = hashlib.sha256(head)
+    hasher.update(f"{stat.st_size}{stat.st_mtime}".encode())
     return hasher.hexdigest()
 
 
@@ -200,24 +261,18 @@ def _extract_ixml_fields(info: WavInfoReader) -> dict[str, str]:
     # ASWG first (lower priority)
     aswg_el = root.find("ASWG")
     if aswg_el is not None:
-        for xml_tag, dict_key in _ASWG_TAG_TO_KEY.items():
-            el = aswg_el.find(xml_tag)
-            if el is not None and el.text:
-                fields[dict_key] = el.text
+        _apply_tag_map(_first_texts(aswg_el), _ASWG_TAG_TO_KEY, fields)
 
     # USER second (higher priority — overwrites ASWG)
     user_el = root.find("USER")
     if user_el is not None:
-        for xml_tag, dict_key in _USER_TAG_TO_KEY.items():
-            el = user_el.find(xml_tag)
-            if el is not None and el.text:
-                fields[dict_key] = el.text
+        texts = _first_texts(user_el)
+        _apply_tag_map(texts, _USER_TAG_TO_KEY, fields)
 
         # Collect unknown USER tags into custom_fields
-        known_tags = set(_USER_TAG_TO_KEY.keys()) | {"EMBEDDER"}
         custom: dict[str, str] = {}
-        for child in user_el:
-            if child.tag not in known_tags and child.text:
+        for child in user_el.iterchildren(tag=etree.Element):
+            if child.tag not in _USER_KNOWN_TAGS and child.text:
                 custom[child.tag] = child.text
         if custom:
             fields["custom_fields"] = custom
@@ -225,25 +280,42 @@ def _extract_ixml_fields(info: WavInfoReader) -> dict[str, str]:
     return fields
 
 
-def _parse_ixml(info: WavInfoReader) -> ET.Element | None:
-    """Parse the raw iXML source string into an ElementTree root."""
-    if info.ixml is None:
-        return None
+# Built-in USER tags (everything else is a custom field)
+_USER_KNOWN_TAGS = frozenset(_USER_TAG_TO_KEY) | {"EMBEDDER"}
 
-    source = getattr(info.ixml, "source", None)
-    if not source:
-        return None
 
-    if isinstance(source, bytes):
-        source = source.decode("utf-8", errors="replace")
+def _first_texts(block: etree._Element) -> dict[str, str | None]:
+    """Map each child tag to the text of its first occurrence (one pass)."""
+    texts: dict[str, str | None] = {}
+    for child in block.iterchildren(tag=etree.Element):
+        texts.setdefault(child.tag, child.text)
+    return texts
 
-    source = source.rstrip("\x00").strip()
-    try:
-        return ET.fromstring(source)
-    except ET.ParseError:
-        logger.warning("Failed to parse iXML source")
+
+def _apply_tag_map(
+    texts: dict[str, str | None], tag_to_key: dict[str, str], fields: dict
+) -> None:
+    """Copy non-empty texts into fields, in tag_to_key order (later wins)."""
+    for xml_tag, dict_key in tag_to_key.items():
+        text = texts.get(xml_tag)
+        if text:
+            fields[dict_key] = text
+
+
+def _parse_ixml(info: WavInfoReader) -> etree._Element | None:
+    """Return the iXML root element.
+
+    wavinfo already parses the chunk with lxml (in recover mode), so the
+    tree is reused rather than re-parsing the raw source.
+    """
+    if info.ixml is None:
         return None
 
+    root = info.ixml.parsed.getroot()
+    if root is None:
+        logger.warning("Failed to parse iXML source")
+    return root
+
 
 def _clean_str(value: Any) -> str | None:
     """Strip null bytes and whitespace from a string value."""
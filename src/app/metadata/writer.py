@@ -21,12 +21,13 @@ Usage:
     })
 """
 
+import mmap
 import os
 import struct
-import tempfile
-import xml.etree.ElementTree as ET
 from datetime import datetime
-from io import BytesIO
+from functools import lru_cache
+
+from lxml import etree
 
 # ---------------------------------------------------------------------------
 # Constants
@@ -38,7 +39,19 @@ CHUNK_BEXT = b"bext"
 CHUNK_IXML = b"iXML"
 CHUNK_LIST = b"LIST"
 LIST_TYPE_INFO = b"INFO"
-BUFFER_SIZE = 1_048_576  # 1 MB for stream copying
+BUFFER_SIZE = 8_388_608  # 8 MB per read/write when sendfile is unavailable
+
+# os.sendfile (kernel-side copy) is used for chunks at least this large;
+# smaller ones aren't worth flushing the output buffer for
+_SENDFILE_MIN_SIZE = 65_536
+
+# File object buffer for the source and temp file, so the run of small
+# header/metadata reads and writes around each chunk coalesces into few syscalls
+_FILE_BUFFER_SIZE = 1_048_576
+
+# Largest span (first to last patched byte) an in-place save writes in one
+# go; chunks further apart (e.g. LIST after the audio) get a full rewrite
+_IN_PLACE_SPAN_LIMIT = 1_048_576
 
 IXML_VERSION = "1.61"
 EMBEDDER_NAME = "NomenAudio"
@@ -125,6 +138,11 @@ INFO_KEY_MAP = {
     "keywords": b"IKEY",
 }
 
+# Metadata keys that land in each chunk (for cheap "anything to write?" checks)
+_BEXT_META_KEYS = frozenset({"description", "designer"})
+_IXML_META_KEYS = frozenset(USER_KEY_MAP) | frozenset(ASWG_KEY_MAP)
+_INFO_META_KEYS = frozenset(INFO_KEY_MAP)
+
 # BEXT binary layout constants
 BEXT_DESCRIPTION_SIZE = 256
 BEXT_ORIGINATOR_SIZE = 32
@@ -133,73 +151,84 @@ BEXT_DATE_SIZE = 10
 BEXT_TIME_SIZE = 8
 BEXT_FIXED_SIZE = 602  # Everything before CodingHistory
 
+# Fixed BEXT section: description .. reserved (EBU Tech 3285 v2 layout)
+_BEXT_STRUCT = struct.Struct("<256s32s32s10s8sIIH64s5h180s")  # 602 bytes
+
+# Precompiled RIFF primitives: little-endian u32 and a chunk header (id + size)
+_U32 = struct.Struct("<I")
+_pack_u32 = _U32.pack
+_CHUNK_HEADER = struct.Struct("<4sI")
+
 
 # ---------------------------------------------------------------------------
 # BEXT Chunk Handling
 # ---------------------------------------------------------------------------
 
 
+# Field names of the fixed BEXT section, in _BEXT_STRUCT order
+_BEXT_FIELDS = (
+    "description",
+    "originator",
+    "originator_ref",
+    "origination_date",
+    "origination_time",
+    "time_ref_low",
+    "time_ref_high",
+    "version",
+    "umid",
+    "loudness_value",
+    "loudness_range",
+    "max_true_peak",
+    "max_momentary",
+    "max_shortterm",
+    "reserved",
+)
+
+
 def _unpack_bext(data: bytes) -> dict:
     """Unpacks raw BEXT chunk data into a dictionary of fields."""
     # Pad if shorter than expected (some writers produce short BEXT)
     if len(data) < BEXT_FIXED_SIZE:
         data = data + b"\x00" * (BEXT_FIXED_SIZE - len(data))
 
-    return {
-        "description": data[0:256],
-        "originator": data[256:288],
-        "originator_ref": data[288:320],
-        "origination_date": data[320:330],
-        "origination_time": data[330:338],
-        "time_ref_low": struct.unpack("<I", data[338:342])[0],
-        "time_ref_high": struct.unpack("<I", data[342:346])[0],
-        "version": struct.unpack("<H", data[346:348])[0],
-        "umid": data[348:412],
-        "loudness_value": struct.unpack("<h", data[412:414])[0],
-        "loudness_range": struct.unpack("<h", data[414:416])[0],
-        "max_true_peak": struct.unpack("<h", data[416:418])[0],
-        "max_momentary": struct.unpack("<h", data[418:420])[0],
-        "max_shortterm": struct.unpack("<h", data[420:422])[0],
-        "reserved": data[422:602],
-        "coding_history": data[602:],
-    }
+    fields = dict(zip(_BEXT_FIELDS, _BEXT_STRUCT.unpack_from(data)))
+    fields["coding_history"] = data[BEXT_FIXED_SIZE:]
+    return fields
 
 
 def _pack_bext(fields: dict) -> bytes:
     """Packs a BEXT fields dictionary back into raw binary chunk data."""
-    data = bytearray()
-    data += _pad_bytes(fields["description"], 256)
-    data += _pad_bytes(fields["originator"], 32)
-    data += _pad_bytes(fields["originator_ref"], 32)
-    data += _pad_bytes(fields["origination_date"], 10)
-    data += _pad_bytes(fields["origination_time"], 8)
-    data += struct.pack("<I", fields["time_ref_low"])
-    data += struct.pack("<I", fields["time_ref_high"])
-    data += struct.pack("<H", fields["version"])
-    data += _pad_bytes(fields["umid"], 64)
-    data += struct.pack("<h", fields["loudness_value"])
-    data += struct.pack("<h", fields["loudness_range"])
-    data += struct.pack("<h", fields["max_true_peak"])
-    data += struct.pack("<h", fields["max_momentary"])
-    data += struct.pack("<h", fields["max_shortterm"])
-    data += _pad_bytes(fields["reserved"], 180)
-    data += (
-        fields["coding_history"]
-        if isinstance(fields["coding_history"], bytes)
-        else fields["coding_history"].encode("ascii", errors="replace")
+    # The "Ns" codes truncate or null-pad each text field to its width
+    header = _BEXT_STRUCT.pack(
+        _to_bytes(fields["description"]),
+        _to_bytes(fields["originator"]),
+        _to_bytes(fields["originator_ref"]),
+        _to_bytes(fields["origination_date"]),
+        _to_bytes(fields["origination_time"]),
+        fields["time_ref_low"],
+        fields["time_ref_high"],
+        fields["version"],
+        _to_bytes(fields["umid"]),
+        fields["loudness_value"],
+        fields["loudness_range"],
+        fields["max_true_peak"],
+        fields["max_momentary"],
+        fields["max_shortterm"],
+        _to_bytes(fields["reserved"]),
     )
-    return bytes(data)
+    return header + _to_bytes(fields["coding_history"])
 
 
 def _create_default_bext(metadata: dict) -> dict:
     """Creates a new BEXT fields dictionary with sensible defaults."""
-    now = datetime.now()
+    # "YYYY-MM-DDTHH:MM:SS" — sliced into the BEXT date and time fields
+    stamp = datetime.now().isoformat(timespec="seconds").encode("ascii")
     return {
         "description": metadata.get("description", ""),
         "originator": metadata.get("designer", ""),
         "originator_ref": b"",
-        "origination_date": now.strftime("%Y-%m-%d"),
-        "origination_time": now.strftime("%H:%M:%S"),
+        "origination_date": stamp[:10],
+        "origination_time": stamp[11:19],
         "time_ref_low": 0,
         "time_ref_high": 0,
         "version": 1,
@@ -232,17 +261,24 @@ def _build_new_bext(metadata: dict) -> bytes:
     return _pack_bext(fields)
 
 
-def _pad_bytes(value, length: int) -> bytes:
-    """Converts a value to bytes, truncates or null-pads to exact length."""
-    if isinstance(value, str):
-        raw = value.encode("ascii", errors="replace")
-    elif isinstance(value, bytes):
-        raw = value
-    elif isinstance(value, bytearray):
-        raw = bytes(value)
-    else:
-        raw = str(value).encode("ascii", errors="replace")
-    return raw[:length].ljust(length, b"\x00")
+@lru_cache(maxsize=256)
+def _encode_ascii(value: str) -> bytes:
+    """ASCII-encodes a metadata string (unmappable chars become '?').
+
+    Cached: the same values (designer, description, ...) are encoded for
+    BEXT and again for LIST-INFO, and repeat across files in a batch save.
+    """
+    return value.encode("ascii", errors="replace")
+
+
+# Field value type → bytes converter; other types go through str()
+_TO_BYTES = {str: _encode_ascii, bytes: bytes, bytearray: bytes}
+
+
+def _to_bytes(value) -> bytes:
+    """Converts a BEXT field value to bytes (str values are ASCII-encoded)."""
+    convert = _TO_BYTES.get(type(value))
+    return convert(value) if convert else _encode_ascii(str(value))
 
 
 # ---------------------------------------------------------------------------
@@ -271,8 +307,8 @@ def _update_ixml(existing_xml_bytes: bytes, metadata: dict) -> bytes:
 
     # Attempt to parse
     try:
-        root = ET.fromstring(xml_str)
-    except ET.ParseError:
+        root = _parse_xml(xml_str)
+    except etree.XMLSyntaxError:
         # If existing XML is unparseable, create fresh
         return _build_new_ixml(metadata)
 
@@ -293,20 +329,7 @@ def _update_ixml(existing_xml_bytes: bytes, metadata: dict) -> bytes:
     )
 
     # Update <ASWG> block
-    aswg_fields = {}
-    for dict_key, xml_tag in ASWG_KEY_MAP.items():
-        if dict_key in metadata:
-            aswg_fields[xml_tag] = metadata[dict_key]
-
-    # Extra ASWG mappings (different source key than the xml tag name implies)
-    for xml_tag, source_key in ASWG_EXTRA_MAPPINGS.items():
-        if source_key in metadata:
-            aswg_fields[xml_tag] = metadata[source_key]
-
-    # Always set contentType for ASWG
-    aswg_fields["contentType"] = "sfx"
-
-    _set_xml_children(root, "ASWG", aswg_fields)
+    _set_xml_children(root, "ASWG", _aswg_fields(metadata))
 
     # Serialize back to UTF-8
     return _serialize_xml(root)
@@ -314,16 +337,12 @@ def _update_ixml(existing_xml_bytes: bytes, metadata: dict) -> bytes:
 
 def _build_new_ixml(metadata: dict) -> bytes:
     """Creates a brand new iXML XML document from metadata."""
-    root = ET.Element("BWFXML")
-    ver = ET.SubElement(root, "IXML_VERSION")
+    root = etree.Element("BWFXML")
+    ver = etree.SubElement(root, "IXML_VERSION")
     ver.text = IXML_VERSION
 
     # Build USER block
-    user_fields = {}
-    for dict_key, xml_tag in USER_KEY_MAP.items():
-        if dict_key in metadata:
-            user_fields[xml_tag] = metadata[dict_key]
-
+    user_fields = _mapped_fields(USER_KEY_MAP, metadata)
     user_fields["EMBEDDER"] = EMBEDDER_NAME
 
     # Add custom fields
@@ -336,34 +355,41 @@ def _build_new_ixml(metadata: dict) -> bytes:
     _set_xml_children(root, "USER", user_fields)
 
     # Build ASWG block
-    aswg_fields = {}
-    for dict_key, xml_tag in ASWG_KEY_MAP.items():
-        if dict_key in metadata:
-            aswg_fields[xml_tag] = metadata[dict_key]
+    _set_xml_children(root, "ASWG", _aswg_fields(metadata))
 
-    for xml_tag, source_key in ASWG_EXTRA_MAPPINGS.items():
-        if source_key in metadata:
-            aswg_fields[xml_tag] = metadata[source_key]
+    return _serialize_xml(root)
 
-    aswg_fields["contentType"] = "sfx"
 
-    _set_xml_children(root, "ASWG", aswg_fields)
+def _mapped_fields(key_map: dict, metadata: dict) -> dict:
+    """Maps the metadata keys present in key_map to their XML tags (map order)."""
+    return {tag: metadata[key] for key, tag in key_map.items() if key in metadata}
 
-    return _serialize_xml(root)
+
+def _aswg_fields(metadata: dict) -> dict:
+    """Builds the ASWG tag → value dict for a write."""
+    fields = _mapped_fields(ASWG_KEY_MAP, metadata)
+    # Extra ASWG mappings (different source key than the xml tag name implies)
+    fields.update(
+        {
+            tag: metadata[source_key]
+            for tag, source_key in ASWG_EXTRA_MAPPINGS.items()
+            if source_key in metadata
+        }
+    )
+    # Always set contentType for ASWG
+    fields["contentType"] = "sfx"
+    return fields
 
 
 def _update_xml_block(
-    root: ET.Element,
+    root: etree._Element,
     block_tag: str,
     key_map: dict,
     metadata: dict,
     extra_fields: dict | None = None,
 ):
     """Finds or creates a child block, then updates specific child elements."""
-    fields = {}
-    for dict_key, xml_tag in key_map.items():
-        if dict_key in metadata:
-            fields[xml_tag] = metadata[dict_key]
+    fields = _mapped_fields(key_map, metadata)
 
     if extra_fields:
         fields.update(extra_fields)
@@ -380,34 +406,40 @@ def _update_xml_block(
     _set_xml_children(root, block_tag, fields)
 
 
-def _set_xml_children(root: ET.Element, block_tag: str, fields: dict):
+def _set_xml_children(root: etree._Element, block_tag: str, fields: dict):
     """Finds or creates block_tag under root, sets child elements from fields dict.
 
     Existing children of block_tag that are NOT in fields are left untouched.
     """
     block = root.find(block_tag)
     if block is None:
-        block = ET.SubElement(root, block_tag)
+        block = etree.SubElement(root, block_tag)
 
     for tag, value in fields.items():
         child = block.find(tag)
         if child is None:
-            child = ET.SubElement(block, tag)
+            child = etree.SubElement(block, tag)
         child.text = str(value) if value is not None else ""
 
 
-def _serialize_xml(root: ET.Element) -> bytes:
-    """Serializes an ElementTree root to UTF-8 bytes with XML declaration."""
-    # Use indent for readability (Python 3.9+)
-    try:
-        ET.indent(root, space="  ")
-    except AttributeError:
-        pass  # Python < 3.9, skip pretty-printing
+def _parse_xml(xml_str: str) -> etree._Element:
+    """Parses decoded iXML text, ignoring any declared encoding.
+
+    Raises etree.XMLSyntaxError on malformed input. Entities are never
+    resolved. A parser is built per call since lxml parsers are not
+    thread-safe.
+    """
+    parser = etree.XMLParser(encoding="utf-8", resolve_entities=False)
+    return etree.fromstring(xml_str.encode("utf-8"), parser)
 
-    tree = ET.ElementTree(root)
-    buf = BytesIO()
-    tree.write(buf, encoding="UTF-8", xml_declaration=True)
-    return buf.getvalue()
+
+def _serialize_xml(root: etree._Element) -> bytes:
+    """Serializes an lxml root to UTF-8 bytes with XML declaration.
+
+    No pretty-printing: iXML is machine-read, and indenting costs an extra
+    tree walk plus whitespace bytes in every written chunk.
+    """
+    return etree.tostring(root, encoding="UTF-8", xml_declaration=True)
 
 
 # ---------------------------------------------------------------------------
@@ -417,22 +449,27 @@ def _serialize_xml(root: ET.Element) -> bytes:
 
 def _build_info_sub_chunk(tag_bytes: bytes, value: str) -> bytes:
     """Build a single INFO sub-chunk: 4-byte tag + 4-byte size + null-terminated string + pad."""
-    encoded = value.encode("ascii", errors="replace") + b"\x00"
+    encoded = _encode_ascii(value) + b"\x00"
     size = len(encoded)
-    data = tag_bytes + struct.pack("<I", size) + encoded
+    data = tag_bytes + _pack_u32(size) + encoded
     if size % 2 != 0:
         data += b"\x00"
     return data
 
 
-def _parse_info_sub_chunks(data: bytes) -> dict[bytes, bytes]:
-    """Parse LIST-INFO data (after type word) into tag→value map."""
-    result: dict[bytes, bytes] = {}
+def _parse_info_sub_chunks(data: bytes | memoryview) -> dict[bytes, memoryview]:
+    """Parse LIST-INFO data (after type word) into tag→value map.
+
+    Values are views into data, so existing sub-chunks are only copied once,
+    when the chunk is rebuilt.
+    """
+    view = memoryview(data)
+    result: dict[bytes, memoryview] = {}
     pos = 0
-    while pos + 8 <= len(data):
-        tag = data[pos : pos + 4]
-        size = struct.unpack("<I", data[pos + 4 : pos + 8])[0]
-        value = data[pos + 8 : pos + 8 + size]
+    while pos + 8 <= len(view):
+        tag = bytes(view[pos : pos + 4])
+        size = _U32.unpack_from(view, pos + 4)[0]
+        value = view[pos + 8 : pos + 8 + size]
         result[tag] = value
         pos += 8 + size
         if size % 2 != 0:
@@ -440,13 +477,15 @@ def _parse_info_sub_chunks(data: bytes) -> dict[bytes, bytes]:
     return result
 
 
-def _build_list_info(metadata: dict, existing_data: bytes | None = None) -> bytes:
+def _build_list_info(
+    metadata: dict, existing_data: bytes | memoryview | None = None
+) -> bytes:
     """Build complete LIST-INFO chunk data (INFO type + sub-chunks).
 
     Merges new fields into existing (preserves unknown sub-chunks).
     Only fills gaps — never overwrites existing INFO values.
     """
-    existing: dict[bytes, bytes] = {}
+    existing: dict[bytes, bytes | memoryview] = {}
     if existing_data:
         existing = _parse_info_sub_chunks(existing_data)
 
@@ -454,13 +493,13 @@ def _build_list_info(metadata: dict, existing_data: bytes | None = None) -> byte
     for meta_key, info_tag in INFO_KEY_MAP.items():
         value = metadata.get(meta_key)
         if value and info_tag not in existing:
-            existing[info_tag] = value.encode("ascii", errors="replace") + b"\x00"
+            existing[info_tag] = _encode_ascii(value) + b"\x00"
 
     # Rebuild the chunk data
     chunk_data = bytearray(LIST_TYPE_INFO)
     for tag, raw_value in existing.items():
         chunk_data += tag
-        chunk_data += struct.pack("<I", len(raw_value))
+        chunk_data += _pack_u32(len(raw_value))
         chunk_data += raw_value
         if len(raw_value) % 2 != 0:
             chunk_data += b"\x00"
@@ -470,7 +509,7 @@ def _build_list_info(metadata: dict, existing_data: bytes | None = None) -> byte
 
 def _has_info_fields(metadata: dict) -> bool:
     """Check if metadata has any fields mappable to INFO sub-chunks."""
-    return any(metadata.get(k) for k in INFO_KEY_MAP)
+    return any(metadata[k] for k in _INFO_META_KEYS & metadata.keys())
 
 
 # ---------------------------------------------------------------------------
@@ -481,15 +520,21 @@ def _has_info_fields(metadata: dict) -> bool:
 def _write_chunk(out, chunk_id: bytes, chunk_data: bytes):
     """Writes a complete RIFF chunk: 4-byte ID + 4-byte size + data + pad."""
     out.write(chunk_id)
-    out.write(struct.pack("<I", len(chunk_data)))
+    out.write(_pack_u32(len(chunk_data)))
     out.write(chunk_data)
     if len(chunk_data) % 2 != 0:
         out.write(b"\x00")
 
 
 def _stream_copy(src, dst, size: int):
-    """Copies exactly `size` bytes from src to dst in buffered chunks."""
+    """Copies exactly `size` bytes from src to dst.
+
+    Large copies go through os.sendfile where the platform supports it
+    (Linux); anything it does not copy falls back to buffered read/write.
+    """
     remaining = size
+    if size >= _SENDFILE_MIN_SIZE and hasattr(os, "sendfile"):
+        remaining -= _sendfile_copy(src, dst, size)
     while remaining > 0:
         read_size = min(BUFFER_SIZE, remaining)
         buf = src.read(read_size)
@@ -499,10 +544,33 @@ def _stream_copy(src, dst, size: int):
         remaining -= len(buf)
 
 
+def _sendfile_copy(src, dst, size: int) -> int:
+    """Copies up to `size` bytes with os.sendfile; returns the bytes copied.
+
+    Both file objects are re-synced to their underlying fds afterwards, so
+    buffered reads/writes can continue where the kernel copy stopped.
+    """
+    offset = src.tell()
+    dst.flush()
+    dst_fd = dst.fileno()
+    copied = 0
+    try:
+        while copied < size:
+            sent = os.sendfile(dst_fd, src.fileno(), offset + copied, size - copied)
+            if sent == 0:
+                break
+            copied += sent
+    except OSError:
+        pass  # Unsupported for this pair of files — caller copies the rest
+    src.seek(offset + copied)
+    dst.seek(os.lseek(dst_fd, 0, os.SEEK_CUR))
+    return copied
+
+
 def _stream_copy_chunk(src, dst, chunk_id: bytes, data_size: int):
     """Writes chunk header, stream-copies data from src, adds pad byte."""
     dst.write(chunk_id)
-    dst.write(struct.pack("<I", data_size))
+    dst.write(_pack_u32(data_size))
     _stream_copy(src, dst, data_size)
     if data_size % 2 != 0:
         dst.write(b"\x00")
@@ -535,10 +603,20 @@ def _validate_riff_header(src, src_path: str) -> int:
     return file_size
 
 
-def _skip_src_pad(src, data_size: int) -> None:
-    """Skips the pad byte in source if chunk data size is odd."""
-    if data_size % 2 != 0:
-        src.read(1)
+def _index_chunks(src, file_size: int) -> list[tuple[bytes, int, int]]:
+    """Lists (chunk_id, data_offset, data_size) for each chunk after the header.
+
+    Headers are read from one read-only mmap of the file in a single pass.
+    Sizes are as declared, so the last chunk may claim more than the file holds.
+    """
+    chunks = []
+    with mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        pos = 12
+        while pos + 8 <= file_size:
+            chunk_id, data_size = _CHUNK_HEADER.unpack_from(mm, pos)
+            chunks.append((chunk_id, pos + 8, data_size))
+            pos += 8 + data_size + (data_size & 1)
+    return chunks
 
 
 def _process_list_chunk(src, dst, data_size, metadata, state):
@@ -571,6 +649,9 @@ def _process_chunk(src, dst, chunk_id, data_size, metadata, state):
     if chunk_id == CHUNK_BEXT:
         if state["bext_handled"]:
             src.seek(data_size, 1)
+        elif _bext_unchanged(data_size, metadata):
+            _stream_copy_chunk(src, dst, CHUNK_BEXT, data_size)
+            state["bext_handled"] = True
         else:
             bext_data = src.read(data_size)
             _write_chunk(dst, CHUNK_BEXT, _update_bext(bext_data, metadata))
@@ -586,19 +667,34 @@ def _process_chunk(src, dst, chunk_id, data_size, metadata, state):
         _process_list_chunk(src, dst, data_size, metadata, state)
     else:
         _stream_copy_chunk(src, dst, chunk_id, data_size)
-    _skip_src_pad(src, data_size)
 
 
-def _append_missing_chunks(dst, metadata, state) -> None:
-    """Creates bext/iXML/LIST-INFO chunks from scratch if not in source."""
-    has_bext = any(k in metadata for k in ("description", "designer"))
-    has_ixml = any(k in metadata for k in (*USER_KEY_MAP, *ASWG_KEY_MAP)) or bool(
+def _has_bext_fields(metadata: dict) -> bool:
+    """Check if metadata has any fields that belong in a BEXT chunk."""
+    return not _BEXT_META_KEYS.isdisjoint(metadata)
+
+
+def _bext_unchanged(data_size: int, metadata: dict) -> bool:
+    """Check if an existing BEXT chunk can be copied through as-is.
+
+    A well-formed chunk round-trips byte-for-byte when no BEXT field is
+    written, so there is no need to unpack and repack it.
+    """
+    return data_size >= BEXT_FIXED_SIZE and not _has_bext_fields(metadata)
+
+
+def _has_ixml_fields(metadata: dict) -> bool:
+    """Check if metadata has any fields that belong in an iXML chunk."""
+    return not _IXML_META_KEYS.isdisjoint(metadata) or bool(
         metadata.get("custom_fields")
     )
 
-    if not state["bext_handled"] and has_bext:
+
+def _append_missing_chunks(dst, metadata, state) -> None:
+    """Creates bext/iXML/LIST-INFO chunks from scratch if not in source."""
+    if not state["bext_handled"] and _has_bext_fields(metadata):
         _write_chunk(dst, CHUNK_BEXT, _build_new_bext(metadata))
-    if not state["ixml_handled"] and has_ixml:
+    if not state["ixml_handled"] and _has_ixml_fields(metadata):
         _write_chunk(dst, CHUNK_IXML, _build_new_ixml(metadata))
     if not state["info_handled"] and _has_info_fields(metadata):
         info_data = _build_list_info(metadata)
@@ -607,7 +703,10 @@ def _append_missing_chunks(dst, metadata, state) -> None:
 
 def _rewrite_wav(src_path: str, dst_file, metadata: dict):
     """Reads src_path, writes rewritten WAV to dst_file handle."""
-    with open(src_path, "rb") as src:
+    with open(src_path, "rb", buffering=_FILE_BUFFER_SIZE) as src:
+        if hasattr(os, "posix_fadvise"):
+            # One front-to-back pass: ask for aggressive readahead (POSIX only)
+            os.posix_fadvise(src.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
         file_size = _validate_riff_header(src, src_path)
 
         dst_file.write(RIFF_HEADER)
@@ -616,25 +715,156 @@ def _rewrite_wav(src_path: str, dst_file, metadata: dict):
 
         state = {"bext_handled": False, "ixml_handled": False, "info_handled": False}
 
-        while src.tell() < file_size:
-            chunk_header = src.read(8)
-            if len(chunk_header) < 8:
-                break
-
-            chunk_id = chunk_header[0:4]
-            data_size = struct.unpack("<I", chunk_header[4:8])[0]
-            data_offset = src.tell()
-
-            if data_offset + data_size > file_size:
-                data_size = file_size - data_offset
-
+        for chunk_id, data_offset, data_size in _index_chunks(src, file_size):
+            src.seek(data_offset)
+            data_size = min(data_size, file_size - data_offset)
             _process_chunk(src, dst_file, chunk_id, data_size, metadata, state)
 
         _append_missing_chunks(dst_file, metadata, state)
 
         total_size = dst_file.tell()
         dst_file.seek(4)
-        dst_file.write(struct.pack("<I", total_size - 8))
+        dst_file.write(_pack_u32(total_size - 8))
+
+
+# ---------------------------------------------------------------------------
+# In-place Patching
+# ---------------------------------------------------------------------------
+
+# Chunks other tools write purely to reserve space; an in-place write may
+# absorb one that directly follows the chunk being grown.
+_FILLER_CHUNKS = frozenset({b"JUNK", b"FLLR", b"PAD "})
+
+
+def _fit_chunk(
+    chunks: list[tuple[bytes, int, int]], index: int, new_data: bytes
+) -> bytes | None:
+    """Encodes chunks[index] with new_data so it fills exactly the same space.
+
+    The space is the existing chunk plus any filler chunk right after it;
+    leftover space becomes a JUNK chunk. Returns None if it does not fit.
+    """
+    chunk_id, _, data_size = chunks[index]
+    space = data_size + (data_size & 1)
+    if index + 1 < len(chunks) and chunks[index + 1][0] in _FILLER_CHUNKS:
+        filler_size = chunks[index + 1][2]
+        space += 8 + filler_size + (filler_size & 1)
+
+    needed = len(new_data) + (len(new_data) & 1)
+    leftover = space - needed
+    if leftover != 0 and leftover < 8:
+        return None
+
+    out = bytearray(chunk_id + _pack_u32(len(new_data)) + new_data)
+    if len(new_data) & 1:
+        out += b"\x00"
+    if leftover:
+        out += b"JUNK" + _pack_u32(leftover - 8) + bytes(leftover - 8)
+    return bytes(out)
+
+
+def _plan_in_place(src, chunks, metadata: dict) -> list[tuple[int, bytes]] | None:
+    """Builds (file offset, bytes) patches for an in-place metadata write.
+
+    Returns None when only a full rewrite gives the right result: duplicate
+    metadata chunks to drop, missing chunks to append, or new data that
+    outgrows its slot.
+    """
+    slots: dict[bytes, int] = {}
+    for index, (chunk_id, offset, size) in enumerate(chunks):
+        key = chunk_id
+        if chunk_id == CHUNK_LIST:
+            src.seek(offset)
+            if size < 4 or src.read(4) != LIST_TYPE_INFO:
+                continue
+            key = LIST_TYPE_INFO
+        elif chunk_id not in (CHUNK_BEXT, CHUNK_IXML):
+            continue
+        if key in slots:
+            return None
+        slots[key] = index
+
+    if (
+        (CHUNK_BEXT not in slots and _has_bext_fields(metadata))
+        or (CHUNK_IXML not in slots and _has_ixml_fields(metadata))
+        or (LIST_TYPE_INFO not in slots and _has_info_fields(metadata))
+    ):
+        return None
+
+    patches = []
+    for key, index in slots.items():
+        _, offset, size = chunks[index]
+        if key == CHUNK_BEXT and _bext_unchanged(size, metadata):
+            continue
+        src.seek(offset)
+        old_data = src.read(size)
+        if key == CHUNK_BEXT:
+            new_data = _update_bext(old_data, metadata)
+        elif key == CHUNK_IXML:
+            new_data = _update_ixml(old_data, metadata)
+            if len(new_data) <= size:
+                # Null-pad within the old chunk (as field recorders do)
+                new_data = new_data.ljust(size, b"\x00")
+        else:
+            new_data = _build_list_info(metadata, memoryview(old_data)[4:])
+        if new_data == old_data:
+            continue
+        encoded = _fit_chunk(chunks, index, new_data)
+        if encoded is None:
+            return None
+        patches.append((offset - 8, encoded))
+    return patches
+
+
+def _merge_patches(f, patches: list[tuple[int, bytes]]) -> tuple[int, bytes] | None:
+    """Merges patches into one contiguous write, filling gaps from the file.
+
+    Returns None when the span exceeds _IN_PLACE_SPAN_LIMIT.
+    """
+    patches = sorted(patches)
+    start = patches[0][0]
+    end = max(offset + len(data) for offset, data in patches)
+    if end - start > _IN_PLACE_SPAN_LIMIT:
+        return None
+    f.seek(start)
+    span = bytearray(f.read(end - start))
+    if len(span) != end - start:
+        return None
+    for offset, data in patches:
+        span[offset - start : offset - start + len(data)] = data
+    return start, bytes(span)
+
+
+def _write_in_place(file_path: str, metadata: dict) -> bool:
+    """Patches metadata chunks directly in the file if the new data fits.
+
+    All changed chunks go out in a single write, flushed and fsynced before
+    returning, so there is no point between patches at which a failure
+    leaves some chunks old and others new.
+    Returns False, having written nothing, when a full rewrite is needed.
+    """
+    with open(file_path, "r+b") as f:
+        file_size = _validate_riff_header(f, file_path)
+        chunks = _index_chunks(f, file_size)
+        if chunks:
+            _, last_offset, last_size = chunks[-1]
+            if last_offset + last_size + (last_size & 1) > file_size:
+                # Truncated final chunk — leave the clamping to a rewrite
+                return False
+        patches = _plan_in_place(f, chunks, metadata)
+        if patches is None:
+            return False
+        if not patches:
+            return True
+        merged = _merge_patches(f, patches)
+        if merged is None:
+            return False
+        offset, data = merged
+        f.seek(offset)
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    return True
 
 
 # ---------------------------------------------------------------------------
@@ -646,10 +876,16 @@ def write_metadata(file_path: str, metadata: dict) -> None:
     """
     Writes metadata to a WAV file's iXML and BEXT chunks.
 
-    The file is rewritten atomically: a temp file is created alongside the
-    original, the rewritten WAV is written to the temp file, and then the
-    temp file replaces the original. If any error occurs, the original file
-    is left untouched.
+    When the updated bext/iXML/LIST-INFO chunks fit in the space the existing
+    ones occupy (iXML may shrink with null padding; an adjacent JUNK/FLLR
+    chunk can absorb growth), only those bytes are patched in place, in one
+    fsynced write, and the audio is not touched. No copy of the original is
+    kept: once this returns, the file holds the new metadata, and an error
+    from the write itself can leave the patched span partly written.
+    Otherwise the file is rewritten atomically: a temp file is created
+    alongside the original, the rewritten WAV is written to it, and then it
+    replaces the original. If any error occurs during a rewrite, the
+    original file is left untouched.
 
     Args:
         file_path: Path to the WAV file to update.
@@ -677,11 +913,17 @@ def write_metadata(file_path: str, metadata: dict) -> None:
     if not os.access(file_path, os.W_OK):
         raise PermissionError(f"Cannot write to file (read-only): {file_path}")
 
+    if _write_in_place(file_path, metadata):
+        return
+
+    # Deferred: only the full-rewrite fallback needs a temp file
+    import tempfile
+
     dir_name = os.path.dirname(file_path)
     fd, temp_path = tempfile.mkstemp(suffix=".wav.tmp", dir=dir_name)
 
     try:
-        with os.fdopen(fd, "wb") as tmp:
+        with os.fdopen(fd, "wb", buffering=_FILE_BUFFER_SIZE) as tmp:
             _rewrite_wav(file_path, tmp, metadata)
 
         # Atomic replace
@@ -719,11 +961,16 @@ def verify_write(file_path: str, metadata: dict) -> dict:
         return {"ok": False, "errors": [f"Failed to read file: {e}"]}
 
     errors: list[str] = []
-    _verify_bext(info, metadata, errors)
-    ixml_root = _parse_ixml_for_verify(info)
-    _verify_ixml(ixml_root, metadata, errors)
-    _verify_aswg(ixml_root, metadata, errors)
-    _verify_info(info, metadata, errors)
+    keys = metadata.keys()
+    # Only check (and only parse iXML for) sections this write touched
+    if keys & _BEXT_META_KEYS:
+        _verify_bext(info, metadata, errors)
+    if keys & _IXML_VERIFY_KEYS or metadata.get("custom_fields"):
+        ixml_root = _parse_ixml_for_verify(info)
+        _verify_ixml(ixml_root, metadata, errors)
+        _verify_aswg(ixml_root, metadata, errors)
+    if keys & _INFO_VERIFY_KEYS:
+        _verify_info(info, metadata, errors)
     return {"ok": len(errors) == 0, "errors": errors}
 
 
@@ -734,27 +981,35 @@ def _verify_bext(info, metadata: dict, errors: list[str]) -> None:
 
     if "description" in metadata:
         bext_desc = info.bext.description
-        if isinstance(bext_desc, bytes):
-            bext_desc = bext_desc.rstrip(b"\x00").decode("ascii", errors="replace")
         expected = metadata["description"][:BEXT_DESCRIPTION_SIZE]
-        if bext_desc.strip() != expected.strip():
+        if not _text_matches_written(bext_desc, expected):
             errors.append(
                 f"BEXT description mismatch: expected '{expected}', got '{bext_desc}'"
             )
 
     if "designer" in metadata:
         bext_orig = info.bext.originator
-        if isinstance(bext_orig, bytes):
-            bext_orig = bext_orig.rstrip(b"\x00").decode("ascii", errors="replace")
         expected_orig = metadata["designer"][:BEXT_ORIGINATOR_SIZE]
-        if bext_orig.strip() != expected_orig.strip():
+        if not _text_matches_written(bext_orig, expected_orig):
             errors.append(
                 f"BEXT originator mismatch: expected '{expected_orig}', got '{bext_orig}'"
             )
 
 
-def _parse_ixml_for_verify(info) -> ET.Element | None:
-    """Parse iXML source into an ElementTree root for verification."""
+def _text_matches_written(actual: str | bytes, expected: str) -> bool:
+    """Compares a read-back BEXT/INFO text field with what the writer stored.
+
+    The comparison is on bytes: the expected value goes through the same
+    (cached) ASCII encoding used for writing, so characters stored as '?'
+    are not reported as mismatches. wavinfo's latin-1 text round-trips.
+    """
+    if isinstance(actual, str):
+        actual = actual.encode("latin-1", errors="replace")
+    return actual.rstrip(b"\x00").strip() == _encode_ascii(expected).strip()
+
+
+def _parse_ixml_for_verify(info) -> etree._Element | None:
+    """Parse iXML source into an lxml root for verification."""
     if info.ixml is None or not info.ixml.source:
         return None
 
@@ -764,12 +1019,14 @@ def _parse_ixml_for_verify(info) -> ET.Element | None:
     xml_source = xml_source.rstrip("\x00").strip()
 
     try:
-        return ET.fromstring(xml_source)
-    except ET.ParseError:
+        return _parse_xml(xml_source)
+    except etree.XMLSyntaxError:
         return None
 
 
-def _verify_ixml(root: ET.Element | None, metadata: dict, errors: list[str]) -> None:
+def _verify_ixml(
+    root: etree._Element | None, metadata: dict, errors: list[str]
+) -> None:
     """Checks USER fields in iXML against expected metadata."""
     has_ixml_fields = any(k in metadata for k in USER_KEY_MAP) or bool(
         metadata.get("custom_fields")
@@ -821,8 +1078,13 @@ _ASWG_VERIFY_FIELDS: dict[str, str] = {
     "recType": "rec_type",
 }
 
+# Metadata keys checked against iXML (USER block or ASWG block)
+_IXML_VERIFY_KEYS = frozenset(USER_KEY_MAP) | frozenset(_ASWG_VERIFY_FIELDS.values())
+
 
-def _verify_aswg(root: ET.Element | None, metadata: dict, errors: list[str]) -> None:
+def _verify_aswg(
+    root: etree._Element | None, metadata: dict, errors: list[str]
+) -> None:
     """Checks critical ASWG fields in iXML against expected metadata."""
     if root is None:
         return
@@ -855,6 +1117,8 @@ _INFO_VERIFY_FIELDS: dict[str, tuple[str, str]] = {
     "keywords": ("IKEY", "keywords"),
 }
 
+_INFO_VERIFY_KEYS = frozenset(_INFO_VERIFY_FIELDS)
+
 
 def _verify_info(info, metadata: dict, errors: list[str]) -> None:
     """Checks INFO sub-chunk fields against expected metadata."""
@@ -866,7 +1130,7 @@ def _verify_info(info, metadata: dict, errors: list[str]) -> None:
             continue
         actual = getattr(info.info, attr, None) or ""
         expected = metadata[dict_key]
-        if actual.strip() != expected.strip():
+        if not _text_matches_written(actual, expected):
             errors.append(
                 f"INFO {info_tag} mismatch: expected '{expected}', got '{actual}'"
             )
@@ -11,14 +11,24 @@ class CLAPCaptioner:
     def __init__(self) -> None:
         self._model = None
 
-    def load_model(self) -> None:
-        """Load clapcap model (CPU only) and apply librosa patch."""
+    def load_model(self, quantize: bool = False) -> None:
+        """Load clapcap model (CPU only) and apply librosa patch.
+
+        With ``quantize``, Linear layers run as dynamic int8.
+        """
         from msclap import CLAP
 
-        from app.ml.clap_compat import patch_clap_audio
+        from app.ml.clap_compat import (
+            patch_clap_audio,
+            patch_clap_inference,
+            quantize_clap_int8,
+        )
 
         self._model = CLAP(version="clapcap", use_cuda=False)
         patch_clap_audio(self._model)
+        patch_clap_inference(self._model)
+        if quantize:
+            quantize_clap_int8(self._model)
         logger.info("CLAPCaptioner model loaded")
 
     def caption(self, audio_path: str) -> str:
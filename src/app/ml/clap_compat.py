@@ -5,20 +5,29 @@ On Windows this is a heavy requirement (users must install FFmpeg "full-shared")
 Since we only process WAV files, librosa + soundfile handles everything we need
 with zero system-level dependencies.
 
+A second patch runs inference under ``torch.inference_mode``, and
+``quantize_clap_int8`` optionally converts the network to dynamic int8.
+
 Usage:
     from msclap import CLAP
-    from app.ml.clap_compat import patch_clap_audio
+    from app.ml.clap_compat import patch_clap_audio, patch_clap_inference
 
     model = CLAP(version='2023', use_cuda=False)
     patch_clap_audio(model)
+    patch_clap_inference(model)
     # Now model.get_audio_embeddings() uses librosa internally
 """
 
 import types
 
 import librosa
+import numpy as np
 import torch
 
+# Medium-quality soxr resampling: cheaper than librosa's default soxr_hq and
+# ample for downsampling to CLAP's input rate for classification
+_RES_TYPE = "soxr_mq"
+
 
 def _librosa_read_audio(
     self: object, audio_path: str, resample: bool = True
@@ -31,8 +40,12 @@ def _librosa_read_audio(
       - Always returns self.args.sampling_rate as the rate (matches original)
     """
     target_sr = self.args.sampling_rate if resample else None  # type: ignore[attr-defined]
-    audio_np, sr = librosa.load(audio_path, sr=target_sr, mono=True)
-    audio_tensor = torch.from_numpy(audio_np)
+    audio_np, sr = librosa.load(
+        audio_path, sr=target_sr, mono=True, res_type=_RES_TYPE, dtype=np.float32
+    )
+    # from_numpy shares memory; a contiguous float32 buffer (a no-op check
+    # for librosa's output) keeps later tensor ops from copying it again
+    audio_tensor = torch.from_numpy(np.ascontiguousarray(audio_np))
     return audio_tensor, self.args.sampling_rate if resample else sr  # type: ignore[attr-defined]
 
 
@@ -44,3 +57,31 @@ def patch_clap_audio(clap_model: object) -> None:
     read_audio) uses librosa instead of torchaudio.
     """
     clap_model.read_audio = types.MethodType(_librosa_read_audio, clap_model)  # type: ignore[attr-defined]
+
+
+def patch_clap_inference(clap_model: object) -> None:
+    """Run a CLAP model's public inference entry points under inference mode.
+
+    msclap only disables gradients (``no_grad``); ``torch.inference_mode``
+    also skips view and version-counter tracking on every tensor. The
+    results are only ever converted to numpy or text, never fed to autograd.
+    """
+    for name in ("get_audio_embeddings", "get_text_embeddings", "generate_caption"):
+        method = getattr(clap_model, name, None)
+        if method is not None:
+            setattr(clap_model, name, torch.inference_mode()(method))
+
+
+def quantize_clap_int8(clap_model: object) -> None:
+    """Swap the CLAP network's ``nn.Linear`` layers for dynamic int8 versions.
+
+    Weights are stored as int8 and activations quantized per batch, which
+    halves weight memory traffic and uses int8 matmul kernels on CPU.
+    Embeddings shift slightly, so cached ones must be keyed on the mode.
+    """
+    torch.ao.quantization.quantize_dynamic(
+        clap_model.clap,  # type: ignore[attr-defined]
+        {torch.nn.Linear},
+        dtype=torch.qint8,
+        inplace=True,
+    )
@@ -4,6 +4,9 @@ from __future__ import annotations
 
 import json
 import logging
+import os
+import threading
+from collections import OrderedDict
 from typing import TYPE_CHECKING
 
 from app.models import ClassificationMatch
@@ -13,14 +16,97 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+# Per-phrase metadata keys, stored column-wise in the embeddings sidecar
+_META_FIELDS = ("cat_id", "category", "subcategory")
+
+# Normalized audio embeddings kept in memory, keyed by file identity, so
+# re-analyzing an unchanged file skips the audio encoder
+_AUDIO_CACHE_SIZE = 128
+
 
 def _softmax(logits: "np.ndarray") -> "np.ndarray":
-    """Numerically stable softmax: logits -> [0, 1] probabilities."""
+    """Numerically stable softmax: logits -> [0, 1] float64 probabilities.
+
+    Allocates one array (the shifted logits) and works in place from there.
+    """
+    import numpy as np
+
+    exp = np.subtract(logits, np.max(logits), dtype=np.float64)
+    np.exp(exp, out=exp)
+    exp /= exp.sum()
+    return exp
+
+
+def _as_numpy(x) -> "np.ndarray":
+    """Convert a (possibly torch) array to a float32 numpy array."""
+    import numpy as np
+
+    if hasattr(x, "detach"):
+        x = x.detach().cpu().numpy()
+    return np.asarray(x, dtype=np.float32)
+
+
+def _sidecar_path(embeddings_path: str) -> str:
+    """Path of the JSON metadata file stored next to a .npy embeddings file."""
+    return os.path.splitext(embeddings_path)[0] + ".json"
+
+
+def _meta_to_columns(meta: list[dict]) -> dict[str, list[str]]:
+    """Per-phrase meta dicts -> one list per field (no repeated keys)."""
+    return {key: [m[key] for m in meta] for key in _META_FIELDS}
+
+
+def _meta_from_columns(columns: dict[str, list[str]]) -> list[dict]:
+    """Inverse of _meta_to_columns; consecutive equal rows share one dict."""
+    meta: list[dict] = []
+    prev_row = None
+    for row in zip(*(columns[key] for key in _META_FIELDS), strict=True):
+        if row != prev_row:
+            entry = dict(zip(_META_FIELDS, row, strict=True))
+            prev_row = row
+        meta.append(entry)
+    return meta
+
+
+def _audio_cache_key(audio_path: str) -> tuple[str, int, int] | None:
+    """(absolute path, mtime_ns, size), or None if the file can't be stat'ed."""
+    try:
+        st = os.stat(audio_path)
+    except OSError:
+        return None
+    return os.path.abspath(audio_path), st.st_mtime_ns, st.st_size
+
+
+def _normalize_rows(matrix: "np.ndarray") -> "np.ndarray":
+    """L2-normalize each row (one embedding per row) into a contiguous copy."""
+    import numpy as np
+
+    matrix = np.array(matrix, dtype=np.float32, order="C")
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix
+
+
+def _top_matches(
+    best: "np.ndarray", group_meta: list[dict], top_n: int
+) -> list[ClassificationMatch]:
+    """Top_n CatIDs by raw logit, with softmax confidences over just those.
+
+    The sort is stable, so ties keep first-seen CatID order.
+    """
     import numpy as np
 
-    shifted = logits - np.max(logits)
-    exp = np.exp(shifted)
-    return exp / exp.sum()
+    top = np.argsort(-best, kind="stable")[:top_n]
+    top_probs = _softmax(best[top])
+    return [
+        ClassificationMatch(
+            cat_id=meta["cat_id"],
+            category=meta["category"],
+            subcategory=meta["subcategory"],
+            category_full=f"{meta['category']}-{meta['subcategory']}",
+            confidence=round(float(top_probs[i]), 6),
+        )
+        for i, meta in enumerate(group_meta[g] for g in top)
+    ]
 
 
 class CLAPClassifier:
@@ -28,92 +114,179 @@ class CLAPClassifier:
 
     def __init__(self) -> None:
         self._model = None
+        # L2-normalized text embeddings, one row per phrase (float32)
         self._text_embeddings: np.ndarray | None = None
         self._text_meta: list[dict] | None = None
+        # CLAP's learned temperature, exp(logit_scale), applied to cosine scores
+        self._logit_scale: float = 1.0
+        # (_text_meta it was built from, _catid_groups() result)
+        self._groups: tuple[list[dict], tuple] | None = None
+        # LRU of normalized audio embedding rows; classify runs in worker threads
+        self._audio_cache: OrderedDict[tuple, np.ndarray] = OrderedDict()
+        self._audio_cache_lock = threading.Lock()
+
+    def load_model(self, quantize: bool = False) -> None:
+        """Load CLAP 2023 model (CPU only) and apply librosa patch.
 
-    def load_model(self) -> None:
-        """Load CLAP 2023 model (CPU only) and apply librosa patch."""
+        With ``quantize``, Linear layers run as dynamic int8.
+        """
         from msclap import CLAP
 
-        from app.ml.clap_compat import patch_clap_audio
+        from app.ml.clap_compat import (
+            patch_clap_audio,
+            patch_clap_inference,
+            quantize_clap_int8,
+        )
 
         self._model = CLAP(version="2023", use_cuda=False)
         patch_clap_audio(self._model)
+        patch_clap_inference(self._model)
+        if quantize:
+            quantize_clap_int8(self._model)
+        self._logit_scale = float(self._model.clap.logit_scale.exp())
         logger.info("CLAP 2023 model loaded")
 
     def precompute_embeddings(self, phrases: list[str], meta: list[dict]) -> None:
         """Compute text embeddings for all label phrases."""
-        self._text_embeddings = self._model.get_text_embeddings(phrases)
+        self._text_embeddings = _normalize_rows(
+            _as_numpy(self._model.get_text_embeddings(phrases))
+        )
         self._text_meta = meta
         logger.info("Precomputed %d text embeddings", len(phrases))
 
     def save_embeddings(self, path: str, label_hash: str) -> None:
-        """Save text embeddings + metadata to .npz file."""
+        """Save text embeddings to a .npy file + metadata to a JSON sidecar.
+
+        The sidecar (label hash + phrase metadata) is written last, so a
+        partial save never passes the hash check on load.
+        """
         import numpy as np
 
-        meta_json = json.dumps(self._text_meta)
-        np.savez(
-            path,
-            embeddings=self._text_embeddings,
-            meta_json=np.array([meta_json]),
-            label_hash=np.array([label_hash]),
-        )
+        with open(path, "wb") as f:
+            np.save(f, np.ascontiguousarray(self._text_embeddings, dtype=np.float32))
+        sidecar = {
+            "label_hash": label_hash,
+            "meta": _meta_to_columns(self._text_meta),
+        }
+        with open(_sidecar_path(path), "wb") as f:
+            f.write(json.dumps(sidecar, separators=(",", ":")).encode("utf-8"))
 
     def load_embeddings(self, path: str, expected_hash: str) -> bool:
-        """Load cached embeddings. Returns False if hash mismatch or missing."""
+        """Load cached embeddings. Returns False if hash mismatch or missing.
+
+        The matrix is memory-mapped read-only rather than read into memory;
+        it was saved normalized, so it is used as-is.
+        """
         import numpy as np
-        import torch
 
         try:
-            data = np.load(path, allow_pickle=False)
-            stored_hash = str(data["label_hash"][0])
-            if stored_hash != expected_hash:
+            with open(_sidecar_path(path), "rb") as f:
+                sidecar = json.loads(f.read())
+            if sidecar.get("label_hash") != expected_hash:
                 logger.info("Embedding cache hash mismatch, will recompute")
                 return False
-            # Convert back to torch tensor — compute_similarity requires it
-            self._text_embeddings = torch.from_numpy(data["embeddings"])
-            self._text_meta = json.loads(str(data["meta_json"][0]))
-            logger.info("Loaded %d cached text embeddings", len(self._text_meta))
-            return True
-        except (FileNotFoundError, KeyError):
+            embeddings = np.load(path, mmap_mode="r", allow_pickle=False)
+            meta = _meta_from_columns(sidecar["meta"])
+            if embeddings.ndim != 2 or embeddings.shape[0] != len(meta):
+                logger.info("Embedding cache is inconsistent, will recompute")
+                return False
+        except (OSError, ValueError, KeyError, TypeError):
             return False
 
+        self._text_embeddings = embeddings
+        self._text_meta = meta
+        logger.info("Loaded %d cached text embeddings", len(meta))
+        return True
+
     def classify(self, audio_path: str, top_n: int = 5) -> list[ClassificationMatch]:
         """Classify an audio file against precomputed text embeddings."""
+        return self.classify_batch([audio_path], top_n)[0]
+
+    def classify_batch(
+        self, audio_paths: list[str], top_n: int = 5
+    ) -> list[list[ClassificationMatch]]:
+        """Classify several audio files with one CLAP forward pass.
+
+        Returns one match list per path, in input order, each as classify()
+        would return it.
+        """
         import numpy as np
 
-        audio_emb = self._model.get_audio_embeddings([audio_path])
-        similarity = self._model.compute_similarity(audio_emb, self._text_embeddings)
-        squeezed = similarity.squeeze(0)
-        if hasattr(squeezed, "detach"):
-            squeezed = squeezed.detach()
-        logits = (
-            squeezed.numpy() if hasattr(squeezed, "numpy") else np.asarray(squeezed)
-        )
+        audio = self._audio_embeddings(audio_paths)
+        # Cosine similarity of every file against every phrase in one matrix
+        # product (what msclap's compute_similarity does, minus re-normalizing
+        # the text side)
+        sims = audio @ self._text_embeddings.T
+
+        # Max per CatID in one pass over the phrase-ordered similarities. The
+        # logit scale is positive, so it is applied after the max, to the
+        # much narrower per-CatID array.
+        order, starts, group_meta = self._catid_groups()
+        if order is not None:
+            sims = sims[:, order]
+        best = np.maximum.reduceat(sims, starts, axis=1)
+        best *= self._logit_scale
+        return [_top_matches(scores, group_meta, top_n) for scores in best]
+
+    def _audio_embeddings(self, audio_paths: list[str]) -> np.ndarray:
+        """Normalized audio embeddings, one row per path.
+
+        Rows for unchanged files come from the LRU cache; the rest are
+        encoded together in one call. Files that can't be stat'ed are always
+        encoded (and left for the model to report).
+        """
+        import numpy as np
+
+        keys = [_audio_cache_key(p) for p in audio_paths]
+        rows: list[np.ndarray | None] = [None] * len(audio_paths)
+        with self._audio_cache_lock:
+            for i, key in enumerate(keys):
+                if key is not None and key in self._audio_cache:
+                    self._audio_cache.move_to_end(key)
+                    rows[i] = self._audio_cache[key]
+
+        missing = [i for i, row in enumerate(rows) if row is None]
+        if missing:
+            emb = self._model.get_audio_embeddings([audio_paths[i] for i in missing])
+            encoded = _normalize_rows(np.atleast_2d(_as_numpy(emb)))
+            with self._audio_cache_lock:
+                for i, row in zip(missing, encoded, strict=True):
+                    rows[i] = row
+                    if keys[i] is not None:
+                        self._audio_cache[keys[i]] = row
+                        self._audio_cache.move_to_end(keys[i])
+                while len(self._audio_cache) > _AUDIO_CACHE_SIZE:
+                    self._audio_cache.popitem(last=False)
+        return np.stack(rows)
+
+    def _catid_groups(self) -> tuple[np.ndarray | None, np.ndarray, list[dict]]:
+        """Group phrase rows by CatID for the vectorized per-CatID max.
+
+        Returns (order, starts, group_meta): after reordering logits by order
+        (None when each CatID's phrases are already adjacent, as built by
+        flatten_phrases), group g is the run starting at starts[g] and is
+        described by group_meta[g]. Groups follow first-seen CatID order.
+        Cached until _text_meta is replaced.
+        """
+        import numpy as np
+
+        meta = self._text_meta
+        if self._groups is not None and self._groups[0] is meta:
+            return self._groups[1]
+
+        first_seen: dict[str, int] = {}
+        for i, m in enumerate(meta):
+            first_seen.setdefault(m["cat_id"], i)
+        rank = {cid: r for r, cid in enumerate(first_seen)}
+        keys = np.array([rank[m["cat_id"]] for m in meta], dtype=np.intp)
 
-        # Group by CatID, take max logit per CatID
-        catid_best: dict[str, tuple[float, dict]] = {}
-        for i, meta in enumerate(self._text_meta):
-            cid = meta["cat_id"]
-            if cid not in catid_best or logits[i] > catid_best[cid][0]:
-                catid_best[cid] = (float(logits[i]), meta)
-
-        # Sort by raw logit descending, take top_n, softmax only over those
-        sorted_items = sorted(catid_best.items(), key=lambda x: x[1][0], reverse=True)
-        top_items = sorted_items[:top_n]
-        top_logits = np.array([score for _, (score, _) in top_items])
-        top_probs = _softmax(top_logits)
-
-        return [
-            ClassificationMatch(
-                cat_id=cid,
-                category=meta["category"],
-                subcategory=meta["subcategory"],
-                category_full=f"{meta['category']}-{meta['subcategory']}",
-                confidence=round(float(top_probs[i]), 6),
-            )
-            for i, (cid, (_, meta)) in enumerate(top_items)
-        ]
+        order = np.argsort(keys, kind="stable")
+        starts = np.flatnonzero(np.diff(keys[order], prepend=-1))
+        if np.array_equal(order, np.arange(len(meta))):
+            order = None
+        groups = (order, starts, [meta[i] for i in first_seen.values()])
+        self._groups = (meta, groups)
+        return groups
 
     def is_ready(self) -> bool:
         return self._model is not None and self._text_embeddings is not None
@@ -1,5 +1,6 @@
 """Build CLAP text labels from UCS engine data for zero-shot classification."""
 
+import functools
 import hashlib
 import json
 import logging
@@ -25,19 +26,15 @@ class LabelEntry:
 # Curated acoustic descriptions (D053)
 # ---------------------------------------------------------------------------
 
-_descriptions_cache: dict[str, str] | None = None
-
 
+@functools.cache
 def _load_descriptions() -> dict[str, str]:
-    """Load curated acoustic descriptions from JSON, cached at module level."""
-    global _descriptions_cache
-    if _descriptions_cache is not None:
-        return _descriptions_cache
+    """Load curated acoustic descriptions from JSON (once per process)."""
     pkg = resources.files("app.ml")
-    data = json.loads(pkg.joinpath("acoustic_descriptions.json").read_text("utf-8"))
-    _descriptions_cache = data["descriptions"]
-    logger.info("Loaded %d curated acoustic descriptions", len(_descriptions_cache))
-    return _descriptions_cache
+    data = json.loads(pkg.joinpath("acoustic_descriptions.json").read_bytes())
+    descriptions = data["descriptions"]
+    logger.info("Loaded %d curated acoustic descriptions", len(descriptions))
+    return descriptions
 
 
 def _get_description(cat_id: str, fallback: str) -> str:
@@ -64,8 +61,9 @@ def build_labels() -> list[LabelEntry]:
     When curated == raw (unknown CatID fallback), deduplicates to one phrase.
     """
     entries: list[LabelEntry] = []
+    descriptions = _load_descriptions()
     for info in get_all_catinfo():
-        curated = _get_description(info.cat_id, info.explanation)
+        curated = descriptions.get(info.cat_id, info.explanation)
         phrases = [f"{_PROMPT_PREFIX}{curated}"]
         if curated != info.explanation:
             phrases.append(f"{_PROMPT_PREFIX}{info.explanation}")
@@ -85,25 +83,31 @@ def flatten_phrases(labels: list[LabelEntry]) -> tuple[list[str], list[dict]]:
 
     Returns:
         (phrases, meta) where meta[i] maps to phrases[i] with keys:
-        cat_id, category, subcategory.
+        cat_id, category, subcategory. Phrases of the same entry share one
+        (read-only) meta dict.
     """
     phrases: list[str] = []
     meta: list[dict] = []
     for entry in labels:
+        entry_meta = {
+            "cat_id": entry.cat_id,
+            "category": entry.category,
+            "subcategory": entry.subcategory,
+        }
         for phrase in entry.phrases:
             phrases.append(phrase)
-            meta.append(
-                {
-                    "cat_id": entry.cat_id,
-                    "category": entry.category,
-                    "subcategory": entry.subcategory,
-                }
-            )
+            meta.append(entry_meta)
     return phrases, meta
 
 
 def compute_labels_hash(labels: list[LabelEntry]) -> str:
-    """SHA-256 of sorted phrases for cache invalidation."""
-    all_phrases = sorted(p for entry in labels for p in entry.phrases)
-    content = "\n".join(all_phrases).encode("utf-8")
-    return hashlib.sha256(content).hexdigest()
+    """BLAKE2b-256 of sorted phrases for cache invalidation.
+
+    Only used to detect label changes, so a fast non-SHA hash is fine;
+    phrases are fed one at a time instead of joined into one string.
+    """
+    hasher = hashlib.blake2b(digest_size=32)
+    for phrase in sorted(p for entry in labels for p in entry.phrases):
+        hasher.update(phrase.encode("utf-8"))
+        hasher.update(b"\n")
+    return hasher.hexdigest()
@@ -1,15 +1,29 @@
 """ML model manager — singleton pattern for background model loading."""
 
+import importlib
 import logging
 import os
 import threading
+from concurrent.futures import ThreadPoolExecutor
 
 from app import paths
 from app.ml.captioner import CLAPCaptioner
 from app.ml.classifier import CLAPClassifier
+from app.services.settings import get_settings
 
 logger = logging.getLogger(__name__)
 
+# Heavy ML imports, warmed on the loader thread so the first request doesn't
+# pay for them (librosa.core.audio is lazily loaded on first librosa.load)
+_PRELOAD_MODULES = (
+    "numpy",
+    "torch",
+    "soundfile",
+    "librosa",
+    "librosa.core.audio",
+    "msclap",
+)
+
 # ---------------------------------------------------------------------------
 # Module-level singletons
 # ---------------------------------------------------------------------------
@@ -17,9 +31,17 @@ logger = logging.getLogger(__name__)
 _classifier: CLAPClassifier | None = None
 _captioner: CLAPCaptioner | None = None
 _loading: bool = False
-_ready: bool = False
 _error: str | None = None
 _status_message: str = ""
+# Tags cached analysis results: CLAP version, then the label hash (which
+# carries the int8 mode) once the pipeline has loaded
+_analysis_version: str = "2023"
+# int8 mode chosen by _load_pipeline; the captioner reuses it so both models
+# (and the analysis version above) agree until restart
+_quantize: bool | None = None
+# Set once _classifier is published; readers check it without taking _lock
+_ready_event = threading.Event()
+# Serializes the writers (classifier publish, lazy captioner load)
 _lock = threading.Lock()
 
 
@@ -56,26 +78,37 @@ def get_status() -> dict:
 
 def get_classifier() -> CLAPClassifier:
     """Return the loaded classifier. Raises RuntimeError if not ready."""
-    with _lock:
-        if not _ready or _classifier is None:
-            raise RuntimeError("Classifier not ready")
-        return _classifier
+    cls = _classifier
+    if not _ready_event.is_set() or cls is None:
+        raise RuntimeError("Classifier not ready")
+    return cls
 
 
 def get_captioner() -> CLAPCaptioner:
     """Lazy-load and return the captioner."""
     global _captioner
+    cap = _captioner
+    if cap is not None:
+        return cap
     with _lock:
         if _captioner is None:
-            _captioner = CLAPCaptioner()
-            _captioner.load_model()
+            cap = CLAPCaptioner()
+            quantize = _quantize
+            if quantize is None:
+                quantize = get_settings().clap_int8
+            cap.load_model(quantize=quantize)
+            _captioner = cap
             logger.info("CLAPCaptioner lazy-loaded")
     return _captioner
 
 
 def is_ready() -> bool:
-    with _lock:
-        return _ready
+    return _ready_event.is_set()
+
+
+def get_analysis_version() -> str:
+    """Version tag for cached analysis results from the loaded models."""
+    return _analysis_version
 
 
 # ---------------------------------------------------------------------------
@@ -100,39 +133,72 @@ def _load_wrapper() -> None:
 
 
 def _load_pipeline() -> None:
-    """Load CLAP model, build labels, precompute/cache embeddings."""
-    global _classifier, _ready, _status_message
+    """Load CLAP model, build labels, precompute/cache embeddings.
 
-    from app.ml.label_builder import (
-        build_labels,
-        compute_labels_hash,
-        flatten_phrases,
-    )
+    Labels are built on a second thread while the model loads; the two are
+    independent until the embedding cache check.
+    """
+    global _analysis_version, _quantize, _status_message
 
-    _status_message = "Loading CLAP model..."
-    classifier = CLAPClassifier()
-    classifier.load_model()
+    quantize = get_settings().clap_int8
+    _quantize = quantize
 
-    _status_message = "Building UCS labels..."
-    labels = build_labels()
-    label_hash = compute_labels_hash(labels)
-    phrases, meta = flatten_phrases(labels)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        labels_future = executor.submit(_prepare_labels, quantize)
+
+        _status_message = "Importing ML libraries..."
+        _preload_modules()
+
+        _status_message = "Loading CLAP model..."
+        classifier = CLAPClassifier()
+        classifier.load_model(quantize=quantize)
+
+        _status_message = "Building UCS labels..."
+        label_hash, phrases, meta = labels_future.result()
+    _analysis_version = f"2023:{label_hash}"
 
     # Try loading from cache
     cache_dir = paths.get_cache_dir()
-    embeddings_file = os.path.join(cache_dir, "text_embeddings.npz")
+    embeddings_file = os.path.join(cache_dir, "text_embeddings.npy")
     os.makedirs(cache_dir, exist_ok=True)
     if classifier.load_embeddings(embeddings_file, label_hash):
         _status_message = "Loaded cached embeddings"
-        with _lock:
-            _classifier = classifier
-            _ready = True
+        _publish_classifier(classifier)
         return
 
     _status_message = f"Computing text embeddings ({len(phrases)} phrases)..."
     classifier.precompute_embeddings(phrases, meta)
     classifier.save_embeddings(embeddings_file, label_hash)
+    _publish_classifier(classifier)
+    _status_message = "Models ready"
+
+
+def _prepare_labels(quantize: bool) -> tuple[str, list[str], list[dict]]:
+    """Build UCS labels; return (cache hash, phrases, per-phrase meta)."""
+    from app.ml.label_builder import (
+        build_labels,
+        compute_labels_hash,
+        flatten_phrases,
+    )
+
+    labels = build_labels()
+    label_hash = compute_labels_hash(labels)
+    if quantize:
+        # int8 layers shift the embeddings, so cache them separately
+        label_hash += ":int8"
+    phrases, meta = flatten_phrases(labels)
+    return label_hash, phrases, meta
+
+
+def _publish_classifier(classifier: CLAPClassifier) -> None:
+    """Make a fully loaded classifier visible, then flag it ready."""
+    global _classifier
     with _lock:
         _classifier = classifier
-        _ready = True
-    _status_message = "Models ready"
+        _ready_event.set()
+
+
+def _preload_modules() -> None:
+    """Import the ML stack up front; the model code imports it lazily."""
+    for name in _PRELOAD_MODULES:
+        importlib.import_module(name)
@@ -1,6 +1,7 @@
 """Tier 1 + Tier 2 suggestion generation from CLAP classification results."""
 
 import re
+from collections.abc import Iterable
 
 from app.models import ClassificationMatch, FileRecord, Suggestion, SuggestionsResult
 from app.services.settings import get_settings
@@ -10,6 +11,10 @@ from app.ucs.filename import generate_filename
 # Articles to strip from caption when extracting fx_name
 _ARTICLES = frozenset({"a", "an", "the", "of", "in", "on", "at", "to", "is", "and"})
 
+# Caption words, and how many meaningful ones make up an fx_name
+_WORD_RE = re.compile(r"[A-Za-z]+")
+_FX_NAME_MAX_WORDS = 6
+
 
 def generate_tier1_suggestions(
     classification: list[ClassificationMatch],
@@ -20,15 +25,29 @@ def generate_tier1_suggestions(
     """Generate Tier 1 metadata suggestions from CLAP classification."""
     if not classification:
         return SuggestionsResult()
+    return _tier1_from_derived(
+        classification[0],
+        _derived_suggestions(classification[0].cat_id, creator_id, source_id),
+    )
 
-    top = classification[0]
-    conf = top.confidence
 
-    keywords_suggestion = _build_keywords_suggestion(top.cat_id)
-    filename_suggestion = _build_filename_suggestion(
-        top.cat_id, creator_id=creator_id, source_id=source_id
+def _derived_suggestions(
+    cat_id: str, creator_id: str | None, source_id: str | None
+) -> tuple[Suggestion | None, Suggestion | None]:
+    """Keywords and filename suggestions, which depend only on the CatID."""
+    return (
+        _build_keywords_suggestion(cat_id),
+        _build_filename_suggestion(cat_id, creator_id=creator_id, source_id=source_id),
     )
 
+
+def _tier1_from_derived(
+    top: ClassificationMatch,
+    derived: tuple[Suggestion | None, Suggestion | None],
+) -> SuggestionsResult:
+    """Assemble Tier 1 suggestions for the top match."""
+    conf = top.confidence
+    keywords_suggestion, filename_suggestion = derived
     return SuggestionsResult(
         category=Suggestion(value=top.category, source="clap", confidence=conf),
         subcategory=Suggestion(value=top.subcategory, source="clap", confidence=conf),
@@ -89,23 +108,36 @@ def hydrate_suggestions(record: FileRecord) -> FileRecord:
     Used when loading files from DB that have analysis but no suggestions
     (suggestions are computed at analysis time but not persisted).
     """
-    if record.analysis is None:
-        return record
+    return hydrate_suggestions_batch([record])[0]
 
-    classification = record.analysis.classification
-    if not classification:
-        return record
 
-    settings = get_settings()
-    suggestions = generate_tier1_suggestions(
-        classification,
-        creator_id=settings.creator_id or None,
-        source_id=settings.source_id or None,
-    )
-    if record.analysis.caption:
-        suggestions = enrich_with_caption(suggestions, record.analysis.caption)
+def hydrate_suggestions_batch(records: Iterable[FileRecord]) -> list[FileRecord]:
+    """hydrate_suggestions() over many records in one pass.
 
-    return record.model_copy(update={"suggestions": suggestions})
+    Settings are read once, and the UCS synonym and filename lookups are
+    shared between records classified under the same CatID.
+    """
+    settings = get_settings()
+    creator_id = settings.creator_id or None
+    source_id = settings.source_id or None
+    derived_by_cat: dict[str, tuple[Suggestion | None, Suggestion | None]] = {}
+
+    hydrated: list[FileRecord] = []
+    for record in records:
+        analysis = record.analysis
+        if analysis is None or not analysis.classification:
+            hydrated.append(record)
+            continue
+        top = analysis.classification[0]
+        derived = derived_by_cat.get(top.cat_id)
+        if derived is None:
+            derived = _derived_suggestions(top.cat_id, creator_id, source_id)
+            derived_by_cat[top.cat_id] = derived
+        suggestions = _tier1_from_derived(top, derived)
+        if analysis.caption:
+            suggestions = enrich_with_caption(suggestions, analysis.caption)
+        hydrated.append(record.model_copy(update={"suggestions": suggestions}))
+    return hydrated
 
 
 def _extract_fx_name(caption: str) -> str:
@@ -113,7 +145,13 @@ def _extract_fx_name(caption: str) -> str:
 
     Takes first 5-6 meaningful words, strips articles, capitalizes.
     """
-    words = re.findall(r"[a-zA-Z]+", caption)
-    meaningful = [w for w in words if w.lower() not in _ARTICLES]
-    selected = meaningful[:6]
-    return " ".join(w.capitalize() for w in selected)
+    selected: list[str] = []
+    for match in _WORD_RE.finditer(caption):
+        word = match.group()
+        # clapcap captions are mostly lowercase already; skip the copy then
+        if (word if word.islower() else word.lower()) in _ARTICLES:
+            continue
+        selected.append(word.capitalize())
+        if len(selected) == _FX_NAME_MAX_WORDS:
+            break
+    return " ".join(selected)
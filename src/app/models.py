@@ -291,3 +291,37 @@ class BatchUpdateResponse(BaseModel):
 
     updated: list[FileRecord]
     count: int
+
+
+class BatchAnalyzeProgress(BaseModel):
+    """SSE "progress" event payload for POST /files/analyze-batch."""
+
+    file_id: str
+    filename: str
+    current: int
+    total: int
+    status: str = "analyzing"
+
+
+class BatchAnalyzeResult(BaseModel):
+    """SSE "result" event payload — one successfully analyzed file."""
+
+    file_id: str
+    success: bool = True
+    file: FileRecord
+
+
+class BatchAnalyzeError(BaseModel):
+    """SSE "error" event payload — one file that failed analysis."""
+
+    file_id: str
+    success: bool = False
+    error: str
+
+
+class BatchAnalyzeComplete(BaseModel):
+    """SSE "complete" event payload — batch totals."""
+
+    analyzed_count: int
+    failed_count: int
+    total_time_ms: int
@@ -1,33 +1,43 @@
 """Analysis endpoints — single file and batch (SSE)."""
 
 import asyncio
-import json
+import functools
 import logging
-import math
 import time
 from collections.abc import AsyncGenerator
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 
+import numpy as np
 from fastapi import APIRouter
 from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, TypeAdapter
+from pydantic_core import to_json
 
 from app.errors import AppError, FILE_NOT_FOUND, MODEL_NOT_READY
 
 from app.db.repository import (
     get_all_files,
+    get_cached_analyses,
     get_cached_analysis,
     get_file,
+    get_files_by_ids,
     store_cached_analysis,
-    update_file,
+    update_file_returning,
+    write_transaction,
 )
 from app.ml import model_manager
 from app.ml.suggestions import enrich_with_caption, generate_tier1_suggestions
 from app.services.flagging import should_flag
-from app.services.settings import get_settings
+from app.services.settings import AppSettings, get_settings
 from app.models import (
     AnalysisResult,
     AnalyzeRequest,
+    BatchAnalyzeComplete,
+    BatchAnalyzeError,
+    BatchAnalyzeProgress,
     BatchAnalyzeRequest,
+    BatchAnalyzeResult,
     ClassificationMatch,
     FileRecord,
 )
@@ -47,6 +57,48 @@ _FILENAME_ALPHA = 10.0
 # Minimum keyword match score to apply boost (prevents spurious single-token boosts).
 _FILENAME_MIN_SCORE = 2
 
+# Codec for analysis_cache.classification. pydantic-core encodes/validates
+# the whole list in one call, without per-match dicts.
+_CACHED_CLASSIFICATION = TypeAdapter(list[ClassificationMatch])
+
+# CLAP release recorded in AnalysisResult.model_version
+_MODEL_VERSION = "2023"
+
+# Columns batch analysis reads from each row (for _run_analysis, prefill and
+# flagging). Loading only these skips decoding the JSON metadata columns.
+_BATCH_ROW_COLUMNS = (
+    "id",
+    "path",
+    "filename",
+    "file_hash",
+    "category",
+    "creator_id",
+    "source_id",
+)
+
+# Files sent through CLAP together in batch analysis (one forward pass each).
+_CLASSIFY_BATCH_SIZE = 8
+
+# Files of a batch analyzed concurrently, so one file's DB round-trips and
+# captioning overlap another's. Model calls themselves still run one at a
+# time on _INFERENCE_POOL; each already uses all CPU cores.
+_ANALYZE_CONCURRENCY = 4
+# Single worker thread for CLAP classify/caption calls. Queued calls wait in
+# the executor rather than parking default-pool threads on a lock.
+_INFERENCE_POOL = ThreadPoolExecutor(max_workers=1, thread_name_prefix="clap")
+
+# Batch progress frames are throttled to roughly this many per batch, plus
+# at most one per interval (seconds), instead of one per file.
+_PROGRESS_STEPS = 100
+_PROGRESS_INTERVAL = 0.25
+
+# Seconds of stream silence before a comment frame is sent, so proxies
+# (nginx, Cloudflare) don't drop the connection during a slow file.
+_SSE_PING_INTERVAL = 15.0
+_SSE_PING = b": keep-alive\n\n"
+# Stop intermediaries from caching or buffering progress events
+_SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
 # Display weight for keyword evidence in blended confidence.
 # At alpha=2.0, a full keyword match roughly doubles the log-odds.
 _DISPLAY_ALPHA = 2.0
@@ -66,15 +118,15 @@ async def analyze_batch(req: BatchAnalyzeRequest):
         raise AppError(MODEL_NOT_READY, 503, "Models still loading")
 
     if req.file_ids:
-        rows = [await get_file(fid) for fid in req.file_ids]
-        rows = [r for r in rows if r is not None]
+        rows = await get_files_by_ids(req.file_ids, columns=_BATCH_ROW_COLUMNS)
     else:
-        rows = await get_all_files()
+        rows = await get_all_files(columns=_BATCH_ROW_COLUMNS)
 
     analyze_req = AnalyzeRequest(tiers=req.tiers, force=req.force)
     return StreamingResponse(
-        _stream_analysis(rows, analyze_req),
+        _with_keepalive(_stream_analysis(rows, analyze_req)),
         media_type="text/event-stream",
+        headers=_SSE_HEADERS,
     )
 
 
@@ -93,7 +145,7 @@ async def analyze_file(file_id: str, req: AnalyzeRequest) -> FileRecord:
     if row is None:
         raise AppError(FILE_NOT_FOUND, 404, "File not found")
 
-    classification, caption = await _run_analysis(row, req)
+    classification, caption, fresh = await _run_analysis(row, req)
     settings = get_settings()
     suggestions = generate_tier1_suggestions(
         classification,
@@ -106,18 +158,18 @@ async def analyze_file(file_id: str, req: AnalyzeRequest) -> FileRecord:
     analysis = AnalysisResult(
         classification=classification,
         caption=caption,
-        model_version="2023",
+        model_version=_MODEL_VERSION,
         analyzed_at=datetime.now(timezone.utc).isoformat(),
     )
 
-    analysis_dict = json.loads(analysis.model_dump_json())
+    analysis_dict = analysis.model_dump(mode="json")
     prefill = _build_prefill_updates(row, settings)
     db_updates: dict = {"analysis": analysis_dict, **prefill}
     if should_flag(classification=classification, category=row.get("category")):
         db_updates["status"] = "flagged"
-    await update_file(file_id, db_updates)
-
-    row = await get_file(file_id)
+    row = await _save_analysis(row, db_updates, fresh, caption)
+    if row is None:
+        raise AppError(FILE_NOT_FOUND, 404, "File not found")
     record = dict_to_file_record(row)
     record.suggestions = suggestions
     return record
@@ -128,7 +180,7 @@ async def analyze_file(file_id: str, req: AnalyzeRequest) -> FileRecord:
 # ---------------------------------------------------------------------------
 
 
-def _build_prefill_updates(row: dict, settings) -> dict:
+def _build_prefill_updates(row: dict, settings: AppSettings) -> dict:
     """Build metadata updates to pre-fill from settings (D064).
 
     Only fills fields that are currently empty in the file record.
@@ -151,103 +203,227 @@ def apply_filename_boost(
     Returns the top *top_n* results sorted by combined score. Confidences are
     renormalized to sum to ~1.0 for display purposes.
     """
-    if not filename:
+    boost_map = _filename_boost_map(filename) if filename else None
+    if boost_map is None:
         return _renormalize_confidence(classification[:top_n])
 
+    n = len(classification)
+    conf = np.fromiter((r.confidence for r in classification), np.float64, count=n)
+    boost = np.fromiter(
+        (boost_map.get(r.cat_id, 0.0) for r in classification), np.float64, count=n
+    )
+    # Stable sort, so equal scores keep CLAP's order
+    top = np.argsort(-(conf + _FILENAME_ALPHA * boost), kind="stable")[:top_n]
+    matches = [classification[i] for i in top]
+    if not boost[top].any():
+        # No keyword evidence among the winners: the softmax blend reduces
+        # to plain renormalization, so skip the log/exp round trip.
+        return _renormalize_confidence(matches)
+    return _blend_confidence(matches, conf[top], boost[top])
+
+
+@functools.lru_cache(maxsize=4096)
+def _filename_boost_map(filename: str) -> dict[str, float] | None:
+    """CatID -> keyword boost in (0, 1] for a filename; None below threshold.
+
+    Cached per filename (a rename is a new key): UCS data is fixed once
+    loaded, and cached re-analysis would otherwise redo the fuzzy match for
+    every file. Callers must not mutate the returned dict.
+    """
     matches = fuzzy_match(filename, top_n=50)
     if not matches or matches[0].score < _FILENAME_MIN_SCORE:
-        return _renormalize_confidence(classification[:top_n])
-
+        return None
     max_score = matches[0].score
-    boost_map = {m.cat_id: m.score / max_score for m in matches}
-
-    scored = [
-        (r, r.confidence + _FILENAME_ALPHA * boost_map.get(r.cat_id, 0.0))
-        for r in classification
-    ]
-    scored.sort(key=lambda x: x[1], reverse=True)
-    top = [r for r, _ in scored[:top_n]]
-    blended = _blend_confidence(top, boost_map)
-    blended.sort(key=lambda m: m.confidence, reverse=True)
-    return blended
+    return {m.cat_id: m.score / max_score for m in matches}
 
 
 def _renormalize_confidence(
     matches: list[ClassificationMatch],
 ) -> list[ClassificationMatch]:
-    """Renormalize confidences to sum to 1.0 (conditional probability over top-N)."""
+    """Renormalize confidences to sum to 1.0 (conditional probability over top-N).
+
+    Sorted by confidence first (dividing by the total keeps the order), so
+    only the returned matches are copied.
+    """
     total = sum(m.confidence for m in matches)
     if total <= 0:
         return matches
-    result = [
-        m.model_copy(update={"confidence": m.confidence / total}) for m in matches
-    ]
-    result.sort(key=lambda m: m.confidence, reverse=True)
-    return result
+    ranked = sorted(matches, key=lambda m: m.confidence, reverse=True)
+    return [m.model_copy(update={"confidence": m.confidence / total}) for m in ranked]
 
 
 def _blend_confidence(
     matches: list[ClassificationMatch],
-    boost_map: dict[str, float],
+    conf: np.ndarray,
+    boost: np.ndarray,
 ) -> list[ClassificationMatch]:
-    """Blend CLAP and keyword scores into display confidence via log-space softmax."""
-    logits = [
-        math.log(max(m.confidence, 1e-10))
-        + _DISPLAY_ALPHA * boost_map.get(m.cat_id, 0.0)
-        for m in matches
-    ]
-    max_logit = max(logits) if logits else 0.0
-    exps = [math.exp(lg - max_logit) for lg in logits]
-    total = sum(exps)
+    """Blend CLAP and keyword scores into display confidence via log-space softmax.
+
+    conf and boost are the matches' CLAP confidences and keyword boosts.
+    Returns copies with the blended confidence, highest first.
+    """
+    if not matches:
+        return []
+    logits = np.log(np.maximum(conf, 1e-10))
+    logits += _DISPLAY_ALPHA * boost
+    exps = np.exp(logits - logits.max())
+    exps /= exps.sum()
     return [
-        m.model_copy(update={"confidence": e / total}) for m, e in zip(matches, exps)
+        matches[i].model_copy(update={"confidence": float(exps[i])})
+        for i in np.argsort(-exps, kind="stable")
     ]
 
 
 async def _run_analysis(
-    row: dict, req: AnalyzeRequest
-) -> tuple[list[ClassificationMatch], str | None]:
+    row: dict,
+    req: AnalyzeRequest,
+    classification: list[ClassificationMatch] | None = None,
+    cache_map: dict[str, dict] | None = None,
+) -> tuple[list[ClassificationMatch], str | None, list[ClassificationMatch] | None]:
     """Run classification (+ optional captioning), using cache when available.
 
-    The cache stores raw CLAP results (top _CLAP_CANDIDATES, no filename boost).
-    Filename keyword boost (D056) is always applied fresh so results reflect
-    the current filename even after renames.
+    Returns (boosted classification, caption, raw results to cache). The cache
+    stores raw CLAP results (top _CLAP_CANDIDATES, no filename boost), and is
+    written by _save_analysis() together with the file record; the third
+    item is None on a cache hit. Filename keyword boost (D056) is always
+    applied fresh so results reflect the current filename even after renames.
+    A *classification* already computed by the caller (batch path) skips
+    both the cache and CLAP, and a *cache_map* prefetched by the caller
+    replaces the per-file cache lookup.
     """
     file_hash = row["file_hash"]
     file_path = row["path"]
     filename = row.get("filename")
 
-    if not req.force:
-        cached = await get_cached_analysis(file_hash)
+    if classification is None and not req.force:
+        if cache_map is not None:
+            cached = cache_map.get(file_hash)
+        else:
+            cached = await _get_current_cached(file_hash)
         if cached is not None:
-            classification = [
-                ClassificationMatch(**m) for m in json.loads(cached["classification"])
-            ]
+            classification = decode_cached_classification(cached["classification"])
             caption = cached.get("caption")
-            return apply_filename_boost(classification, filename), caption
+            return apply_filename_boost(classification, filename), caption, None
 
-    classifier = model_manager.get_classifier()
-    classification = await asyncio.to_thread(
-        classifier.classify, file_path, _CLAP_CANDIDATES
-    )
+    if classification is None:
+        classifier = model_manager.get_classifier()
+        classification = await _run_model(
+            classifier.classify, file_path, _CLAP_CANDIDATES
+        )
 
     caption = None
     if 2 in req.tiers:
         captioner = model_manager.get_captioner()
-        caption = await asyncio.to_thread(captioner.caption, file_path)
+        caption = await _run_model(captioner.caption, file_path)
+
+    return apply_filename_boost(classification, filename), caption, classification
 
-    # Cache raw CLAP results (without filename boost)
-    cls_json = json.dumps([m.model_dump() for m in classification])
-    await store_cached_analysis(file_hash, cls_json, caption, "2023")
 
-    return apply_filename_boost(classification, filename), caption
+async def _save_analysis(
+    row: dict,
+    db_updates: dict,
+    fresh: list[ClassificationMatch] | None,
+    caption: str | None,
+) -> dict | None:
+    """Store the file's analysis and, for fresh results, their cache row.
+
+    Both writes commit together or not at all. Returns the updated record
+    (None if the file was removed).
+    """
+    cache_row = None
+    if fresh is not None:
+        cache_row = encode_cached_classification(fresh)
+    async with write_transaction():
+        if cache_row is not None:
+            # Cache raw CLAP results (without filename boost)
+            await store_cached_analysis(
+                row["file_hash"],
+                cache_row,
+                caption,
+                model_manager.get_analysis_version(),
+            )
+        return await update_file_returning(row["id"], db_updates)
 
 
-async def _analyze_single_for_batch(row: dict, req: AnalyzeRequest) -> dict:
-    """Analyze one file and return the SSE result payload."""
+def encode_cached_classification(matches: list[ClassificationMatch]) -> bytes:
+    """Serialize raw CLAP results for the analysis cache."""
+    return _CACHED_CLASSIFICATION.dump_json(matches)
+
+
+def decode_cached_classification(raw: str | bytes) -> list[ClassificationMatch]:
+    """Parse a cached classification (bytes, or str from older cache rows)."""
+    return _CACHED_CLASSIFICATION.validate_json(raw)
+
+
+async def _run_model(func, *args):
+    """Run a model method on the inference thread, one call at a time."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_INFERENCE_POOL, func, *args)
+
+
+async def _get_current_cached(file_hash: str) -> dict | None:
+    """Cached analysis for a file, unless produced by other models or labels."""
+    cached = await get_cached_analysis(file_hash)
+    if (
+        cached is None
+        or cached["model_version"] != model_manager.get_analysis_version()
+    ):
+        return None
+    return cached
+
+
+async def _prefetch_cached(rows: list[dict]) -> dict[str, dict]:
+    """Current cached analyses for all rows in one query, keyed by file hash."""
+    return await get_cached_analyses(
+        [r["file_hash"] for r in rows],
+        model_version=model_manager.get_analysis_version(),
+    )
+
+
+async def _classify_uncached(
+    rows: list[dict], cache_map: dict[str, dict]
+) -> dict[str, list[ClassificationMatch]]:
+    """Classify the rows missing from cache_map in one CLAP batch call.
+
+    Returns raw results keyed by file id. Cached rows are left out, as is
+    every row if the batch call fails (e.g. one unreadable file), so those go
+    through the per-file path and fail individually.
+    """
+    pending = [r for r in rows if r["file_hash"] not in cache_map]
+    if len(pending) < 2:
+        return {}
+
+    paths = [r["path"] for r in pending]
+    classifier = model_manager.get_classifier()
+    try:
+        results = await _run_model(classifier.classify_batch, paths, _CLAP_CANDIDATES)
+    except Exception:
+        logger.warning(
+            "Batch classification failed, falling back to per-file", exc_info=True
+        )
+        return {}
+    if len(results) != len(pending):
+        return {}
+    return {r["id"]: result for r, result in zip(pending, results)}
+
+
+async def _analyze_single_for_batch(
+    row: dict,
+    req: AnalyzeRequest,
+    settings: AppSettings,
+    analyzed_at: str,
+    classification: list[ClassificationMatch] | None = None,
+    cache_map: dict[str, dict] | None = None,
+) -> BatchAnalyzeResult:
+    """Analyze one file and return the SSE result payload.
+
+    settings, cache_map and the analyzed_at timestamp are computed once per
+    batch by the caller.
+    """
     file_id = row["id"]
-    classification, caption = await _run_analysis(row, req)
-    settings = get_settings()
+    classification, caption, fresh = await _run_analysis(
+        row, req, classification, cache_map
+    )
     suggestions = generate_tier1_suggestions(
         classification,
         creator_id=settings.creator_id or None,
@@ -259,72 +435,123 @@ async def _analyze_single_for_batch(row: dict, req: AnalyzeRequest) -> dict:
     analysis = AnalysisResult(
         classification=classification,
         caption=caption,
-        model_version="2023",
-        analyzed_at=datetime.now(timezone.utc).isoformat(),
+        model_version=_MODEL_VERSION,
+        analyzed_at=analyzed_at,
     )
-    analysis_dict = json.loads(analysis.model_dump_json())
+    analysis_dict = analysis.model_dump(mode="json")
     prefill = _build_prefill_updates(row, settings)
     db_updates: dict = {"analysis": analysis_dict, **prefill}
     if should_flag(classification=classification, category=row.get("category")):
         db_updates["status"] = "flagged"
-    await update_file(file_id, db_updates)
-
-    updated = await get_file(file_id)
+    updated = await _save_analysis(row, db_updates, fresh, caption)
+    if updated is None:
+        raise RuntimeError("File record was removed during analysis")
     record = dict_to_file_record(updated)
     record.suggestions = suggestions
-    return {
-        "file_id": file_id,
-        "success": True,
-        "file": json.loads(record.model_dump_json()),
-    }
+    return BatchAnalyzeResult(file_id=file_id, file=record)
 
 
 async def _stream_analysis(
     rows: list[dict], req: AnalyzeRequest
-) -> AsyncGenerator[str, None]:
+) -> AsyncGenerator[bytes, None]:
     """Async generator yielding SSE events for batch analysis."""
     total = len(rows)
     analyzed = 0
     failed = 0
     start = time.monotonic()
+    limit = asyncio.Semaphore(_ANALYZE_CONCURRENCY)
+    progress_every = max(1, total // _PROGRESS_STEPS)
+    next_progress_at = 0.0
+    settings = get_settings()
+    analyzed_at = datetime.now(timezone.utc).isoformat()
+    # With force the cache is bypassed, so an empty map marks every row a miss
+    cache_map = {} if req.force else await _prefetch_cached(rows)
+
+    async def analyze(
+        row: dict, classification: list[ClassificationMatch] | None
+    ) -> BatchAnalyzeResult:
+        async with limit:
+            return await _analyze_single_for_batch(
+                row, req, settings, analyzed_at, classification, cache_map
+            )
 
-    for i, row in enumerate(rows):
-        await asyncio.sleep(0)
-        file_id = row["id"]
-
-        yield _sse_event(
-            "progress",
-            {
-                "file_id": file_id,
-                "filename": row["filename"],
-                "current": i + 1,
-                "total": total,
-                "status": "analyzing",
-            },
-        )
+    for batch_start in range(0, total, _CLASSIFY_BATCH_SIZE):
+        batch = rows[batch_start : batch_start + _CLASSIFY_BATCH_SIZE]
+        fresh = await _classify_uncached(batch, cache_map)
+        tasks = [asyncio.create_task(analyze(r, fresh.get(r["id"]))) for r in batch]
 
+        # Files run concurrently, but events are emitted in row order
         try:
-            result = await _analyze_single_for_batch(row, req)
-            yield _sse_event("result", result)
-            analyzed += 1
-        except Exception as e:
-            logger.exception("Batch analysis failed for %s", file_id)
-            yield _sse_event(
-                "error", {"file_id": file_id, "success": False, "error": str(e)}
-            )
-            failed += 1
+            for i, (row, task) in enumerate(zip(batch, tasks), start=batch_start):
+                file_id = row["id"]
+                now = time.monotonic()
+                if i % progress_every == 0 or now >= next_progress_at:
+                    next_progress_at = now + _PROGRESS_INTERVAL
+                    yield _sse_event(
+                        "progress",
+                        BatchAnalyzeProgress(
+                            file_id=file_id,
+                            filename=row["filename"],
+                            current=i + 1,
+                            total=total,
+                        ),
+                    )
+
+                try:
+                    result = await task
+                    yield _sse_event("result", result)
+                    analyzed += 1
+                except Exception as e:
+                    logger.exception("Batch analysis failed for %s", file_id)
+                    yield _sse_event(
+                        "error", BatchAnalyzeError(file_id=file_id, error=str(e))
+                    )
+                    failed += 1
+        finally:
+            # Client went away mid-batch: don't leave orphaned analyses running
+            for task in tasks:
+                task.cancel()
 
     elapsed_ms = int((time.monotonic() - start) * 1000)
     yield _sse_event(
         "complete",
-        {
-            "analyzed_count": analyzed,
-            "failed_count": failed,
-            "total_time_ms": elapsed_ms,
-        },
+        BatchAnalyzeComplete(
+            analyzed_count=analyzed, failed_count=failed, total_time_ms=elapsed_ms
+        ),
     )
 
 
-def _sse_event(event: str, data: dict) -> str:
-    """Format a single SSE event."""
-    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+async def _with_keepalive(
+    frames: AsyncGenerator[bytes, None], interval: float = _SSE_PING_INTERVAL
+) -> AsyncGenerator[bytes, None]:
+    """Pass *frames* through, yielding a comment ping whenever one is slow."""
+    pending: asyncio.Future[bytes] | None = None
+    try:
+        while True:
+            if pending is None:
+                pending = asyncio.ensure_future(anext(frames))
+            # asyncio.wait (unlike wait_for) leaves the frame task running
+            done, _ = await asyncio.wait({pending}, timeout=interval)
+            if not done:
+                yield _SSE_PING
+                continue
+            try:
+                frame = pending.result()
+            except StopAsyncIteration:
+                return
+            finally:
+                pending = None
+            yield frame
+    finally:
+        if pending is not None:
+            pending.cancel()
+            try:
+                await pending
+            except (asyncio.CancelledError, StopAsyncIteration):
+                pass
+        await frames.aclose()
+
+
+def _sse_event(event: str, data: BaseModel) -> bytes:
+    """Format a single SSE event as bytes (Starlette sends bytes as-is)."""
+    return b"event: " + event.encode() + b"\ndata: " + to_json(data) + b"\n\n"
@@ -1,16 +1,18 @@
 """File import and retrieval endpoints."""
 
+import asyncio
 import errno
-import json
 import logging
 import os
 import shutil
+import stat
 import time
+from collections.abc import AsyncIterator
 from datetime import datetime, timezone
 from pathlib import Path
 
-from fastapi import APIRouter
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
 
 from app.errors import (
     AppError,
@@ -25,15 +27,25 @@ from app.errors import (
 
 from app.db.mappers import dict_to_file_record
 from app.db.repository import (
+    bulk_import_mode,
     delete_files_by_paths,
-    get_all_files,
-    get_cached_analysis,
+    get_cached_analyses,
     get_file,
-    get_file_by_path,
-    update_file,
+    get_files_by_ids,
+    get_files_by_paths,
+    get_paths_under,
+    iter_files,
+    update_file_returning,
+    update_files_returning,
     upsert_file,
+    upsert_files_many,
+)
+from app.metadata.reader import (
+    compute_file_hash,
+    compute_file_hashes,
+    read_metadata,
+    read_metadata_many,
 )
-from app.metadata.reader import compute_file_hash, read_metadata
 from app.metadata.writer import verify_write, write_metadata
 from app.models import (
     AnalysisResult,
@@ -53,14 +65,23 @@ from app.models import (
     SaveRequest,
     SaveResponse,
 )
-from app.ml.suggestions import hydrate_suggestions
-from app.routers.analysis import apply_filename_boost
+from app.ml import model_manager
+from app.ml.suggestions import hydrate_suggestions, hydrate_suggestions_batch
+from app.routers.analysis import apply_filename_boost, decode_cached_classification
 from app.services.flagging import should_flag
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/files", tags=["files"])
 
+# Records hydrated together per list_files body chunk
+_HYDRATE_CHUNK_SIZE = 200
+# Files of a save batch written concurrently (disk-bound; more just thrashes)
+_SAVE_CONCURRENCY = 4
+# Rename targets claimed by in-flight saves (normcased), so concurrent saves
+# to the same suggested filename conflict instead of overwriting each other
+_pending_rename_targets: set[str] = set()
+
 
 @router.post("/import", response_model=ImportResponse)
 async def import_files(req: ImportRequest) -> ImportResponse:
@@ -72,25 +93,15 @@ async def import_files(req: ImportRequest) -> ImportResponse:
     start = time.monotonic()
 
     # Discover WAV files
-    pattern = "**/*.wav" if req.recursive else "*.wav"
-    wav_paths = sorted(directory.glob(pattern))
-
-    records: list[FileRecord] = []
-    skipped_paths: list[str] = []
-    seen_paths: set[str] = set()
+    root = os.path.realpath(directory)
+    found = await asyncio.to_thread(_find_wav_files, root, req.recursive)
 
-    for wav_path in wav_paths:
-        abs_path = str(wav_path.resolve())
-        seen_paths.add(abs_path)
-        try:
-            record = await _import_single_file(wav_path, abs_path)
-            records.append(record)
-        except Exception:
-            logger.warning("Skipping unreadable file: %s", abs_path, exc_info=True)
-            skipped_paths.append(abs_path)
+    targets = [(Path(path), abs_path) for path, abs_path in found]
+    seen_paths = {abs_path for _, abs_path in targets}
+    records, skipped_paths = await _import_wav_files(targets)
 
     # Remove stale records from this directory
-    await _remove_stale_records(str(directory.resolve()), seen_paths)
+    await _remove_stale_records(root, seen_paths)
 
     elapsed_ms = int((time.monotonic() - start) * 1000)
     return ImportResponse(
@@ -102,25 +113,50 @@ async def import_files(req: ImportRequest) -> ImportResponse:
     )
 
 
+def _find_wav_files(root: str, recursive: bool) -> list[tuple[str, str]]:
+    """Return sorted (path, resolved path) pairs for the WAV files under root.
+
+    Walks with os.scandir so the file/dir checks reuse the directory
+    listing; only symlinked files cost an extra resolve.
+    """
+    found: list[tuple[str, str]] = []
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive:
+                            stack.append(entry.path)
+                    elif entry.name.lower().endswith(".wav") and entry.is_file():
+                        abs_path = entry.path
+                        if entry.is_symlink():
+                            abs_path = os.path.realpath(abs_path)
+                        found.append((entry.path, abs_path))
+        except OSError:
+            logger.warning("Skipping unreadable directory: %s", current)
+    # Same order as sorting Paths: component-wise, case-folded on Windows
+    found.sort(key=lambda pair: os.path.normcase(pair[0]).split(os.sep))
+    return found
+
+
 @router.post("/import-files", response_model=ImportResponse)
 async def import_individual_files(req: ImportFilesRequest) -> ImportResponse:
     """Import a list of individual WAV file paths, store in DB."""
     start = time.monotonic()
-    records: list[FileRecord] = []
-    skipped_paths: list[str] = []
+    targets: list[tuple[Path, str]] = []
+    invalid_paths: list[str] = []
 
     for path_str in req.paths:
         wav_path = Path(path_str)
         if not wav_path.is_file() or wav_path.suffix.lower() != ".wav":
-            skipped_paths.append(path_str)
+            invalid_paths.append(path_str)
             continue
-        abs_path = str(wav_path.resolve())
-        try:
-            record = await _import_single_file(wav_path, abs_path)
-            records.append(record)
-        except Exception:
-            logger.warning("Skipping unreadable file: %s", abs_path, exc_info=True)
-            skipped_paths.append(abs_path)
+        targets.append((wav_path, str(wav_path.resolve())))
+
+    records, skipped_paths = await _import_wav_files(targets)
+    skipped_paths = invalid_paths + skipped_paths
 
     elapsed_ms = int((time.monotonic() - start) * 1000)
     return ImportResponse(
@@ -139,34 +175,69 @@ async def list_files(
     search: str | None = None,
     offset: int = 0,
     limit: int = 1000,
-) -> dict:
-    """List all file records with optional filters."""
-    rows = await get_all_files(
+) -> StreamingResponse:
+    """List all file records with optional filters.
+
+    The {"files": [...], "count": n} body is streamed record by record, so
+    only one fetch batch of rows is held in memory at a time.
+    """
+    rows = iter_files(
         status=status, category=category, search=search, offset=offset, limit=limit
     )
-    files = [hydrate_suggestions(dict_to_file_record(r)) for r in rows]
-    return {"files": files, "count": len(files)}
+    # Run the query before the 200 goes out, so its errors still get a
+    # proper error response instead of a truncated body
+    first = await anext(rows, None)
+    return StreamingResponse(
+        _stream_file_list(first, rows), media_type="application/json"
+    )
+
+
+async def _stream_file_list(
+    first: dict | None, rows: AsyncIterator[dict]
+) -> AsyncIterator[str]:
+    """Yield the list_files JSON body in pieces, starting from its first row."""
+    yield '{"files":['
+    count = 0
+    chunk = [dict_to_file_record(first)] if first is not None else []
+    async for row in rows:
+        chunk.append(dict_to_file_record(row))
+        if len(chunk) == _HYDRATE_CHUNK_SIZE:
+            yield _file_list_items(chunk, first=not count)
+            count += len(chunk)
+            chunk = []
+    if chunk:
+        yield _file_list_items(chunk, first=not count)
+        count += len(chunk)
+    yield f'],"count":{count}}}'
+
+
+def _file_list_items(records: list[FileRecord], *, first: bool) -> str:
+    """Hydrate a chunk of records and join them into JSON array items."""
+    body = ",".join(r.model_dump_json() for r in hydrate_suggestions_batch(records))
+    return body if first else "," + body
 
 
 @router.post("/save-batch", response_model=BatchSaveResponse)
 async def save_batch(body: BatchSaveRequest) -> BatchSaveResponse:
-    """Save multiple files in sequence, collecting per-file results."""
-    results: list[BatchSaveResult] = []
-    for fid in body.file_ids:
-        try:
-            resp = await save_file(fid, SaveRequest(rename=body.rename))
-            results.append(
-                BatchSaveResult(
-                    id=fid,
-                    success=True,
-                    renamed=resp.renamed,
-                    new_path=resp.new_path,
-                )
-            )
-        except AppError as e:
-            results.append(BatchSaveResult(id=fid, success=False, error=e.detail))
-        except Exception as e:
-            results.append(BatchSaveResult(id=fid, success=False, error=str(e)))
+    """Save multiple files concurrently, collecting per-file results in order."""
+    limit = asyncio.Semaphore(_SAVE_CONCURRENCY)
+    # A repeated id must not write the same WAV twice at once; its saves
+    # run one after another, in request order
+    file_locks = {fid: asyncio.Lock() for fid in body.file_ids}
+
+    async def save_one(fid: str) -> BatchSaveResult:
+        async with file_locks[fid], limit:
+            try:
+                resp = await save_file(fid, SaveRequest(rename=body.rename))
+            except AppError as e:
+                return BatchSaveResult(id=fid, success=False, error=e.detail)
+            except Exception as e:
+                return BatchSaveResult(id=fid, success=False, error=str(e))
+        return BatchSaveResult(
+            id=fid, success=True, renamed=resp.renamed, new_path=resp.new_path
+        )
+
+    results = await asyncio.gather(*(save_one(fid) for fid in body.file_ids))
     saved = sum(1 for r in results if r.success)
     return BatchSaveResponse(
         results=results, saved_count=saved, failed_count=len(results) - saved
@@ -181,28 +252,16 @@ async def apply_metadata(body: ApplyMetadataRequest) -> ApplyMetadataResponse:
         raise AppError(FILE_NOT_FOUND, 404, f"Source not found: {body.source_id}")
 
     # Validate field names
-    invalid = set(body.fields) - set(_META_KEYS)
+    invalid = set(body.fields) - _META_KEY_SET
     if invalid:
         raise AppError(VALIDATION_ERROR, 422, f"Invalid fields: {invalid}")
 
     # Extract source values for requested fields
     field_values = {f: source.get(f) for f in body.fields}
 
-    results: list[FileRecord] = []
-    for target_id in body.target_ids:
-        target = await get_file(target_id)
-        if target is None:
-            continue
-        existing_changed = set(target.get("changed_fields") or [])
-        new_changed = existing_changed | set(body.fields)
-        updates = {
-            **field_values,
-            "status": "modified",
-            "changed_fields": sorted(new_changed),
-        }
-        await update_file(target_id, updates)
-        updated = await get_file(target_id)
-        results.append(dict_to_file_record(updated))
+    targets = await get_files_by_ids(body.target_ids, columns=("changed_fields",))
+    rows = await update_files_returning(_modified_updates(targets, field_values))
+    results = [dict_to_file_record(row) for row in rows]
 
     return ApplyMetadataResponse(updated=results, count=len(results))
 
@@ -210,30 +269,40 @@ async def apply_metadata(body: ApplyMetadataRequest) -> ApplyMetadataResponse:
 @router.post("/batch-update", response_model=BatchUpdateResponse)
 async def batch_update(body: BatchUpdateRequest) -> BatchUpdateResponse:
     """Set arbitrary metadata values on multiple files (D060)."""
-    invalid = set(body.updates.keys()) - set(_META_KEYS)
+    invalid = body.updates.keys() - _META_KEY_SET
     if invalid:
         raise AppError(VALIDATION_ERROR, 422, f"Invalid fields: {invalid}")
 
-    results: list[FileRecord] = []
+    targets = await get_files_by_ids(body.file_ids, columns=("changed_fields",))
+    found = {target["id"] for target in targets}
     for file_id in body.file_ids:
-        row = await get_file(file_id)
-        if row is None:
+        if file_id not in found:
             logger.warning("batch-update: file %s not found, skipping", file_id)
-            continue
-        existing_changed = set(row.get("changed_fields") or [])
-        new_changed = existing_changed | set(body.updates.keys())
-        updates = {
-            **body.updates,
-            "status": "modified",
-            "changed_fields": sorted(new_changed),
-        }
-        await update_file(file_id, updates)
-        updated = await get_file(file_id)
-        results.append(dict_to_file_record(updated))
+
+    rows = await update_files_returning(_modified_updates(targets, body.updates))
+    results = [dict_to_file_record(row) for row in rows]
 
     return BatchUpdateResponse(updated=results, count=len(results))
 
 
+def _modified_updates(targets: list[dict], values: dict) -> list[tuple[str, dict]]:
+    """(file_id, updates) pairs setting *values* and marking them as changed."""
+    fields = set(values)
+    return [
+        (
+            target["id"],
+            {
+                **values,
+                "status": "modified",
+                "changed_fields": sorted(
+                    set(target.get("changed_fields") or []) | fields
+                ),
+            },
+        )
+        for target in targets
+    ]
+
+
 @router.get("/{file_id}", response_model=FileRecord)
 async def get_file_by_id(file_id: str) -> FileRecord:
     """Get a single file record by ID."""
@@ -271,9 +340,9 @@ async def update_metadata(file_id: str, body: MetadataUpdate) -> FileRecord:
     # Regenerate suggested_filename when constituent fields change
     _maybe_regen_filename(row, changes)
 
-    await update_file(file_id, changes)
-
-    updated = await get_file(file_id)
+    updated = await update_file_returning(file_id, changes)
+    if updated is None:
+        raise AppError(FILE_NOT_FOUND, 404, f"File not found: {file_id}")
     return dict_to_file_record(updated)
 
 
@@ -290,7 +359,7 @@ async def save_file(file_id: str, body: SaveRequest = SaveRequest()) -> SaveResp
         raise AppError(FILE_NOT_FOUND, 404, "File missing on disk")
 
     # Hash check for external modification
-    current_hash = compute_file_hash(old_path)
+    current_hash = await asyncio.to_thread(compute_file_hash, old_path)
     if current_hash != row["file_hash"]:
         raise AppError(FILE_CHANGED, 409, "File modified externally")
 
@@ -300,7 +369,23 @@ async def save_file(file_id: str, body: SaveRequest = SaveRequest()) -> SaveResp
 
     # Check rename before writing metadata (D015)
     will_rename, target_path = _check_rename(body, row)
+    try:
+        return await _write_and_finalize(
+            file_id, row, old_path, target_path, will_rename
+        )
+    finally:
+        if target_path is not None:
+            _pending_rename_targets.discard(os.path.normcase(target_path))
 
+
+async def _write_and_finalize(
+    file_id: str,
+    row: dict,
+    old_path: str,
+    target_path: Path | None,
+    will_rename: bool,
+) -> SaveResponse:
+    """Write metadata in place, verify it, then rename/update the DB."""
     # Collect metadata to write
     metadata = {k: row[k] for k in _META_KEYS if row.get(k) is not None}
     if row.get("custom_fields"):
@@ -310,7 +395,7 @@ async def save_file(file_id: str, body: SaveRequest = SaveRequest()) -> SaveResp
         raise AppError(FILE_READ_ONLY, 403, f"File is read-only: {old_path}")
 
     try:
-        write_metadata(old_path, metadata)
+        await asyncio.to_thread(write_metadata, old_path, metadata)
     except PermissionError:
         raise AppError(FILE_LOCKED, 409, f"File is locked: {old_path}")
     except OSError as e:
@@ -318,7 +403,9 @@ async def save_file(file_id: str, body: SaveRequest = SaveRequest()) -> SaveResp
             raise AppError(DISK_FULL, 507, "Not enough disk space")
         raise
 
-    result = verify_write(old_path, metadata)
+    # write_metadata may have patched the file in place, so from here on the
+    # original is already modified: a failed verify cannot fall back to it
+    result = await asyncio.to_thread(verify_write, old_path, metadata)
     if not result["ok"]:
         raise AppError(
             "WRITE_FAILED", 500, f"Write verification failed: {result['errors']}"
@@ -338,9 +425,9 @@ async def revert_file(file_id: str) -> FileRecord:
     if not file_path.is_file():
         raise AppError(FILE_NOT_FOUND, 404, "File missing on disk")
 
-    meta = read_metadata(row["path"])
+    meta = await asyncio.to_thread(read_metadata, row["path"])
     meta = _apply_import_fallbacks(meta)
-    new_hash = compute_file_hash(row["path"])
+    new_hash = await asyncio.to_thread(compute_file_hash, row["path"])
 
     updates = {k: meta.get(k) for k in _META_KEYS}
     updates.update(
@@ -355,30 +442,56 @@ async def revert_file(file_id: str) -> FileRecord:
             "custom_fields": meta.get("custom_fields"),
         }
     )
-    await update_file(file_id, updates)
-
-    updated = await get_file(file_id)
+    updated = await update_file_returning(file_id, updates)
+    if updated is None:
+        raise AppError(FILE_NOT_FOUND, 404, f"File not found: {file_id}")
     return dict_to_file_record(updated)
 
 
 @router.get("/{file_id}/audio")
-async def get_file_audio(file_id: str) -> FileResponse:
-    """Stream audio file from disk for playback."""
+async def get_file_audio(file_id: str, request: Request) -> Response:
+    """Stream audio file from disk for playback.
+
+    Range requests are served by FileResponse. The ETag follows the file's
+    mtime and size, so a player revalidating an unchanged file gets a 304.
+    """
     row = await get_file(file_id)
     if row is None:
         raise AppError(FILE_NOT_FOUND, 404, f"File not found: {file_id}")
 
-    file_path = Path(row["path"])
-    if not file_path.is_file():
+    # One stat both checks the file and feeds FileResponse's headers
+    try:
+        st = os.stat(row["path"])
+    except OSError:
+        st = None
+    if st is None or not stat.S_ISREG(st.st_mode):
         raise AppError(FILE_NOT_FOUND, 404, f"File missing on disk: {row['path']}")
 
+    etag = f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
     return FileResponse(
-        path=str(file_path),
+        path=row["path"],
         media_type="audio/wav",
         filename=row["filename"],
+        stat_result=st,
+        headers=headers,
     )
 
 
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """True if an If-None-Match header lists *etag* (weak compare) or "*"."""
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip().removeprefix("W/")
+        if tag == "*" or tag == etag:
+            return True
+    return False
+
+
 def _compute_status_after_edit(row: dict, changes: dict) -> str:
     """Determine file status after a metadata edit.
 
@@ -401,12 +514,14 @@ def _compute_status_after_edit(row: dict, changes: dict) -> str:
     return "modified"
 
 
-_FILENAME_FIELDS = {"cat_id", "fx_name", "creator_id", "source_id", "user_category"}
+_FILENAME_FIELDS = frozenset(
+    {"cat_id", "fx_name", "creator_id", "source_id", "user_category"}
+)
 
 
 def _maybe_regen_filename(row: dict, changes: dict) -> None:
     """Regenerate suggested_filename when filename-constituent fields change."""
-    if not (_FILENAME_FIELDS & set(changes.keys())):
+    if _FILENAME_FIELDS.isdisjoint(changes):
         return
     merged = {**row, **changes}
     cat_id = merged.get("cat_id")
@@ -436,15 +551,15 @@ async def _save_as_copy(row: dict, body: SaveRequest, old_path: str) -> SaveResp
         )
 
     try:
-        shutil.copy2(old_path, str(dest))
+        await asyncio.to_thread(shutil.copy2, old_path, str(dest))
 
         metadata = {k: row[k] for k in _META_KEYS if row.get(k) is not None}
         if row.get("custom_fields"):
             metadata["custom_fields"] = row["custom_fields"]
 
-        write_metadata(str(dest), metadata)
+        await asyncio.to_thread(write_metadata, str(dest), metadata)
 
-        result = verify_write(str(dest), metadata)
+        result = await asyncio.to_thread(verify_write, str(dest), metadata)
         if not result["ok"]:
             dest.unlink(missing_ok=True)
             raise AppError(
@@ -470,15 +585,19 @@ async def _save_as_copy(row: dict, body: SaveRequest, old_path: str) -> SaveResp
 def _check_rename(body: SaveRequest, row: dict) -> tuple[bool, Path | None]:
     """Determine if a rename is needed and validate the target path.
 
-    Returns (will_rename, target_path). Raises 409 if target exists.
+    Returns (will_rename, target_path). Raises 409 if target exists or is
+    claimed by another in-flight save; otherwise claims it (the caller
+    releases the claim).
     """
     suggested = row.get("suggested_filename")
     if not body.rename or not suggested or suggested == row["filename"]:
         return False, None
 
     target = Path(row["directory"]) / suggested
-    if target.exists():
+    key = os.path.normcase(target)
+    if key in _pending_rename_targets or target.exists():
         raise AppError(RENAME_CONFLICT, 409, "Rename conflict: target exists")
+    _pending_rename_targets.add(key)
     return True, target
 
 
@@ -489,8 +608,8 @@ async def _finalize_save(
     if will_rename:
         os.replace(old_path, str(target_path))
         new_path = str(target_path)
-        new_hash = compute_file_hash(new_path)
-        await update_file(
+        new_hash = await asyncio.to_thread(compute_file_hash, new_path)
+        updated = await update_file_returning(
             file_id,
             {
                 "path": new_path,
@@ -503,13 +622,14 @@ async def _finalize_save(
         )
     else:
         new_path = old_path
-        new_hash = compute_file_hash(old_path)
-        await update_file(
+        new_hash = await asyncio.to_thread(compute_file_hash, old_path)
+        updated = await update_file_returning(
             file_id,
             {"status": "saved", "changed_fields": [], "file_hash": new_hash},
         )
 
-    updated = await get_file(file_id)
+    if updated is None:
+        raise AppError(FILE_NOT_FOUND, 404, f"File not found: {file_id}")
     return SaveResponse(
         success=True,
         file=dict_to_file_record(updated),
@@ -519,17 +639,110 @@ async def _finalize_save(
     )
 
 
-async def _import_single_file(wav_path: Path, abs_path: str) -> FileRecord:
-    """Read or cache a single WAV file and return a FileRecord."""
-    file_hash = compute_file_hash(abs_path)
+async def _import_wav_files(
+    targets: list[tuple[Path, str]],
+) -> tuple[list[FileRecord], list[str]]:
+    """Import (wav_path, abs_path) pairs, returning (records, skipped_paths).
+
+    Hashes are computed concurrently and existing records fetched in one
+    query. Files whose hash matches the DB are served from the cache; the
+    rest have their metadata read concurrently via read_metadata_many, then
+    are stored in input order.
+    """
+    records: list[FileRecord | None] = [None] * len(targets)
+    skipped_paths: list[str] = []
+    pending: list[tuple[int, str, bool]] = []  # (target index, file_hash, in DB)
 
+    abs_paths = [abs_path for _, abs_path in targets]
+    hashes = await compute_file_hashes(abs_paths)
     # Check DB cache — file already imported with same hash
-    existing = await get_file_by_path(abs_path)
-    if existing is not None and existing.get("file_hash") == file_hash:
-        return hydrate_suggestions(dict_to_file_record(existing))
+    existing_by_path = await get_files_by_paths(abs_paths)
+
+    for i, (abs_path, file_hash) in enumerate(zip(abs_paths, hashes)):
+        if file_hash is None:
+            skipped_paths.append(abs_path)
+            continue
+        existing = existing_by_path.get(abs_path)
+        if existing is not None and existing.get("file_hash") == file_hash:
+            records[i] = dict_to_file_record(existing)
+        else:
+            pending.append((i, file_hash, existing is not None))
+
+    metas = await read_metadata_many([targets[i][1] for i, _, _ in pending])
+    cached_by_hash = await _current_cached_analyses([h for _, h, _ in pending])
+    async with bulk_import_mode():
+        # abs path -> (target indices, record); a path listed twice (e.g. via
+        # "./" or a symlink) is stored once and reported at each index
+        new_rows: dict[str, tuple[list[int], dict]] = {}
+        for (i, file_hash, in_db), meta in zip(pending, metas):
+            wav_path, abs_path = targets[i]
+            if meta is None:
+                skipped_paths.append(abs_path)
+                continue
+            if abs_path in new_rows:
+                new_rows[abs_path][0].append(i)
+                continue
+            try:
+                db_record = _build_import_record(
+                    wav_path, abs_path, file_hash, meta, cached_by_hash.get(file_hash)
+                )
+                if in_db:
+                    db_record["id"] = await upsert_file(db_record)
+                    records[i] = dict_to_file_record(db_record)
+                else:
+                    new_rows[abs_path] = ([i], db_record)
+            except Exception:
+                logger.warning("Skipping unreadable file: %s", abs_path, exc_info=True)
+                skipped_paths.append(abs_path)
+
+        # Files seen for the first time are stored in a single transaction
+        file_ids = await _store_new_records(new_rows, skipped_paths)
+        for (indices, db_record), file_id in zip(new_rows.values(), file_ids):
+            if file_id is None:
+                continue
+            db_record["id"] = file_id
+            record = dict_to_file_record(db_record)
+            for i in indices:
+                records[i] = record
+
+    return (
+        hydrate_suggestions_batch(r for r in records if r is not None),
+        skipped_paths,
+    )
+
+
+async def _store_new_records(
+    new_rows: dict[str, tuple[list[int], dict]], skipped_paths: list[str]
+) -> list[str | None]:
+    """Upsert the new import records, returning their IDs in order.
+
+    If the batch transaction fails, each record is retried on its own; those
+    that still fail are skipped (ID None, path added to skipped_paths).
+    """
+    db_records = [db_record for _, db_record in new_rows.values()]
+    try:
+        return await upsert_files_many(db_records)
+    except Exception:
+        logger.warning("Batch insert failed; storing files one by one", exc_info=True)
 
-    # Read fresh metadata and apply import-time fallbacks
-    meta = read_metadata(abs_path)
+    file_ids: list[str | None] = []
+    for db_record in db_records:
+        try:
+            file_ids.append(await upsert_file(db_record))
+        except Exception:
+            logger.warning(
+                "Skipping unstorable file: %s", db_record["path"], exc_info=True
+            )
+            skipped_paths.append(db_record["path"])
+            file_ids.append(None)
+    return file_ids
+
+
+def _build_import_record(
+    wav_path: Path, abs_path: str, file_hash: str, meta: dict, cached: dict | None
+) -> dict:
+    """Build the DB record for a freshly read WAV file."""
+    # Apply import-time fallbacks
     meta = _apply_import_fallbacks(meta)
     db_record = {
         "path": abs_path,
@@ -545,78 +758,75 @@ async def _import_single_file(wav_path: Path, abs_path: str) -> FileRecord:
     }
 
     # Pre-populate analysis from cache if previously analyzed
-    cached = await get_cached_analysis(file_hash)
     if cached is not None:
         _inject_cached_analysis(db_record, cached, wav_path.name)
 
-    file_id = await upsert_file(db_record)
-    db_record["id"] = file_id
-    return hydrate_suggestions(dict_to_file_record(db_record))
+    return db_record
+
+
+async def _current_cached_analyses(file_hashes: list[str]) -> dict[str, dict]:
+    """Cached analyses from the loaded models and labels, keyed by file hash.
+
+    Until the models are ready the current version is unknown, so no cached
+    result is reused.
+    """
+    if not file_hashes or not model_manager.is_ready():
+        return {}
+    return await get_cached_analyses(
+        file_hashes, model_version=model_manager.get_analysis_version()
+    )
 
 
 def _inject_cached_analysis(db_record: dict, cached: dict, filename: str) -> None:
     """Inject cached analysis results into a new file record (mutates db_record)."""
-    classification = [
-        ClassificationMatch(**m) for m in json.loads(cached["classification"])
-    ]
+    classification = decode_cached_classification(cached["classification"])
     boosted = apply_filename_boost(classification, filename)
     caption = cached.get("caption")
+    # Cache rows are tagged "<CLAP version>:<label hash>"; show the version
+    model_version = cached.get("model_version", "2023").split(":", 1)[0]
     analysis = AnalysisResult(
         classification=boosted,
         caption=caption,
-        model_version=cached.get("model_version", "2023"),
+        model_version=model_version,
         analyzed_at=datetime.now(timezone.utc).isoformat(),
     )
-    db_record["analysis"] = json.loads(analysis.model_dump_json())
+    db_record["analysis"] = analysis.model_dump(mode="json")
 
 
 async def _remove_stale_records(directory: str, seen_paths: set[str]) -> None:
     """Delete DB records for files no longer on disk in this directory."""
-    all_records = await get_all_files(limit=100000)
-    stale = [
-        r["path"]
-        for r in all_records
-        if r["path"].startswith(directory + os.sep) and r["path"] not in seen_paths
-    ]
+    known = await get_paths_under(directory + os.sep)
+    stale = [path for path in known if path not in seen_paths]
     if stale:
         await delete_files_by_paths(stale)
 
 
-def _apply_import_fallbacks(meta: dict) -> dict:
-    """Merge BEXT/INFO values into empty iXML fields per 08-metadata-schema.md S5a."""
-    bext = meta.get("bext") or {}
-    info = meta.get("info") or {}
-
-    # description: BEXT description → iXML
-    if not meta.get("description") and bext.get("description"):
-        meta["description"] = bext["description"]
-
-    # designer: BEXT originator (priority) → INFO artist (fallback)
-    if not meta.get("designer"):
-        if bext.get("originator"):
-            meta["designer"] = bext["originator"]
-        elif info.get("artist"):
-            meta["designer"] = info["artist"]
-
-    # fx_name: INFO title → iXML
-    if not meta.get("fx_name") and info.get("title"):
-        meta["fx_name"] = info["title"]
-
-    # category: INFO genre → iXML
-    if not meta.get("category") and info.get("genre"):
-        meta["category"] = info["genre"]
+# Empty iXML field -> (chunk, key) sources tried in priority order
+_FALLBACK_RULES: tuple[tuple[str, tuple[tuple[str, str], ...]], ...] = (
+    ("description", (("bext", "description"),)),
+    ("designer", (("bext", "originator"), ("info", "artist"))),
+    ("fx_name", (("info", "title"),)),
+    ("category", (("info", "genre"),)),
+    ("notes", (("info", "comment"),)),
+    ("library", (("info", "product"),)),
+    ("keywords", (("info", "keywords"),)),
+)
 
-    # notes: INFO comment → iXML
-    if not meta.get("notes") and info.get("comment"):
-        meta["notes"] = info["comment"]
 
-    # library: INFO product → iXML
-    if not meta.get("library") and info.get("product"):
-        meta["library"] = info["product"]
+def _apply_import_fallbacks(meta: dict) -> dict:
+    """Merge BEXT/INFO values into empty iXML fields per 08-metadata-schema.md S5a."""
+    chunks = {"bext": meta.get("bext") or {}, "info": meta.get("info") or {}}
+    if not chunks["bext"] and not chunks["info"]:
+        return meta
 
-    # keywords: INFO keywords → iXML
-    if not meta.get("keywords") and info.get("keywords"):
-        meta["keywords"] = info["keywords"]
+    for dest, sources in _FALLBACK_RULES:
+        if meta.get(dest):
+            continue
+        for chunk, key in sources:
+            value = chunks[chunk].get(key)
+            if value:
+                meta[dest] = value
+                break
 
     return meta
 
@@ -646,3 +856,4 @@ _META_KEYS = [
     "creator_id",
     "source_id",
 ]
+_META_KEY_SET = frozenset(_META_KEYS)
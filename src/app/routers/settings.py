@@ -3,23 +3,24 @@
 import os
 
 from fastapi import APIRouter
+from fastapi.responses import Response
 
 from app.db import repository
 from app.errors import AppError, VALIDATION_ERROR
-from app.services.settings import SettingsUpdate, get_settings, update_settings
+from app.services.settings import (
+    AppSettings,
+    SettingsUpdate,
+    get_settings,
+    update_settings,
+)
 
 router = APIRouter(prefix="/settings", tags=["settings"])
 
 
 @router.get("")
-def read_settings() -> dict:
+def read_settings() -> Response:
     """Return current settings with API key masked."""
-    s = get_settings()
-    data = s.model_dump()
-    # Mask API key
-    if data.get("llm_api_key"):
-        data["llm_api_key"] = "configured"
-    return data
+    return _settings_response(get_settings())
 
 
 @router.post("/reset-db")
@@ -27,8 +28,10 @@ async def reset_database() -> dict:
     """Close DB, delete the file, and reconnect (re-creates schema)."""
     db_path = repository.get_db_path()
     await repository.close()
-    if os.path.exists(db_path):
-        os.remove(db_path)
+    # WAL mode keeps -wal/-shm side files next to the DB
+    for path in (db_path, f"{db_path}-wal", f"{db_path}-shm"):
+        if os.path.exists(path):
+            os.remove(path)
     await repository.connect(db_path)
     return {"status": "ok"}
 
@@ -40,7 +43,15 @@ def write_settings(body: SettingsUpdate) -> dict:
         s = update_settings(body.model_dump(exclude_unset=True))
     except ValueError as e:
         raise AppError(VALIDATION_ERROR, 422, str(e))
-    data = s.model_dump()
-    if data.get("llm_api_key"):
-        data["llm_api_key"] = "configured"
-    return data
+    return _settings_response(s)
+
+
+def _settings_response(s: AppSettings) -> Response:
+    """Encode settings as JSON with the API key masked.
+
+    Serialized straight from the model by pydantic-core, skipping the
+    model_dump() dict and FastAPI's re-encoding of it.
+    """
+    if s.llm_api_key:
+        s = s.model_copy(update={"llm_api_key": "configured"})
+    return Response(content=s.model_dump_json(), media_type="application/json")
@@ -1,8 +1,11 @@
 """UCS data endpoints — categories, lookup, parse, generate."""
 
+import functools
+import json
 from dataclasses import asdict
 
 from fastapi import APIRouter
+from fastapi.responses import Response
 from pydantic import BaseModel
 
 from app.errors import AppError, VALIDATION_ERROR
@@ -13,6 +16,7 @@ from app.ucs.engine import (
     get_category_explanation,
     get_subcategories,
     get_synonyms,
+    is_loaded,
     lookup_catid,
 )
 from app.ucs.filename import generate_filename, parse_filename
@@ -44,28 +48,14 @@ class GenerateFilenameRequest(BaseModel):
 
 
 @router.get("/categories")
-def list_categories() -> dict:
-    """Full nested category tree for dropdown population."""
-    tree = []
-    for cat_name in get_categories():
-        explanation = get_category_explanation(cat_name) or ""
-        subs = []
-        for sub_name in get_subcategories(cat_name):
-            info = get_catid_info(_lookup_catid(cat_name, sub_name))
-            if info is None:
-                continue
-            subs.append(
-                {
-                    "name": sub_name,
-                    "cat_id": info.cat_id,
-                    "category_full": info.category_full,
-                    "explanation": info.explanation,
-                }
-            )
-        tree.append(
-            {"name": cat_name, "explanation": explanation, "subcategories": subs}
-        )
-    return {"categories": tree}
+def list_categories() -> Response:
+    """Full nested category tree for dropdown population.
+
+    The taxonomy is fixed once UCS is loaded, so the encoded body is built
+    once and reused.
+    """
+    body = _categories_body() if is_loaded() else _build_categories_body()
+    return Response(content=body, media_type="application/json")
 
 
 @router.get("/lookup/{cat_id}")
@@ -105,6 +95,38 @@ def generate(body: GenerateFilenameRequest) -> dict:
     return asdict(result)
 
 
+@functools.lru_cache(maxsize=1)
+def _categories_body() -> bytes:
+    """_build_categories_body(), cached for the loaded UCS data."""
+    return _build_categories_body()
+
+
+def _build_categories_body() -> bytes:
+    """Encode {"categories": [...]} for list_categories."""
+    tree = []
+    for cat_name in get_categories():
+        explanation = get_category_explanation(cat_name) or ""
+        subs = []
+        for sub_name in get_subcategories(cat_name):
+            info = get_catid_info(_lookup_catid(cat_name, sub_name))
+            if info is None:
+                continue
+            subs.append(
+                {
+                    "name": sub_name,
+                    "cat_id": info.cat_id,
+                    "category_full": info.category_full,
+                    "explanation": info.explanation,
+                }
+            )
+        tree.append(
+            {"name": cat_name, "explanation": explanation, "subcategories": subs}
+        )
+    return json.dumps(
+        {"categories": tree}, ensure_ascii=False, separators=(",", ":")
+    ).encode()
+
+
 def _lookup_catid(category: str, subcategory: str) -> str | None:
     """Thin wrapper for testability."""
     return lookup_catid(category, subcategory)
@@ -64,6 +64,8 @@ class AppSettings(BaseModel):
     llm_provider: str | None = None
     llm_api_key: str | None = None
     model_directory: str = "data/models"
+    # Read once when the models load; a change takes effect on restart
+    clap_int8: bool = True
 
 
 class SettingsUpdate(BaseModel):
@@ -80,6 +82,7 @@ class SettingsUpdate(BaseModel):
     llm_provider: str | None = None
     llm_api_key: str | None = None
     model_directory: str | None = None
+    clap_int8: bool | None = None
 
 
 # ---------------------------------------------------------------------------
@@ -2,6 +2,7 @@
 
 from dataclasses import dataclass
 
+import numpy as np
 import openpyxl
 
 
@@ -21,6 +22,22 @@ class CatInfo:
         return f"{self.category}-{self.subcategory}"
 
 
+@dataclass(frozen=True)
+class NameIndex:
+    """Lowercased category/subcategory names laid out for vectorized matching.
+
+    ``names`` holds each distinct name once; ``pair_cat``/``pair_sub`` index
+    into it for every (category, subcategory) pair, in ``get_categories()``
+    then ``get_subcategories()`` order, alongside the pair's CatID.
+    """
+
+    names: np.ndarray
+    positions: dict[str, int]
+    pair_cat: np.ndarray
+    pair_sub: np.ndarray
+    pair_catids: list[str]
+
+
 # ---------------------------------------------------------------------------
 # Module-level singletons (populated by load_ucs)
 # ---------------------------------------------------------------------------
@@ -31,6 +48,7 @@ _catid_to_info: dict[str, CatInfo] = {}
 _cat_sub_to_catid: dict[tuple[str, str], str] = {}
 _category_explanations: dict[str, str] = {}
 _synonym_index: dict[str, list[str]] = {}
+_name_index: NameIndex | None = None
 _loaded: bool = False
 
 
@@ -45,6 +63,7 @@ def load_ucs(full_path: str, top_path: str) -> None:
     _parse_full_list(full_path)
     _parse_top_level(top_path)
     _build_synonym_index()
+    _build_name_index()
     _loaded = True
 
 
@@ -133,6 +152,30 @@ def _build_synonym_index() -> None:
             _synonym_index.setdefault(syn.lower(), []).append(cat_id)
 
 
+def _build_name_index() -> None:
+    """Build the name table used by prefix matching in fuzzy_match."""
+    global _name_index
+    positions: dict[str, int] = {}
+    pair_cat: list[int] = []
+    pair_sub: list[int] = []
+    pair_catids: list[str] = []
+    for cat in _categories:
+        for sub in _subcategories.get(cat, []):
+            cid = _cat_sub_to_catid.get((cat, sub))
+            if not cid:
+                continue
+            pair_cat.append(positions.setdefault(cat.lower(), len(positions)))
+            pair_sub.append(positions.setdefault(sub.lower(), len(positions)))
+            pair_catids.append(cid)
+    _name_index = NameIndex(
+        names=np.array(list(positions), dtype=str),
+        positions=positions,
+        pair_cat=np.array(pair_cat, dtype=np.intp),
+        pair_sub=np.array(pair_sub, dtype=np.intp),
+        pair_catids=pair_catids,
+    )
+
+
 # ---------------------------------------------------------------------------
 # Public API
 # ---------------------------------------------------------------------------
@@ -171,6 +214,11 @@ def get_synonym_index() -> dict[str, list[str]]:
     return _synonym_index
 
 
+def get_name_index() -> NameIndex | None:
+    """Return the vectorized Category/SubCategory name index (None before load_ucs)."""
+    return _name_index
+
+
 def get_all_catinfo() -> list[CatInfo]:
     """Return all 753 CatInfo entries from the lookup table."""
     return list(_catid_to_info.values())
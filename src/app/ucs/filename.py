@@ -3,7 +3,14 @@
 import re
 from dataclasses import dataclass
 
-from app.ucs.engine import CatInfo, get_catid_info, get_synonym_index
+import numpy as np
+
+from app.ucs.engine import (
+    CatInfo,
+    get_catid_info,
+    get_name_index,
+    get_synonym_index,
+)
 
 
 # ---------------------------------------------------------------------------
@@ -315,15 +322,17 @@ def _match_cat_sub_names(token: str, scores: dict[str, list[str]]) -> None:
     """Check if token matches any category or subcategory name (prefix-aware)."""
     if len(token) < 3:
         return
-    from app.ucs.engine import get_categories, get_subcategories, lookup_catid
-
-    for cat in get_categories():
-        cat_low = cat.lower()
-        cat_match = cat_low.startswith(token) or token.startswith(cat_low)
-        for sub in get_subcategories(cat):
-            sub_low = sub.lower()
-            sub_match = sub_low.startswith(token) or token.startswith(sub_low)
-            if cat_match or sub_match:
-                cid = lookup_catid(cat, sub)
-                if cid:
-                    scores.setdefault(cid, []).append(token)
+    index = get_name_index()
+    if index is None or not index.pair_catids:
+        return
+
+    # Names starting with the token, plus names the token starts with
+    hit = np.char.startswith(index.names, token)
+    for end in range(len(token) + 1):
+        pos = index.positions.get(token[:end])
+        if pos is not None:
+            hit[pos] = True
+
+    matched = hit[index.pair_cat] | hit[index.pair_sub]
+    for i in np.flatnonzero(matched):
+        scores.setdefault(index.pair_catids[i], []).append(token)
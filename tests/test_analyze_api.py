@@ -4,8 +4,12 @@ import json
 from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
 
-from app.models import ClassificationMatch
-from app.routers.analysis import apply_filename_boost, _build_prefill_updates
+from app.models import AnalyzeRequest, ClassificationMatch
+from app.routers.analysis import (
+    _build_prefill_updates,
+    _filename_boost_map,
+    apply_filename_boost,
+)
 from app.ucs.filename import FuzzyMatch
 
 import pytest
@@ -27,6 +31,14 @@ async def client():
     await repository.close()
 
 
+@pytest.fixture(autouse=True)
+def _clear_filename_boosts():
+    """Tests patch fuzzy_match per filename; keep cached boosts from leaking."""
+    _filename_boost_map.cache_clear()
+    yield
+    _filename_boost_map.cache_clear()
+
+
 def _make_record(**overrides) -> dict:
     base = {
         "path": "C:/data/test.wav",
@@ -178,11 +190,105 @@ async def test_analyze_cache_hit_skips_inference(client):
     assert data["analysis"]["classification"][0]["cat_id"] == "WATRSurf"
 
 
+@pytest.mark.asyncio
+async def test_analyze_ignores_cache_from_other_models(client):
+    file_id = await insert_file(_make_record())
+    cached = {"classification": "[]", "caption": None, "model_version": "2023:old"}
+    mock_classifier = MagicMock()
+    mock_classifier.classify.return_value = _mock_classification()
+
+    with (
+        patch("app.routers.analysis.model_manager.is_ready", return_value=True),
+        patch(
+            "app.routers.analysis.model_manager.get_classifier",
+            return_value=mock_classifier,
+        ),
+        patch(
+            "app.routers.analysis.model_manager.get_analysis_version",
+            return_value="2023:new",
+        ),
+        patch("app.routers.analysis.get_cached_analysis", return_value=cached),
+        patch("app.routers.analysis.store_cached_analysis") as mock_store,
+    ):
+        resp = await client.post(f"/files/{file_id}/analyze", json={"tiers": [1]})
+
+    assert resp.status_code == 200
+    mock_classifier.classify.assert_called_once()
+    assert mock_store.call_args.args[3] == "2023:new"
+
+
+@pytest.mark.asyncio
+async def test_analyze_caches_classification_as_json_bytes(client):
+    from app.routers.analysis import decode_cached_classification
+
+    rec = _make_record()
+    file_id = await insert_file(rec)
+    mock_classifier = MagicMock()
+    mock_classifier.classify.return_value = _mock_classification()
+
+    with (
+        patch("app.routers.analysis.model_manager.is_ready", return_value=True),
+        patch(
+            "app.routers.analysis.model_manager.get_classifier",
+            return_value=mock_classifier,
+        ),
+    ):
+        resp = await client.post(f"/files/{file_id}/analyze", json={"tiers": [1]})
+
+    assert resp.status_code == 200
+    cached = await repository.get_cached_analysis(rec["file_hash"])
+    assert isinstance(cached["classification"], bytes)
+    assert decode_cached_classification(cached["classification"]) == (
+        _mock_classification()
+    )
+
+
 # ---------------------------------------------------------------------------
 # POST /files/{id}/analyze — force bypasses cache
 # ---------------------------------------------------------------------------
 
 
+@pytest.mark.asyncio
+async def test_concurrent_analyses_failed_write_keeps_no_cache_row(client):
+    """A failing record write drops only its own cache row, never another's."""
+    import asyncio
+    import sqlite3
+
+    from app.routers import analysis
+
+    ok_id = await insert_file(_make_record(path="C:/data/ok.wav", file_hash="h_ok"))
+    bad_id = await insert_file(_make_record(path="C:/data/bad.wav", file_hash="h_bad"))
+    mock_classifier = MagicMock()
+    mock_classifier.classify.return_value = _mock_classification()
+    real_update = analysis.update_file_returning
+
+    async def update_or_fail(file_id, updates):
+        if file_id == bad_id:
+            raise sqlite3.OperationalError("disk I/O error")
+        return await real_update(file_id, updates)
+
+    with (
+        patch("app.routers.analysis.model_manager.is_ready", return_value=True),
+        patch(
+            "app.routers.analysis.model_manager.get_classifier",
+            return_value=mock_classifier,
+        ),
+        patch("app.routers.analysis.update_file_returning", update_or_fail),
+    ):
+        ok, bad = await asyncio.gather(
+            client.post(f"/files/{ok_id}/analyze", json={"tiers": [1]}),
+            client.post(f"/files/{bad_id}/analyze", json={"tiers": [1]}),
+            return_exceptions=True,
+        )
+
+    assert ok.status_code == 200
+    assert isinstance(bad, sqlite3.OperationalError)
+    assert not repository.get_db().in_transaction
+    assert await repository.get_cached_analysis("h_ok") is not None
+    assert await repository.get_cached_analysis("h_bad") is None
+    assert (await repository.get_file(bad_id))["analysis"] is None
+
+
 @pytest.mark.asyncio
 async def test_analyze_force_bypasses_cache(client):
     file_id = await insert_file(_make_record())
@@ -290,6 +396,7 @@ async def test_batch_analyze_sse_events(client):
         )
 
     assert resp.status_code == 200
+    assert resp.headers["x-accel-buffering"] == "no"
     events = _parse_sse_events(resp.text)
 
     # Should have: progress, result, progress, result, complete
@@ -303,6 +410,224 @@ async def test_batch_analyze_sse_events(client):
     assert complete["data"]["analyzed_count"] == 2
     assert complete["data"]["failed_count"] == 0
 
+    # One timestamp is stamped for the whole batch
+    stamps = {
+        e["data"]["file"]["analysis"]["analyzed_at"]
+        for e in events
+        if e["event"] == "result"
+    }
+    assert len(stamps) == 1
+
+
+@pytest.mark.asyncio
+async def test_batch_analyze_classifies_files_together(client):
+    fid1 = await insert_file(_make_record(path="C:/data/a.wav", filename="a.wav"))
+    fid2 = await insert_file(_make_record(path="C:/data/b.wav", filename="b.wav"))
+
+    mock_classifier = MagicMock()
+    mock_classifier.classify_batch.return_value = [
+        _mock_classification(),
+        _mock_classification(),
+    ]
+
+    with (
+        patch("app.routers.analysis.model_manager.is_ready", return_value=True),
+        patch(
+            "app.routers.analysis.model_manager.get_classifier",
+            return_value=mock_classifier,
+        ),
+        patch("app.routers.analysis.get_cached_analysis", return_value=None),
+        patch("app.routers.analysis.store_cached_analysis"),
+    ):
+        resp = await client.post(
+            "/files/analyze-batch",
+            json={"file_ids": [fid1, fid2], "tiers": [1]},
+        )
+
+    events = _parse_sse_events(resp.text)
+    results = [e["data"] for e in events if e["event"] == "result"]
+    assert [r["file_id"] for r in results] == [fid1, fid2]
+    mock_classifier.classify_batch.assert_called_once()
+    assert mock_classifier.classify_batch.call_args.args[0] == [
+        "C:/data/a.wav",
+        "C:/data/b.wav",
+    ]
+    mock_classifier.classify.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_batch_analyze_falls_back_when_batch_call_fails(client):
+    fid1 = await insert_file(_make_record(path="C:/data/a.wav", filename="a.wav"))
+    fid2 = await insert_file(_make_record(path="C:/data/b.wav", filename="b.wav"))
+
+    mock_classifier = MagicMock()
+    mock_classifier.classify_batch.side_effect = RuntimeError("bad audio")
+    mock_classifier.classify.side_effect = [
+        RuntimeError("bad audio"),
+        _mock_classification(),
+    ]
+
+    with (
+        patch("app.routers.analysis.model_manager.is_ready", return_value=True),
+        patch(
+            "app.routers.analysis.model_manager.get_classifier",
+            return_value=mock_classifier,
+        ),
+        patch("app.routers.analysis.get_cached_analysis", return_value=None),
+        patch("app.routers.analysis.store_cached_analysis"),
+    ):
+        resp = await client.post(
+            "/files/analyze-batch",
+            json={"file_ids": [fid1, fid2], "tiers": [1]},
+        )
+
+    events = _parse_sse_events(resp.text)
+    complete = [e for e in events if e["event"] == "complete"][0]["data"]
+    assert complete["analyzed_count"] == 1
+    assert complete["failed_count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_batch_analyze_uses_prefetched_cache(client):
+    fid1 = await insert_file(_make_record(path="C:/data/a.wav", filename="a.wav"))
+    fid2 = await insert_file(
+        _make_record(path="C:/data/b.wav", filename="b.wav", file_hash="hash_b")
+    )
+    cls_json = json.dumps([m.model_dump() for m in _mock_classification()])
+    await repository.store_cached_analysis("hash_abc", cls_json, None, "2023")
+    await repository.store_cached_analysis("hash_b", cls_json, None, "2023")
+
+    mock_classifier = MagicMock()
+    with (
+        patch("app.routers.analysis.model_manager.is_ready", return_value=True),
+        patch(
+            "app.routers.analysis.model_manager.get_classifier",
+            return_value=mock_classifier,
+        ),
+        patch("app.routers.analysis.get_cached_analysis") as mock_single_lookup,
+    ):
+        resp = await client.post(
+            "/files/analyze-batch",
+            json={"file_ids": [fid1, fid2], "tiers": [1]},
+        )
+
+    events = _parse_sse_events(resp.text)
+    results = [e["data"] for e in events if e["event"] == "result"]
+    assert [r["file_id"] for r in results] == [fid1, fid2]
+    mock_single_lookup.assert_not_called()
+    mock_classifier.classify.assert_not_called()
+    mock_classifier.classify_batch.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_batch_analyze_overlaps_files_but_keeps_event_order():
+    import asyncio
+
+    from app.models import BatchAnalyzeResult
+    from app.routers.analysis import _stream_analysis
+
+    rows = [{"id": f"f{i}", "filename": f"{i}.wav"} for i in range(3)]
+    second_started = asyncio.Event()
+
+    async def fake_analyze(
+        row, req, settings, analyzed_at, classification=None, cache_map=None
+    ):
+        if row["id"] == "f0":
+            await asyncio.wait_for(second_started.wait(), timeout=1)
+        else:
+            second_started.set()
+        return BatchAnalyzeResult.model_construct(
+            file_id=row["id"], success=True, file=None
+        )
+
+    with (
+        patch("app.routers.analysis._prefetch_cached", return_value={}),
+        patch("app.routers.analysis._classify_uncached", return_value={}),
+        patch("app.routers.analysis._analyze_single_for_batch", fake_analyze),
+    ):
+        frames = [f async for f in _stream_analysis(rows, AnalyzeRequest(tiers=[1]))]
+
+    events = _parse_sse_events(b"".join(frames).decode())
+    assert [(e["event"], e["data"].get("file_id")) for e in events[:-1]] == [
+        ("progress", "f0"),
+        ("result", "f0"),
+        ("progress", "f1"),
+        ("result", "f1"),
+        ("progress", "f2"),
+        ("result", "f2"),
+    ]
+    assert events[-1]["data"]["analyzed_count"] == 3
+
+
+@pytest.mark.asyncio
+async def test_batch_analyze_throttles_progress_events():
+    from app.models import BatchAnalyzeResult
+    from app.routers.analysis import _stream_analysis
+
+    rows = [{"id": f"f{i}", "filename": f"{i}.wav"} for i in range(500)]
+
+    async def fake_analyze(
+        row, req, settings, analyzed_at, classification=None, cache_map=None
+    ):
+        return BatchAnalyzeResult.model_construct(
+            file_id=row["id"], success=True, file=None
+        )
+
+    with (
+        patch("app.routers.analysis._prefetch_cached", return_value={}),
+        patch("app.routers.analysis._classify_uncached", return_value={}),
+        patch("app.routers.analysis._analyze_single_for_batch", fake_analyze),
+        patch("app.routers.analysis._PROGRESS_INTERVAL", 3600.0),
+    ):
+        frames = [f async for f in _stream_analysis(rows, AnalyzeRequest(tiers=[1]))]
+
+    events = _parse_sse_events(b"".join(frames).decode())
+    types = [e["event"] for e in events]
+    assert types.count("result") == 500
+    assert types.count("progress") == 100
+    assert events[0]["data"]["current"] == 1
+
+
+@pytest.mark.asyncio
+async def test_model_calls_run_one_at_a_time_on_inference_thread():
+    import asyncio
+    import threading
+    import time
+
+    from app.routers.analysis import _run_model
+
+    active = []
+    seen = []
+
+    def infer(x):
+        active.append(x)
+        seen.append((len(active), threading.current_thread().name))
+        time.sleep(0.01)
+        active.remove(x)
+        return x * 2
+
+    results = await asyncio.gather(*(_run_model(infer, i) for i in range(3)))
+
+    assert results == [0, 2, 4]
+    assert all(n == 1 and name.startswith("clap") for n, name in seen)
+
+
+@pytest.mark.asyncio
+async def test_keepalive_pings_while_stream_is_quiet():
+    import asyncio
+
+    from app.routers.analysis import _SSE_PING, _with_keepalive
+
+    async def slow_frames():
+        yield b"a"
+        await asyncio.sleep(0.05)
+        yield b"b"
+
+    frames = [f async for f in _with_keepalive(slow_frames(), interval=0.01)]
+    assert frames[0] == b"a"
+    assert frames[-1] == b"b"
+    assert _SSE_PING in frames[1:-1]
+
 
 @pytest.mark.asyncio
 async def test_batch_analyze_503_when_not_ready(client):
@@ -412,6 +737,43 @@ def test_filename_boost_below_threshold_no_rerank():
     assert result[0].cat_id == "CAT0"
 
 
+def test_filename_boost_fuzzy_matches_each_filename_once():
+    matches = _make_matches(5)
+    mock_fuzzy = [
+        FuzzyMatch(
+            cat_id="CAT3", category="X", subcategory="Y", score=3, matched_terms=["x"]
+        ),
+    ]
+    with patch(
+        "app.routers.analysis.fuzzy_match", return_value=mock_fuzzy
+    ) as mock_match:
+        first = apply_filename_boost(matches, "keyword_file.wav", top_n=3)
+        second = apply_filename_boost(matches, "keyword_file.wav", top_n=3)
+        apply_filename_boost(matches, "renamed_file.wav", top_n=3)
+
+    assert first == second
+    assert first[0].cat_id == "CAT3"
+    assert mock_match.call_count == 2
+
+
+def test_filename_boost_without_overlap_skips_blend():
+    """Keyword matches outside the candidates fall back to renormalization."""
+    matches = _make_matches(10)
+    mock_fuzzy = [
+        FuzzyMatch(
+            cat_id="OTHER", category="X", subcategory="Y", score=3, matched_terms=["x"]
+        ),
+    ]
+    with (
+        patch("app.routers.analysis.fuzzy_match", return_value=mock_fuzzy),
+        patch("app.routers.analysis._blend_confidence") as mock_blend,
+    ):
+        result = apply_filename_boost(matches, "unrelated_file.wav", top_n=3)
+
+    mock_blend.assert_not_called()
+    assert result == apply_filename_boost(matches, None, top_n=3)
+
+
 def test_renormalize_no_keyword():
     """No-keyword path renormalizes confidences to sum to ~1.0."""
     matches = _make_matches(10)
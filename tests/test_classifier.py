@@ -18,15 +18,18 @@ def classifier():
     return CLAPClassifier()
 
 
-def _make_mock_model(similarity_scores: list[float]):
-    """Create a mock CLAP model that returns given similarity scores."""
+def _make_mock_model():
+    """Create a mock CLAP model whose audio embedding is the unit vector [1]."""
     model = MagicMock()
-    model.get_audio_embeddings.return_value = np.array([[0.1, 0.2]])
-    # similarity: shape (1, N)
-    model.compute_similarity.return_value = np.array([similarity_scores])
+    model.get_audio_embeddings.return_value = np.array([[1.0]])
     return model
 
 
+def _score_matrix(similarity_scores: list[float]) -> np.ndarray:
+    """1-D text "embeddings" whose product with the unit audio vector is the scores."""
+    return np.array(similarity_scores, dtype=np.float32)[:, None]
+
+
 # ---------------------------------------------------------------------------
 # is_ready
 # ---------------------------------------------------------------------------
@@ -56,9 +59,9 @@ def test_classify_returns_sorted_matches(classifier):
         {"cat_id": "ROCKImpt", "category": "ROCK", "subcategory": "IMPACT"},
     ]
     scores = [5.0, 1.0, 3.0]
-    model = _make_mock_model(scores)
+    model = _make_mock_model()
     classifier._model = model
-    classifier._text_embeddings = np.array([[0.1]] * 3)
+    classifier._text_embeddings = _score_matrix(scores)
     classifier._text_meta = meta
 
     results = classifier.classify("/fake/path.wav", top_n=5)
@@ -84,9 +87,9 @@ def test_classify_groups_by_catid(classifier):
         {"cat_id": "AIRBrst", "category": "AIR", "subcategory": "BURST"},
     ]
     scores = [2.0, 5.0, 1.0]  # second WATRSurf phrase scores higher
-    model = _make_mock_model(scores)
+    model = _make_mock_model()
     classifier._model = model
-    classifier._text_embeddings = np.array([[0.1]] * 3)
+    classifier._text_embeddings = _score_matrix(scores)
     classifier._text_meta = meta
 
     results = classifier.classify("/fake/path.wav", top_n=5)
@@ -95,6 +98,35 @@ def test_classify_groups_by_catid(classifier):
     assert results[0].confidence > results[1].confidence
 
 
+def test_classify_groups_non_adjacent_phrases(classifier):
+    # Phrases of one CatID need not be adjacent in the embedding matrix
+    meta = [
+        {"cat_id": "WATRSurf", "category": "WATER", "subcategory": "SURF"},
+        {"cat_id": "AIRBrst", "category": "AIR", "subcategory": "BURST"},
+        {"cat_id": "WATRSurf", "category": "WATER", "subcategory": "SURF"},
+    ]
+    scores = [1.0, 2.0, 5.0]
+    classifier._model = _make_mock_model()
+    classifier._text_embeddings = _score_matrix(scores)
+    classifier._text_meta = meta
+
+    results = classifier.classify("/fake/path.wav", top_n=5)
+    assert [r.cat_id for r in results] == ["WATRSurf", "AIRBrst"]
+
+
+def test_classify_ties_keep_first_seen_order(classifier):
+    meta = [
+        {"cat_id": f"CAT{i}", "category": "X", "subcategory": "Y"} for i in range(6)
+    ]
+    scores = [1.0, 3.0, 3.0, 0.5, 3.0, 2.0]
+    classifier._model = _make_mock_model()
+    classifier._text_embeddings = _score_matrix(scores)
+    classifier._text_meta = meta
+
+    results = classifier.classify("/fake/path.wav", top_n=2)
+    assert [r.cat_id for r in results] == ["CAT1", "CAT2"]
+
+
 # ---------------------------------------------------------------------------
 # classify — top_n
 # ---------------------------------------------------------------------------
@@ -105,15 +137,148 @@ def test_classify_top_n(classifier):
         {"cat_id": f"CAT{i}", "category": "X", "subcategory": "Y"} for i in range(10)
     ]
     scores = [0.1 * i for i in range(10)]
-    model = _make_mock_model(scores)
+    model = _make_mock_model()
     classifier._model = model
-    classifier._text_embeddings = np.array([[0.1]] * 10)
+    classifier._text_embeddings = _score_matrix(scores)
     classifier._text_meta = meta
 
     results = classifier.classify("/fake/path.wav", top_n=3)
     assert len(results) == 3
 
 
+def test_classify_matches_scaled_cosine_similarity(classifier):
+    """Confidences follow softmax over logit_scale * cosine similarity."""
+    rng = np.random.default_rng(0)
+    text = rng.standard_normal((4, 16)).astype(np.float32)
+    audio = rng.standard_normal((1, 16)).astype(np.float32)
+    meta = [
+        {"cat_id": f"CAT{i}", "category": "X", "subcategory": "Y"} for i in range(4)
+    ]
+    classifier._model = MagicMock()
+    classifier._model.get_audio_embeddings.return_value = audio
+    classifier._text_embeddings = text / np.linalg.norm(text, axis=1, keepdims=True)
+    classifier._text_meta = meta
+    classifier._logit_scale = 33.0
+
+    cosine = classifier._text_embeddings @ (audio[0] / np.linalg.norm(audio[0]))
+    expected = np.exp(33.0 * cosine - np.max(33.0 * cosine))
+    expected /= expected.sum()
+
+    results = classifier.classify("/fake/path.wav", top_n=4)
+    by_id = {r.cat_id: r.confidence for r in results}
+    for i in range(4):
+        assert by_id[f"CAT{i}"] == pytest.approx(expected[i], abs=1e-5)
+
+
+def test_classify_batch_matches_per_file_classify(classifier):
+    rng = np.random.default_rng(1)
+    text = rng.standard_normal((6, 8)).astype(np.float32)
+    audio = rng.standard_normal((3, 8)).astype(np.float32)
+    classifier._model = MagicMock()
+    classifier._text_embeddings = text / np.linalg.norm(text, axis=1, keepdims=True)
+    classifier._text_meta = [
+        {"cat_id": f"CAT{i // 2}", "category": "X", "subcategory": "Y"}
+        for i in range(6)
+    ]
+
+    classifier._model.get_audio_embeddings.return_value = audio
+    batch = classifier.classify_batch(["a.wav", "b.wav", "c.wav"], top_n=3)
+    classifier._model.get_audio_embeddings.assert_called_once_with(
+        ["a.wav", "b.wav", "c.wav"]
+    )
+
+    assert len(batch) == 3
+    for row, results in zip(audio, batch):
+        classifier._model.get_audio_embeddings.return_value = row[None, :]
+        assert results == classifier.classify("x.wav", top_n=3)
+
+
+def _load_with_fake_clap(monkeypatch, quantize: bool) -> CLAPClassifier:
+    """load_model() against stand-ins for msclap and the torch-backed compat
+    module; int8 mode is modelled as small noise on every embedding."""
+    import sys
+    import types
+
+    rng = np.random.default_rng(2)
+    text = rng.standard_normal((12, 16)).astype(np.float32)
+    audio = rng.standard_normal((1, 16)).astype(np.float32)
+
+    def make_model(version, use_cuda):
+        model = MagicMock()
+        model.clap.logit_scale.exp.return_value = 20.0
+        model.get_text_embeddings.side_effect = lambda phrases: text.copy()
+        model.get_audio_embeddings.side_effect = lambda paths: audio.copy()
+        return model
+
+    def fake_quantize(model):
+        noise = np.random.default_rng(3)
+        embed_text, embed_audio = model.get_text_embeddings, model.get_audio_embeddings
+        model.get_text_embeddings = MagicMock(
+            side_effect=lambda p: (
+                embed_text(p) + 0.01 * noise.standard_normal(text.shape)
+            )
+        )
+        model.get_audio_embeddings = MagicMock(
+            side_effect=lambda p: (
+                embed_audio(p) + 0.01 * noise.standard_normal(audio.shape)
+            )
+        )
+
+    compat = types.SimpleNamespace(
+        patch_clap_audio=lambda model: None,
+        patch_clap_inference=lambda model: None,
+        quantize_clap_int8=MagicMock(side_effect=fake_quantize),
+    )
+    monkeypatch.setitem(sys.modules, "msclap", types.SimpleNamespace(CLAP=make_model))
+    monkeypatch.setitem(sys.modules, "app.ml.clap_compat", compat)
+
+    classifier = CLAPClassifier()
+    classifier.load_model(quantize=quantize)
+    assert compat.quantize_clap_int8.called is quantize
+    meta = [
+        {"cat_id": f"CAT{i // 2}", "category": "X", "subcategory": "Y"}
+        for i in range(12)
+    ]
+    classifier.precompute_embeddings([f"phrase {i}" for i in range(12)], meta)
+    return classifier
+
+
+def test_int8_classify_keeps_top_n_catids(monkeypatch):
+    """The quantized model still ranks the same top-N CatIDs."""
+    full = _load_with_fake_clap(monkeypatch, quantize=False)
+    int8 = _load_with_fake_clap(monkeypatch, quantize=True)
+
+    expected = full.classify("/fake/a.wav", top_n=3)
+    results = int8.classify("/fake/a.wav", top_n=3)
+
+    assert len(results) == 3
+    assert [r.cat_id for r in results] == [r.cat_id for r in expected]
+    for got, want in zip(results, expected):
+        assert got.confidence == pytest.approx(want.confidence, abs=0.05)
+
+
+def test_classify_reuses_audio_embedding_until_file_changes(classifier, tmp_path):
+    import os
+
+    classifier._model = _make_mock_model()
+    classifier._text_embeddings = _score_matrix([0.9, 0.1])
+    classifier._text_meta = [
+        {"cat_id": "A", "category": "X", "subcategory": "Y"},
+        {"cat_id": "B", "category": "X", "subcategory": "Y"},
+    ]
+    path = tmp_path / "a.wav"
+    path.write_bytes(b"one")
+
+    first = classifier.classify(str(path))
+    assert classifier.classify(str(path)) == first
+    assert classifier._model.get_audio_embeddings.call_count == 1
+
+    path.write_bytes(b"changed")
+    os.utime(path, ns=(0, 0))
+    classifier.classify(str(path))
+    assert classifier._model.get_audio_embeddings.call_count == 2
+
+
 # ---------------------------------------------------------------------------
 # save/load embeddings
 # ---------------------------------------------------------------------------
@@ -127,7 +292,7 @@ def test_save_load_embeddings(classifier, tmp_path):
     classifier._text_embeddings = embeddings
     classifier._text_meta = meta
 
-    path = tmp_path / "emb.npz"
+    path = tmp_path / "emb.npy"
     label_hash = "abc123"
     classifier.save_embeddings(str(path), label_hash)
     assert path.exists()
@@ -136,21 +301,62 @@ def test_save_load_embeddings(classifier, tmp_path):
     c2 = CLAPClassifier()
     loaded = c2.load_embeddings(str(path), label_hash)
     assert loaded is True
-    # load_embeddings converts to torch tensor; compare as numpy
-    assert np.allclose(c2._text_embeddings.numpy(), embeddings)
+    assert isinstance(c2._text_embeddings, np.memmap)
+    assert np.array_equal(c2._text_embeddings, embeddings)
     assert c2._text_meta == meta
 
 
+def test_save_embeddings_stores_meta_by_column(classifier, tmp_path):
+    import json
+
+    classifier._text_embeddings = np.ones((3, 4), dtype=np.float32)
+    classifier._text_meta = [
+        {"cat_id": "A", "category": "X", "subcategory": "Y"},
+        {"cat_id": "A", "category": "X", "subcategory": "Y"},
+        {"cat_id": "B", "category": "X", "subcategory": "Z"},
+    ]
+    path = tmp_path / "emb.npy"
+    classifier.save_embeddings(str(path), "h")
+
+    sidecar = json.loads((tmp_path / "emb.json").read_text("utf-8"))
+    assert sidecar["meta"] == {
+        "cat_id": ["A", "A", "B"],
+        "category": ["X", "X", "X"],
+        "subcategory": ["Y", "Y", "Z"],
+    }
+
+    c2 = CLAPClassifier()
+    assert c2.load_embeddings(str(path), "h") is True
+    assert c2._text_meta == classifier._text_meta
+    assert c2._text_meta[0] is c2._text_meta[1]
+
+
 def test_load_embeddings_hash_mismatch(classifier, tmp_path):
     embeddings = np.random.randn(5, 64).astype(np.float32)
     meta = [{"cat_id": f"C{i}", "category": "X", "subcategory": "Y"} for i in range(5)]
     classifier._text_embeddings = embeddings
     classifier._text_meta = meta
 
-    path = tmp_path / "emb.npz"
+    path = tmp_path / "emb.npy"
     classifier.save_embeddings(str(path), "hash_v1")
 
     c2 = CLAPClassifier()
     loaded = c2.load_embeddings(str(path), "hash_v2")
     assert loaded is False
     assert c2._text_embeddings is None
+
+
+def test_load_embeddings_missing_or_truncated(classifier, tmp_path):
+    embeddings = np.random.randn(5, 64).astype(np.float32)
+    meta = [{"cat_id": f"C{i}", "category": "X", "subcategory": "Y"} for i in range(5)]
+    classifier._text_embeddings = embeddings
+    classifier._text_meta = meta
+
+    c2 = CLAPClassifier()
+    assert c2.load_embeddings(str(tmp_path / "missing.npy"), "hash_v1") is False
+
+    path = tmp_path / "emb.npy"
+    classifier.save_embeddings(str(path), "hash_v1")
+    path.write_bytes(path.read_bytes()[:200])
+    assert c2.load_embeddings(str(path), "hash_v1") is False
+    assert c2._text_embeddings is None
@@ -101,6 +101,23 @@ class TestImportFallback:
         meta = _apply_import_fallbacks(meta)
         assert meta["keywords"] == "thunder;storm;rain"
 
+    def test_info_artist_when_bext_originator_empty(self):
+        """Designer falls through an empty BEXT originator to INFO artist."""
+        from app.routers.files import _apply_import_fallbacks
+
+        meta = {"bext": {"originator": ""}, "info": {"artist": "Jane Doe"}}
+        assert _apply_import_fallbacks(meta)["designer"] == "Jane Doe"
+
+    def test_no_bext_or_info_leaves_meta_unchanged(self):
+        from app.routers.files import _apply_import_fallbacks
+
+        meta = {"description": None, "bext": None, "info": None}
+        assert _apply_import_fallbacks(meta) == {
+            "description": None,
+            "bext": None,
+            "info": None,
+        }
+
 
 # ---------------------------------------------------------------------------
 # Save-time write tests
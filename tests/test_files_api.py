@@ -2,6 +2,8 @@
 
 import json
 import os
+import sqlite3
+from unittest.mock import patch
 
 import pytest
 import pytest_asyncio
@@ -77,6 +79,79 @@ async def test_import_recursive(tmp_path, client):
     assert resp.json()["count"] == 2
 
 
+@pytest.mark.asyncio
+async def test_import_walk_filters_and_orders(tmp_path, client):
+    """Only .wav files (any case) are imported, in path order."""
+    sub = tmp_path / "b"
+    sub.mkdir()
+    (tmp_path / "folder.wav").mkdir()
+    (tmp_path / "notes.txt").write_text("x")
+    write_wav(tmp_path, "c.WAV")
+    write_wav(tmp_path, "a.wav")
+    write_wav(sub, "z.wav")
+
+    flat = await client.post(
+        "/files/import",
+        json={"directory": str(tmp_path), "recursive": False},
+    )
+    assert [f["filename"] for f in flat.json()["files"]] == ["a.wav", "c.WAV"]
+
+    deep = await client.post(
+        "/files/import",
+        json={"directory": str(tmp_path), "recursive": True},
+    )
+    assert [f["filename"] for f in deep.json()["files"]] == [
+        "a.wav",
+        "z.wav",
+        "c.WAV",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_import_files_same_path_twice(tmp_path, client):
+    """Two spellings of one path are stored once and reported for each."""
+    write_wav(tmp_path, "a.wav")
+    paths = [str(tmp_path / "a.wav"), os.path.join(str(tmp_path), ".", "a.wav")]
+
+    resp = await client.post("/files/import-files", json={"paths": paths})
+
+    assert resp.status_code == 200
+    files = resp.json()["files"]
+    assert len(files) == 2
+    assert files[0]["id"] == files[1]["id"]
+    assert (await client.get("/files")).json()["count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_import_symlink_and_target(tmp_path, client):
+    """A symlink to a WAV in the same directory imports as its target."""
+    write_wav(tmp_path, "a.wav")
+    os.symlink(tmp_path / "a.wav", tmp_path / "link.wav")
+
+    resp = await client.post(
+        "/files/import", json={"directory": str(tmp_path), "recursive": False}
+    )
+
+    assert resp.status_code == 200
+    assert len({f["id"] for f in resp.json()["files"]}) == 1
+    assert (await client.get("/files")).json()["count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_import_falls_back_to_per_file_upsert(wav_dir, client):
+    """A failed batch insert is retried file by file instead of failing."""
+
+    async def failing_batch(records):
+        raise sqlite3.OperationalError("database is locked")
+
+    with patch("app.routers.files.upsert_files_many", failing_batch):
+        resp = await client.post("/files/import", json={"directory": str(wav_dir)})
+
+    assert resp.status_code == 200
+    assert resp.json()["count"] == 3
+    assert (await client.get("/files")).json()["count"] == 3
+
+
 @pytest.mark.asyncio
 async def test_import_bad_directory(client):
     resp = await client.post(
@@ -137,6 +212,51 @@ async def test_import_stale_removal(wav_dir, client):
     assert resp2.json()["count"] == 2
 
 
+def _models_at_version(version: str | None):
+    """Patch model readiness (None = still loading) and the analysis version."""
+    return patch.multiple(
+        "app.routers.files.model_manager",
+        is_ready=lambda: version is not None,
+        get_analysis_version=lambda: version,
+    )
+
+
+async def _seed_cached_import(tmp_path) -> None:
+    """One WAV in tmp_path whose hash has a cached result from older labels."""
+    wav_path = write_wav(tmp_path, "stale.wav")
+    classification = [
+        {
+            "cat_id": "WATRSurf",
+            "category": "WATER",
+            "subcategory": "SURF",
+            "category_full": "WATER-SURF",
+            "confidence": 0.87,
+        }
+    ]
+    await store_cached_analysis(
+        compute_file_hash(str(wav_path)),
+        json.dumps(classification),
+        None,
+        "2023:oldlabels",
+    )
+
+
+@pytest.mark.asyncio
+async def test_import_ignores_cache_from_other_labels(tmp_path, client):
+    await _seed_cached_import(tmp_path)
+    with _models_at_version("2023:newlabels"):
+        resp = await client.post("/files/import", json={"directory": str(tmp_path)})
+    assert resp.json()["files"][0]["analysis"] is None
+
+
+@pytest.mark.asyncio
+async def test_import_ignores_cache_before_models_load(tmp_path, client):
+    await _seed_cached_import(tmp_path)
+    with _models_at_version(None):
+        resp = await client.post("/files/import", json={"directory": str(tmp_path)})
+    assert resp.json()["files"][0]["analysis"] is None
+
+
 @pytest.mark.asyncio
 async def test_import_prepopulates_analysis_from_cache(tmp_path, client):
     """Import pre-populates analysis + suggestions when analysis_cache has results."""
@@ -153,9 +273,12 @@ async def test_import_prepopulates_analysis_from_cache(tmp_path, client):
             "confidence": 0.87,
         }
     ]
-    await store_cached_analysis(file_hash, json.dumps(classification), None, "2023")
+    await store_cached_analysis(
+        file_hash, json.dumps(classification), None, "2023:labelhash"
+    )
 
-    resp = await client.post("/files/import", json={"directory": str(tmp_path)})
+    with _models_at_version("2023:labelhash"):
+        resp = await client.post("/files/import", json={"directory": str(tmp_path)})
     assert resp.status_code == 200
     files = resp.json()["files"]
     cached_file = next(f for f in files if f["filename"] == "test_cached.wav")
@@ -165,6 +288,7 @@ async def test_import_prepopulates_analysis_from_cache(tmp_path, client):
     cls = cached_file["analysis"]["classification"]
     assert len(cls) >= 1
     assert cls[0]["cat_id"] == "WATRSurf"
+    assert cached_file["analysis"]["model_version"] == "2023"
 
     # Suggestions should be hydrated from the analysis
     assert cached_file["suggestions"] is not None
@@ -198,6 +322,40 @@ async def test_get_files_filter_category(wav_dir, client):
     assert data["files"][0]["category"] == "AMBIENCE"
 
 
+@pytest.mark.asyncio
+async def test_get_files_matches_single_record_shape(wav_dir, client):
+    """Streamed list records match GET /files/{id} field for field."""
+    await client.post("/files/import", json={"directory": str(wav_dir)})
+    resp = await client.get("/files", params={"limit": 2})
+    assert resp.headers["content-type"] == "application/json"
+    data = resp.json()
+    assert data["count"] == 2
+    for listed in data["files"]:
+        single = (await client.get(f"/files/{listed['id']}")).json()
+        assert listed == single
+
+
+@pytest.mark.asyncio
+async def test_get_files_query_error_is_not_streamed(client):
+    """A failing query yields an error response, not a truncated 200 body."""
+    from app.errors import VALIDATION_ERROR, AppError
+
+    async def failing_rows(**kwargs):
+        raise AppError(VALIDATION_ERROR, 422, "bad query")
+        yield
+
+    with patch("app.routers.files.iter_files", failing_rows):
+        resp = await client.get("/files")
+    assert resp.status_code == 422
+    assert resp.json()["code"] == VALIDATION_ERROR
+
+
+@pytest.mark.asyncio
+async def test_get_files_empty(client):
+    resp = await client.get("/files")
+    assert resp.json() == {"files": [], "count": 0}
+
+
 # ---------------------------------------------------------------------------
 # GET /files/{id}
 # ---------------------------------------------------------------------------
@@ -239,6 +397,26 @@ async def test_get_audio(wav_dir, client):
     assert resp.content[:4] == b"RIFF"
 
 
+@pytest.mark.asyncio
+async def test_get_audio_range_and_revalidation(wav_dir, client):
+    """Range requests return partial content; a matching ETag returns 304."""
+    import_resp = await client.post("/files/import", json={"directory": str(wav_dir)})
+    file_id = import_resp.json()["files"][0]["id"]
+
+    partial = await client.get(
+        f"/files/{file_id}/audio", headers={"Range": "bytes=0-3"}
+    )
+    assert partial.status_code == 206
+    assert partial.content == b"RIFF"
+
+    etag = partial.headers["etag"]
+    cached = await client.get(
+        f"/files/{file_id}/audio", headers={"If-None-Match": etag}
+    )
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+
 @pytest.mark.asyncio
 async def test_get_audio_not_found(client):
     """GET /files/{id}/audio returns 404 for unknown ID."""
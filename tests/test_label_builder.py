@@ -74,7 +74,17 @@ def test_compute_labels_hash_deterministic():
     h1 = compute_labels_hash(labels)
     h2 = compute_labels_hash(labels)
     assert h1 == h2
-    assert len(h1) == 64  # SHA-256 hex digest
+    assert len(h1) == 64  # 256-bit hex digest
+
+
+def test_compute_labels_hash_changes_with_phrases():
+    from app.ml.label_builder import LabelEntry, compute_labels_hash
+
+    a = [LabelEntry("A", "X", "Y", ["one", "two"])]
+    b = [LabelEntry("A", "X", "Y", ["one", "two!"])]
+    c = [LabelEntry("A", "X", "Y", ["two", "one"])]
+    assert compute_labels_hash(a) != compute_labels_hash(b)
+    assert compute_labels_hash(a) == compute_labels_hash(c)
 
 
 # ---------------------------------------------------------------------------
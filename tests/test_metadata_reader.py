@@ -2,6 +2,7 @@
 
 import os
 
+import pytest
 from conftest import (
     IXML_WITH_USER,
     IXML_WITH_VENDOR,
@@ -9,7 +10,12 @@ from conftest import (
     write_wav,
 )
 
-from app.metadata.reader import compute_file_hash, read_metadata
+from app.metadata.reader import (
+    compute_file_hash,
+    compute_file_hashes,
+    read_metadata,
+    read_metadata_many,
+)
 
 
 # ---------------------------------------------------------------------------
@@ -244,6 +250,29 @@ def test_read_metadata_aswg_creator_id_separate_from_originator(tmp_path):
     assert result["creator_id"] == "Primary"
 
 
+def test_read_metadata_ixml_comments_not_custom_fields(tmp_path):
+    """XML comments inside <USER> are ignored rather than read as custom tags."""
+    ixml = (
+        "<BWFXML><USER><CATEGORY>DOORS</CATEGORY>"
+        "<!-- note --><MYTAG>value</MYTAG></USER></BWFXML>"
+    )
+    path = write_wav(tmp_path, "comment.wav", ixml_xml=ixml)
+    result = read_metadata(str(path))
+    assert result["category"] == "DOORS"
+    assert result["custom_fields"] == {"MYTAG": "value"}
+
+
+def test_read_metadata_utf16_ixml(tmp_path):
+    """UTF-16 iXML (with BOM) is read like UTF-8."""
+    ixml = (
+        '<?xml version="1.0" encoding="UTF-16"?>'
+        "<BWFXML><USER><FXNAME>Wide Chars</FXNAME></USER></BWFXML>"
+    )
+    path = write_wav(tmp_path, "utf16.wav", ixml_raw_bytes=ixml.encode("utf-16"))
+    result = read_metadata(str(path))
+    assert result["fx_name"] == "Wide Chars"
+
+
 # ---------------------------------------------------------------------------
 # compute_file_hash
 # ---------------------------------------------------------------------------
@@ -269,3 +298,49 @@ def test_compute_file_hash_changes_on_modification(tmp_path):
 
     h2 = compute_file_hash(str(path))
     assert h1 != h2
+
+
+def test_compute_file_hash_stable_format(tmp_path):
+    """Digest matches the stored-hash format: SHA-256(head 4KB + size + mtime)."""
+    import hashlib
+
+    path = write_wav(tmp_path, "stable.wav", num_samples=4000)
+    stat = os.stat(path)
+    expected = hashlib.sha256(
+        path.read_bytes()[:4096]
+        + str(stat.st_size).encode()
+        + str(stat.st_mtime).encode()
+    ).hexdigest()
+    assert compute_file_hash(str(path)) == expected
+
+
+@pytest.mark.asyncio
+async def test_compute_file_hashes_preserves_order(tmp_path):
+    """Bulk hashing matches compute_file_hash; missing files yield None."""
+    a = write_wav(tmp_path, "a.wav")
+    b = write_wav(tmp_path, "b.wav", num_samples=300)
+    missing = tmp_path / "missing.wav"
+
+    results = await compute_file_hashes([str(a), str(missing), str(b)])
+
+    assert results == [compute_file_hash(str(a)), None, compute_file_hash(str(b))]
+
+
+# ---------------------------------------------------------------------------
+# read_metadata_many
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.asyncio
+async def test_read_metadata_many_preserves_order(tmp_path):
+    """Results come back in input order; unreadable files yield None."""
+    good_a = write_wav(tmp_path, "a.wav", sample_rate=44100)
+    bad = tmp_path / "bad.wav"
+    bad.write_bytes(b"not a wav file")
+    good_b = write_wav(tmp_path, "b.wav", sample_rate=96000)
+
+    results = await read_metadata_many([str(good_a), str(bad), str(good_b)])
+
+    assert results[0]["technical"]["sample_rate"] == 44100
+    assert results[1] is None
+    assert results[2]["technical"]["sample_rate"] == 96000
@@ -13,16 +13,20 @@ def _reset_manager():
     model_manager._classifier = None
     model_manager._captioner = None
     model_manager._loading = False
-    model_manager._ready = False
+    model_manager._ready_event.clear()
     model_manager._error = None
     model_manager._status_message = ""
+    model_manager._analysis_version = "2023"
+    model_manager._quantize = None
     yield
     model_manager._classifier = None
     model_manager._captioner = None
     model_manager._loading = False
-    model_manager._ready = False
+    model_manager._ready_event.clear()
     model_manager._error = None
     model_manager._status_message = ""
+    model_manager._analysis_version = "2023"
+    model_manager._quantize = None
 
 
 # ---------------------------------------------------------------------------
@@ -55,7 +59,7 @@ def test_start_loading_success_sets_ready(mock_pipeline):
     def fake_load():
         model_manager._classifier = MagicMock()
         model_manager._classifier.is_ready.return_value = True
-        model_manager._ready = True
+        model_manager._ready_event.set()
 
     mock_pipeline.side_effect = fake_load
     model_manager.start_loading()
@@ -94,7 +98,7 @@ def test_get_classifier_raises_when_not_ready():
 def test_get_classifier_returns_when_ready():
     mock_cls = MagicMock()
     model_manager._classifier = mock_cls
-    model_manager._ready = True
+    model_manager._ready_event.set()
     assert model_manager.get_classifier() is mock_cls
 
 
@@ -107,7 +111,7 @@ def test_get_classifier_returns_when_ready():
 def test_get_captioner_lazy_loads(mock_cap_cls):
     mock_instance = MagicMock()
     mock_cap_cls.return_value = mock_instance
-    model_manager._ready = True
+    model_manager._ready_event.set()
 
     cap = model_manager.get_captioner()
     assert cap is mock_instance
@@ -118,8 +122,52 @@ def test_get_captioner_lazy_loads(mock_cap_cls):
 def test_get_captioner_reuses_instance(mock_cap_cls):
     mock_instance = MagicMock()
     model_manager._captioner = mock_instance
-    model_manager._ready = True
+    model_manager._ready_event.set()
 
     cap = model_manager.get_captioner()
     assert cap is mock_instance
     mock_cap_cls.assert_not_called()
+
+
+@patch("app.ml.model_manager.get_settings")
+@patch("app.ml.model_manager.CLAPCaptioner")
+def test_get_captioner_follows_int8_setting(mock_cap_cls, mock_settings):
+    mock_settings.return_value.clap_int8 = False
+    cap = model_manager.get_captioner()
+    cap.load_model.assert_called_once_with(quantize=False)
+
+
+@patch("app.ml.model_manager.get_settings")
+@patch("app.ml.model_manager.CLAPCaptioner")
+def test_get_captioner_keeps_int8_mode_of_loaded_pipeline(mock_cap_cls, mock_settings):
+    """Toggling clap_int8 after load does not change the captioner's mode."""
+    model_manager._quantize = True
+    mock_settings.return_value.clap_int8 = False
+    cap = model_manager.get_captioner()
+    cap.load_model.assert_called_once_with(quantize=True)
+
+
+# ---------------------------------------------------------------------------
+# _load_pipeline
+# ---------------------------------------------------------------------------
+
+
+@patch("app.ml.model_manager._preload_modules")
+@patch("app.ml.model_manager.CLAPClassifier")
+def test_load_pipeline_builds_labels_alongside_model(
+    mock_cls_cls, _mock_preload, tmp_path
+):
+    mock_cls = mock_cls_cls.return_value
+    mock_cls.load_embeddings.return_value = False
+    labels = ("hash", ["a phrase"], [{"cat_id": "A"}])
+
+    with (
+        patch("app.ml.model_manager._prepare_labels", return_value=labels),
+        patch("app.ml.model_manager.paths.get_cache_dir", return_value=str(tmp_path)),
+    ):
+        model_manager._load_pipeline()
+
+    mock_cls.load_model.assert_called_once()
+    mock_cls.precompute_embeddings.assert_called_once_with(["a phrase"], labels[2])
+    assert model_manager.get_classifier() is mock_cls
+    assert model_manager.get_analysis_version() == "2023:hash"
@@ -1,23 +1,38 @@
 """Tests for the async SQLite repository."""
 
+import sqlite3
+
 import pytest
 import pytest_asyncio
 
+from app.db.mappers import dict_to_file_record
 from app.db.repository import (
+    bulk_import_mode,
     clear_analysis_cache,
     close,
     connect,
     count_files,
     delete_files_by_paths,
     get_all_files,
+    get_cached_analyses,
     get_cached_analysis,
+    get_db,
     get_file,
     get_file_by_path,
+    get_files_by_ids,
+    get_files_by_paths,
+    get_paths_under,
     insert_file,
+    insert_files_many,
     store_cached_analysis,
     update_file,
+    update_file_returning,
+    update_files_returning,
     upsert_file,
+    upsert_files_many,
+    write_transaction,
 )
+from app.models import FileRecord
 
 
 @pytest_asyncio.fixture
@@ -70,6 +85,82 @@ def _make_record(**overrides) -> dict:
     return base
 
 
+# ---------------------------------------------------------------------------
+# Connection tuning
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.asyncio
+async def test_connect_enables_wal(tmp_path):
+    await connect(str(tmp_path / "nomen.db"))
+    try:
+        cursor = await get_db().execute("PRAGMA journal_mode")
+        assert (await cursor.fetchone())[0] == "wal"
+        cursor = await get_db().execute("PRAGMA synchronous")
+        assert (await cursor.fetchone())[0] == 1  # NORMAL
+    finally:
+        await close()
+
+
+@pytest.mark.asyncio
+async def test_file_db_reads_see_committed_writes(tmp_path):
+    """Reads go through the read-only pool and still see the writer's commits."""
+    await connect(str(tmp_path / "nomen.db"))
+    try:
+        file_id = await insert_file(_make_record(path="/pool.wav"))
+        await update_file(file_id, {"category": "AMBIENCE"})
+        for _ in range(8):  # cycle through every reader
+            row = await get_file(file_id)
+            assert row["category"] == "AMBIENCE"
+        assert await count_files() == 1
+    finally:
+        await close()
+
+
+@pytest.mark.asyncio
+async def test_connect_migrates_legacy_schema(tmp_path):
+    """Pre-migration DBs gain the added columns and an indexed FTS table."""
+    import sqlite3
+
+    db_path = tmp_path / "legacy.db"
+    legacy = sqlite3.connect(db_path)
+    legacy.execute(
+        "CREATE TABLE files (id TEXT PRIMARY KEY, path TEXT UNIQUE NOT NULL, "
+        "filename TEXT NOT NULL, directory TEXT NOT NULL, "
+        "status TEXT NOT NULL DEFAULT 'unmodified', changed_fields TEXT, "
+        "file_hash TEXT NOT NULL, category TEXT, fx_name TEXT, "
+        "description TEXT, keywords TEXT, technical TEXT NOT NULL)"
+    )
+    legacy.execute(
+        "INSERT INTO files (id, path, filename, directory, file_hash, technical) "
+        "VALUES ('old', '/old.wav', 'rain_old.wav', '/', 'h', '{}')"
+    )
+    legacy.commit()
+    legacy.close()
+
+    await connect(str(db_path))
+    try:
+        cursor = await get_db().execute("PRAGMA table_info(files)")
+        columns = {row[1] for row in await cursor.fetchall()}
+        assert {"custom_fields", "analysis", "creator_id", "source_id"} <= columns
+        rows = await get_all_files(search="rain")
+        assert [r["id"] for r in rows] == ["old"]
+    finally:
+        await close()
+
+
+@pytest.mark.asyncio
+async def test_bulk_import_mode_restores_synchronous(db):
+    async def synchronous() -> int:
+        cursor = await get_db().execute("PRAGMA synchronous")
+        return (await cursor.fetchone())[0]
+
+    async with bulk_import_mode():
+        assert await synchronous() == 0  # OFF
+        await insert_file(_make_record())
+    assert await synchronous() == 1  # NORMAL
+
+
 # ---------------------------------------------------------------------------
 # Insert + Get
 # ---------------------------------------------------------------------------
@@ -88,12 +179,123 @@ async def test_insert_and_get_by_id(db):
     assert row["technical"]["sample_rate"] == 44100
 
 
+@pytest.mark.asyncio
+async def test_insert_files_many(db):
+    recs = [_make_record(path=f"/data/{i}.wav", category="RAIN") for i in range(3)]
+    file_ids = await insert_files_many(recs)
+    assert len(set(file_ids)) == 3
+    assert await count_files() == 3
+
+    row = await get_file(file_ids[1])
+    assert row["path"] == "/data/1.wav"
+    assert row["technical"]["sample_rate"] == 44100
+    assert await insert_files_many([]) == []
+
+
+@pytest.mark.asyncio
+async def test_upsert_files_many_merges_existing_and_repeated_paths(db):
+    existing_id = await insert_file(_make_record(path="/data/a.wav"))
+    recs = [
+        _make_record(path="/data/a.wav", category="RAIN"),
+        _make_record(path="/data/b.wav"),
+        _make_record(path="/data/b.wav", category="WIND"),
+    ]
+
+    file_ids = await upsert_files_many(recs)
+
+    assert file_ids[0] == existing_id
+    assert file_ids[1] == file_ids[2] != existing_id
+    assert await count_files() == 2
+    assert (await get_file(existing_id))["category"] == "RAIN"
+    assert (await get_file(file_ids[1]))["category"] == "WIND"
+    assert await upsert_files_many([]) == []
+
+
+@pytest.mark.asyncio
+async def test_upsert_files_many_is_atomic_under_concurrent_commits(db, monkeypatch):
+    """A concurrent commit must not land the rows of a failing upsert."""
+    import asyncio
+
+    existing = await insert_file(_make_record(path="/data/existing.wav"))
+    conn = get_db()
+    real_fetchall = conn.execute_fetchall
+
+    async def fail_read_back(sql, params=None):
+        if sql.startswith("SELECT path, id"):
+            await asyncio.sleep(0)  # let the concurrent write run first
+            raise sqlite3.OperationalError("disk I/O error")
+        return await real_fetchall(sql, params)
+
+    monkeypatch.setattr(conn, "execute_fetchall", fail_read_back)
+    batch, single = await asyncio.gather(
+        upsert_files_many([_make_record(path=f"/data/{i}.wav") for i in range(3)]),
+        update_file_returning(existing, {"fx_name": "y"}),
+        return_exceptions=True,
+    )
+
+    assert isinstance(batch, sqlite3.OperationalError)
+    assert single["fx_name"] == "y"
+    assert await count_files() == 1
+
+
+@pytest.mark.asyncio
+async def test_insert_files_many_duplicate_path_rolls_back(db):
+    recs = [_make_record(path="/data/a.wav"), _make_record(path="/data/a.wav")]
+    with pytest.raises(sqlite3.IntegrityError):
+        await insert_files_many(recs)
+    assert await count_files() == 0
+
+
 @pytest.mark.asyncio
 async def test_get_file_not_found(db):
     row = await get_file("nonexistent")
     assert row is None
 
 
+@pytest.mark.asyncio
+async def test_get_files_by_ids_keeps_request_order(db):
+    a = await insert_file(_make_record(path="/data/a.wav", filename="a.wav"))
+    b = await insert_file(_make_record(path="/data/b.wav", filename="b.wav"))
+
+    rows = await get_files_by_ids([b, "missing", a])
+
+    assert [r["id"] for r in rows] == [b, a]
+    assert rows[0] == await get_file(b)
+
+
+@pytest.mark.asyncio
+async def test_get_files_by_paths(db):
+    await insert_file(_make_record(path="/data/a.wav", filename="a.wav"))
+
+    rows = await get_files_by_paths(["/data/a.wav", "/data/missing.wav"])
+
+    assert list(rows) == ["/data/a.wav"]
+    assert rows["/data/a.wav"] == await get_file_by_path("/data/a.wav")
+
+
+@pytest.mark.asyncio
+async def test_get_paths_under_matches_prefix_literally(db):
+    for path in ["/lib/a.wav", "/lib/sub/b.wav", "/lib2/c.wav", "/lab/d.wav"]:
+        await insert_file(_make_record(path=path))
+    await insert_file(_make_record(path="/l_b/e.wav"))
+
+    assert sorted(await get_paths_under("/lib/")) == ["/lib/a.wav", "/lib/sub/b.wav"]
+    assert await get_paths_under("/l_b/") == ["/l_b/e.wav"]
+
+
+@pytest.mark.asyncio
+async def test_file_queries_load_only_requested_columns(db):
+    fid = await insert_file(_make_record(path="/data/a.wav", filename="a.wav"))
+
+    by_id = await get_files_by_ids([fid], columns=("filename",))
+    listed = await get_all_files(columns=("id", "filename"))
+
+    assert by_id == [{"id": fid, "filename": "a.wav"}]
+    assert listed == by_id
+    with pytest.raises(ValueError):
+        await get_all_files(columns=("filename; DROP TABLE files",))
+
+
 # ---------------------------------------------------------------------------
 # Get by path
 # ---------------------------------------------------------------------------
@@ -142,6 +344,115 @@ async def test_upsert_updates_existing(db):
     assert row["file_hash"] == "new_hash"
 
 
+@pytest.mark.asyncio
+async def test_upsert_keeps_id_imported_at_and_analysis(db):
+    file_id = await upsert_file(_make_record(path="/data/keep.wav"))
+    analysis = {"classification": [], "caption": None}
+    await update_file(file_id, {"analysis": analysis})
+    before = await get_file(file_id)
+
+    file_id2 = await upsert_file(_make_record(path="/data/keep.wav", fx_name="New"))
+
+    assert file_id2 == file_id
+    row = await get_file(file_id)
+    assert row["fx_name"] == "New"
+    assert row["imported_at"] == before["imported_at"]
+    assert row["analysis"] == analysis
+
+
+@pytest.mark.asyncio
+async def test_update_file_returning_matches_get_file(db):
+    file_id = await insert_file(_make_record())
+    analysis = {"classification": [], "caption": "rain"}
+
+    row = await update_file_returning(
+        file_id, {"analysis": analysis, "status": "flagged"}
+    )
+
+    assert row == await get_file(file_id)
+    assert row["analysis"] == analysis
+    assert row["status"] == "flagged"
+    assert await update_file_returning("missing", {"status": "flagged"}) is None
+
+
+@pytest.mark.asyncio
+async def test_update_file_returning_concurrent_commits(db):
+    """Another request committing mid-statement must not break RETURNING."""
+    import asyncio
+
+    a = await insert_file(_make_record(path="/data/a.wav"))
+    b = await insert_file(_make_record(path="/data/b.wav"))
+
+    _, row = await asyncio.gather(
+        update_file(b, {"status": "saved"}),
+        update_file_returning(a, {"status": "saved"}),
+    )
+
+    assert row["id"] == a
+    assert {r["status"] for r in await get_all_files()} == {"saved"}
+
+
+@pytest.mark.asyncio
+async def test_update_files_returning_many(db):
+    a = await insert_file(_make_record(path="/data/a.wav"))
+    b = await insert_file(_make_record(path="/data/b.wav"))
+
+    rows = await update_files_returning(
+        [
+            (b, {"fx_name": "Two", "changed_fields": ["fx_name"]}),
+            ("missing", {"fx_name": "None"}),
+            (a, {"fx_name": "One"}),
+        ]
+    )
+
+    assert [r["id"] for r in rows] == [b, a]
+    assert rows[0] == await get_file(b)
+    assert rows[0]["changed_fields"] == ["fx_name"]
+    assert rows[1]["fx_name"] == "One"
+
+
+@pytest.mark.asyncio
+async def test_update_files_returning_rejects_bad_column(db):
+    a = await insert_file(_make_record())
+
+    with pytest.raises(ValueError):
+        await update_files_returning([(a, {"fx_name": "x"}), (a, {"bogus": 1})])
+
+    assert (await get_file(a))["fx_name"] != "x"
+
+
+@pytest.mark.asyncio
+async def test_update_files_returning_is_atomic_under_concurrent_commits(
+    db, monkeypatch
+):
+    """A concurrent commit must not land the first half of a failing batch."""
+    import asyncio
+
+    from app.db import repository
+
+    a = await insert_file(_make_record(path="/data/a.wav"))
+    b = await insert_file(_make_record(path="/data/b.wav"))
+    c = await insert_file(_make_record(path="/data/c.wav"))
+    real_execute = repository._execute_returning
+
+    async def fail_on_b(conn, sql, params):
+        if params[-1] == b:
+            await asyncio.sleep(0)  # let the concurrent write run first
+            raise sqlite3.OperationalError("disk I/O error")
+        return await real_execute(conn, sql, params)
+
+    monkeypatch.setattr(repository, "_execute_returning", fail_on_b)
+    batch, single = await asyncio.gather(
+        update_files_returning([(a, {"fx_name": "x"}), (b, {"fx_name": "x"})]),
+        update_file_returning(c, {"fx_name": "y"}),
+        return_exceptions=True,
+    )
+
+    assert isinstance(batch, sqlite3.OperationalError)
+    assert single["fx_name"] == "y"
+    assert (await get_file(a))["fx_name"] != "x"
+
+
 # ---------------------------------------------------------------------------
 # Delete by paths
 # ---------------------------------------------------------------------------
@@ -161,6 +472,55 @@ async def test_delete_files_by_paths(db):
     assert row is not None
 
 
+@pytest.mark.asyncio
+async def test_delete_files_by_paths_many(db):
+    """More paths than SQLite's bound-parameter limit are deleted in chunks."""
+    paths = [f"/bulk/{i}.wav" for i in range(1200)]
+    for p in paths:
+        await insert_file(_make_record(path=p))
+    await insert_file(_make_record(path="/keep.wav"))
+
+    await delete_files_by_paths(paths)
+    assert await count_files() == 1
+    assert await get_file_by_path("/keep.wav") is not None
+
+
+@pytest.mark.asyncio
+async def test_delete_files_by_paths_is_atomic_under_concurrent_commits(
+    db, monkeypatch
+):
+    """A concurrent commit must not land the first chunk of a failing delete."""
+    import asyncio
+
+    paths = [f"/bulk/{i}.wav" for i in range(600)]
+    await insert_files_many([_make_record(path=p) for p in paths])
+    keep = await insert_file(_make_record(path="/keep.wav"))
+    conn = get_db()
+    real_execute = conn.execute
+    deletes = 0
+
+    async def fail_second_chunk(sql, params=None):
+        nonlocal deletes
+        if sql.startswith("DELETE FROM files"):
+            deletes += 1
+            if deletes == 2:
+                await asyncio.sleep(0)  # let the concurrent write run first
+                raise sqlite3.OperationalError("disk I/O error")
+        return await real_execute(sql, params)
+
+    monkeypatch.setattr(conn, "execute", fail_second_chunk)
+    delete, single = await asyncio.gather(
+        delete_files_by_paths(paths),
+        update_file_returning(keep, {"fx_name": "y"}),
+        return_exceptions=True,
+    )
+
+    assert isinstance(delete, sqlite3.OperationalError)
+    assert single["fx_name"] == "y"
+    assert (await get_file(keep))["fx_name"] == "y"  # not rolled back with it
+    assert await count_files() == 601
+
+
 # ---------------------------------------------------------------------------
 # Filtered queries
 # ---------------------------------------------------------------------------
@@ -192,6 +552,18 @@ async def test_get_all_files_filter_category(db):
     assert rows[0]["category"] == "DOORS"
 
 
+@pytest.mark.asyncio
+async def test_status_category_filter_uses_index(db):
+    cursor = await get_db().execute(
+        "EXPLAIN QUERY PLAN SELECT * FROM files "
+        "WHERE status = ? AND category = ? ORDER BY path",
+        ("modified", "DOORS"),
+    )
+    plan = " ".join(row[3] for row in await cursor.fetchall())
+    assert "idx_files_status_category_path" in plan
+    assert "TEMP B-TREE" not in plan
+
+
 @pytest.mark.asyncio
 async def test_get_all_files_search(db):
     await insert_file(
@@ -210,6 +582,38 @@ async def test_get_all_files_search(db):
     assert rows[0]["filename"] == "rain_forest.wav"
 
 
+@pytest.mark.asyncio
+async def test_get_all_files_search_prefix_and_filters(db):
+    await insert_file(
+        _make_record(
+            path="/a.wav",
+            filename="a.wav",
+            description="Heavy rainfall",
+            status="modified",
+        )
+    )
+    await insert_file(_make_record(path="/b.wav", filename="b.wav", keywords="rainy"))
+    rows = await get_all_files(search="rain")
+    assert [r["path"] for r in rows] == ["/a.wav", "/b.wav"]
+
+    rows = await get_all_files(search="rain", status="modified")
+    assert [r["path"] for r in rows] == ["/a.wav"]
+
+    # Quotes and FTS operators are treated as plain text
+    assert await get_all_files(search='"rain OR') == []
+
+
+@pytest.mark.asyncio
+async def test_get_all_files_search_tracks_updates_and_deletes(db):
+    file_id = await insert_file(_make_record(path="/a.wav", fx_name="Door Slam"))
+    await update_file(file_id, {"fx_name": "Thunder Crack"})
+    assert await get_all_files(search="door") == []
+    assert len(await get_all_files(search="thunder")) == 1
+
+    await delete_files_by_paths(["/a.wav"])
+    assert await get_all_files(search="thunder") == []
+
+
 @pytest.mark.asyncio
 async def test_get_all_files_pagination(db):
     for i in range(5):
@@ -268,6 +672,27 @@ async def test_store_and_get_cached_analysis(db):
     assert result["model_version"] == "2023"
 
 
+@pytest.mark.asyncio
+async def test_get_cached_analyses_many(db):
+    await store_cached_analysis("h1", "[]", None, "2023")
+    await store_cached_analysis("h2", "[]", "a caption", "2023")
+
+    result = await get_cached_analyses(["h1", "h2", "missing", "h1"])
+
+    assert set(result) == {"h1", "h2"}
+    assert result["h2"]["caption"] == "a caption"
+
+
+@pytest.mark.asyncio
+async def test_get_cached_analyses_filters_model_version(db):
+    await store_cached_analysis("h1", "[]", None, "2023:old")
+    await store_cached_analysis("h2", "[]", None, "2023:new")
+
+    result = await get_cached_analyses(["h1", "h2"], model_version="2023:new")
+
+    assert set(result) == {"h2"}
+
+
 @pytest.mark.asyncio
 async def test_get_cached_analysis_miss(db):
     result = await get_cached_analysis("nonexistent_hash")
@@ -283,6 +708,20 @@ async def test_store_cached_analysis_overwrite(db):
     assert result["caption"] == "a caption"
 
 
+@pytest.mark.asyncio
+async def test_write_transaction_rolls_back_as_a_unit(db):
+    file_id = await insert_file(_make_record())
+    with pytest.raises(RuntimeError):
+        async with write_transaction():
+            await store_cached_analysis("h1", "[]", None, "2023")
+            await update_file(file_id, {"status": "modified"})
+            raise RuntimeError("boom")
+
+    assert not get_db().in_transaction
+    assert await get_cached_analysis("h1") is None
+    assert (await get_file(file_id))["status"] == "unmodified"
+
+
 @pytest.mark.asyncio
 async def test_clear_analysis_cache(db):
     await store_cached_analysis("h1", "[]", None, "2023")
@@ -312,3 +751,59 @@ async def test_analysis_column_roundtrip(db):
     row = await get_file(file_id)
     assert row["analysis"] is not None
     assert row["analysis"]["classification"][0]["cat_id"] == "WATRSurf"
+
+
+# ---------------------------------------------------------------------------
+# Mapper — trusted rows skip validation but keep nested models
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.asyncio
+async def test_dict_to_file_record_matches_validated(db):
+    rec = _make_record(
+        path="/mapped.wav",
+        bext={"description": "Desc", "originator": "JD", "time_reference": 0},
+        info={"title": "My Sound"},
+    )
+    file_id = await insert_file(rec)
+    analysis_data = {
+        "classification": [
+            {
+                "cat_id": "WATRSurf",
+                "category": "WATER",
+                "subcategory": "SURF",
+                "category_full": "WATER-SURF",
+                "confidence": 0.87,
+            }
+        ],
+        "caption": "Waves.",
+        "model_version": "2023",
+        "analyzed_at": "2026-02-14T00:00:00Z",
+    }
+    await update_file(file_id, {"analysis": analysis_data})
+    row = await get_file(file_id)
+
+    record = dict_to_file_record(row)
+    assert record.technical.sample_rate == 44100
+    assert record.bext.originator == "JD"
+    assert record.analysis.classification[0].cat_id == "WATRSurf"
+    assert record.changed_fields == []
+    validated = FileRecord.model_validate({**row, "changed_fields": []})
+    assert record.model_dump() == validated.model_dump()
+
+
+# ---------------------------------------------------------------------------
+# Timestamps
+# ---------------------------------------------------------------------------
+
+
+@pytest.mark.parametrize("ns", [1_700_000_000_123_456_000, 1_700_000_000_000_000_000])
+def test_now_iso_matches_isoformat(monkeypatch, ns):
+    from datetime import datetime, timezone
+
+    from app.db import repository
+
+    monkeypatch.setattr(repository.time, "time_ns", lambda: ns)
+    expected = datetime.fromtimestamp(ns / 1e9, timezone.utc).isoformat()
+    assert repository._now_iso() == expected
+    assert repository._now_iso() == expected  # cached second
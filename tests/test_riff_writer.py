@@ -3,6 +3,8 @@
 Uses synthetic WAV fixtures — no external file dependencies.
 """
 
+import os
+
 from wavinfo import WavInfoReader
 
 from app.metadata.writer import write_metadata
@@ -14,6 +16,7 @@ from conftest import (
     MINIMAL_IXML,
     TEST_METADATA,
     build_bext_data,
+    build_info_chunk,
     build_wav,
     count_chunks,
     get_aswg_field,
@@ -269,6 +272,33 @@ def test_verify_write_detects_mismatch(tmp_path):
     assert result["ok"] is False
 
 
+def test_verify_write_accepts_non_ascii_bext_and_info(tmp_path):
+    """Non-ASCII text stored as '?' in BEXT/INFO still verifies."""
+    from app.metadata.writer import verify_write
+
+    meta = {"description": "Café rain", "fx_name": "Café", "designer": "Zoë"}
+    p = write_wav(tmp_path)
+    write_metadata(str(p), meta)
+    result = verify_write(str(p), meta)
+    assert result["ok"] is True, f"Errors: {result['errors']}"
+
+
+def test_verify_write_skips_untouched_sections(tmp_path, monkeypatch):
+    """Only the sections holding the written keys are checked."""
+    from app.metadata import writer
+
+    p = write_wav(tmp_path)
+    write_metadata(str(p), TEST_METADATA)
+
+    def _fail(*args):
+        raise AssertionError("section checked")
+
+    monkeypatch.setattr(writer, "_verify_bext", _fail)
+    monkeypatch.setattr(writer, "_verify_info", _fail)
+    result = writer.verify_write(str(p), {"cat_id": TEST_METADATA["cat_id"]})
+    assert result["ok"] is True, f"Errors: {result['errors']}"
+
+
 # ---------------------------------------------------------------------------
 # 1B.7 — Edge case tests (spec S7)
 # ---------------------------------------------------------------------------
@@ -459,6 +489,19 @@ def test_list_info_created_from_metadata(tmp_path):
     assert meta["info"]["artist"] == "JDOE"
 
 
+def test_list_info_keeps_existing_sub_chunks(tmp_path):
+    """Existing INFO values (known and unknown tags) survive a gap-filling write."""
+    info_chunk = build_info_chunk({b"INAM": "Original", b"ICOP": "(c) Someone"})
+    p = tmp_path / "info_keep.wav"
+    p.write_bytes(build_wav(extra_chunks=[info_chunk]))
+
+    write_metadata(str(p), {"fx_name": "Thunder", "designer": "JDOE"})
+    meta = read_metadata(str(p))
+    assert meta["info"]["title"] == "Original"
+    assert meta["info"]["artist"] == "JDOE"
+    assert meta["info"]["copyright"] == "(c) Someone"
+
+
 # ---------------------------------------------------------------------------
 # verify_write — ASWG field verification
 # ---------------------------------------------------------------------------
@@ -552,3 +595,210 @@ def test_list_adtl_preserved(tmp_path):
     # Should have at least one LIST chunk (adtl preserved + maybe INFO created)
     assert raw.count(b"LIST") >= 1
     assert b"adtl" in raw
+
+
+def test_ixml_comments_preserved_on_update(tmp_path):
+    """Comments in existing iXML survive a metadata update."""
+    xml = (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        "<BWFXML><!-- recorder note --><USER><CATEGORY>OLD</CATEGORY></USER></BWFXML>"
+    )
+    p = write_wav(tmp_path, ixml_xml=xml, filename="comment.wav")
+    write_metadata(str(p), TEST_METADATA)
+
+    info = WavInfoReader(str(p))
+    assert b"<!-- recorder note -->" in info.ixml.source
+    root = parse_ixml_source(info)
+    assert get_user_field(root, "CATEGORY") == "WEATHER"
+
+
+def test_bext_pack_unpack_roundtrip():
+    """Packing unpacked BEXT bytes reproduces them exactly."""
+    from app.metadata.writer import BEXT_FIXED_SIZE, _pack_bext, _unpack_bext
+
+    raw = os.urandom(BEXT_FIXED_SIZE) + b"A=PCM,F=48000\r\n"
+    assert _pack_bext(_unpack_bext(raw)) == raw
+
+
+def test_bext_pack_truncates_and_pads_text_fields():
+    """Text fields are ASCII-encoded, cut to width, and null-padded."""
+    from app.metadata.writer import _pack_bext, _unpack_bext
+
+    fields = _unpack_bext(b"")
+    fields["description"] = "x" * 300
+    fields["originator"] = "Café"
+    fields["origination_date"] = bytearray(b"2024-01-01")
+    fields["coding_history"] = "A=PCM"
+    fields = _unpack_bext(_pack_bext(fields))
+
+    assert fields["description"] == b"x" * 256
+    assert fields["originator"] == b"Caf?".ljust(32, b"\x00")
+    assert fields["origination_date"] == b"2024-01-01"
+    assert fields["coding_history"] == b"A=PCM"
+
+
+def test_large_data_chunk_copied_with_and_without_sendfile(tmp_path, monkeypatch):
+    """Audio past the sendfile threshold is copied identically by both paths."""
+    wav = build_wav(num_samples=200_000, bext_data=build_bext_data())
+    sendfile_path = tmp_path / "sendfile.wav"
+    fallback_path = tmp_path / "fallback.wav"
+    sendfile_path.write_bytes(wav)
+    fallback_path.write_bytes(wav)
+
+    write_metadata(str(sendfile_path), TEST_METADATA)
+    monkeypatch.delattr(os, "sendfile", raising=False)
+    write_metadata(str(fallback_path), TEST_METADATA)
+
+    written = sendfile_path.read_bytes()
+    assert written == fallback_path.read_bytes()
+    assert WavInfoReader(str(sendfile_path)).data.frame_count == 200_000
+
+
+# ---------------------------------------------------------------------------
+# In-place writes
+# ---------------------------------------------------------------------------
+
+
+def test_write_in_place_when_chunks_fit(tmp_path):
+    """A second write whose chunks still fit patches the file in place."""
+    from app.metadata.writer import verify_write
+
+    p = write_wav(tmp_path, num_samples=1000, filename="inplace.wav")
+    write_metadata(str(p), TEST_METADATA)  # creates the chunks (full rewrite)
+    before = os.stat(p)
+    data_before = WavInfoReader(str(p)).data
+
+    shorter = {**TEST_METADATA, "subcategory": "RAIN"}
+    write_metadata(str(p), shorter)
+
+    after = os.stat(p)
+    assert after.st_ino == before.st_ino
+    assert after.st_size == before.st_size
+    assert read_metadata(str(p))["subcategory"] == "RAIN"
+    assert verify_write(str(p), shorter)["ok"]
+    assert WavInfoReader(str(p)).data.frame_count == data_before.frame_count
+
+
+def test_write_in_place_absorbs_following_junk(tmp_path):
+    """Growing iXML consumes a JUNK chunk that directly follows it."""
+    p = write_wav(
+        tmp_path,
+        filename="junk.wav",
+        bext_data=build_bext_data(),
+        ixml_xml=MINIMAL_IXML,
+        extra_chunks=[(b"JUNK", bytes(4096)), build_info_chunk({b"IGNR": "X"})],
+    )
+    before = os.stat(p)
+
+    write_metadata(str(p), {"category": "WEATHER", "description": "Thunder"})
+
+    after = os.stat(p)
+    assert after.st_ino == before.st_ino
+    assert after.st_size == before.st_size
+    output = p.read_bytes()
+    assert count_chunks(output, b"JUNK") == 1
+    assert count_chunks(output, b"iXML") == 1
+    result = read_metadata(str(p))
+    assert result["category"] == "WEATHER"
+    assert result["bext"]["description"] == "Thunder"
+
+
+def test_write_in_place_patches_all_chunks_in_one_write(tmp_path, monkeypatch):
+    """A failure after the first write call cannot leave chunks half-updated."""
+    import builtins
+
+    from app.metadata import writer
+
+    p = write_wav(
+        tmp_path,
+        filename="onewrite.wav",
+        bext_data=build_bext_data(),
+        ixml_xml=MINIMAL_IXML,
+        extra_chunks=[(b"JUNK", bytes(4096)), build_info_chunk({b"IGNR": "X"})],
+    )
+    before = os.stat(p)
+
+    class FailSecondWrite:
+        def __init__(self, f):
+            self._f = f
+            self.writes = 0
+
+        def write(self, data):
+            self.writes += 1
+            if self.writes == 2:
+                raise OSError("injected failure between patches")
+            return self._f.write(data)
+
+        def __getattr__(self, name):
+            return getattr(self._f, name)
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return self._f.__exit__(*exc)
+
+    monkeypatch.setattr(
+        writer,
+        "open",
+        lambda *args, **kwargs: FailSecondWrite(builtins.open(*args, **kwargs)),
+        raising=False,
+    )
+    write_metadata(str(p), {"category": "WEATHER", "description": "Thunder"})
+
+    assert os.stat(p).st_ino == before.st_ino
+    result = read_metadata(str(p))
+    assert result["category"] == "WEATHER"
+    assert result["bext"]["description"] == "Thunder"
+
+
+def test_write_rewrites_when_chunks_are_far_apart(tmp_path, monkeypatch):
+    """Patches spanning more than the in-place limit fall back to a rewrite."""
+    from app.metadata import writer
+
+    monkeypatch.setattr(writer, "_IN_PLACE_SPAN_LIMIT", 64)
+    p = write_wav(
+        tmp_path,
+        filename="apart.wav",
+        bext_data=build_bext_data(),
+        ixml_xml=MINIMAL_IXML,
+        extra_chunks=[(b"JUNK", bytes(4096)), build_info_chunk({b"IGNR": "X"})],
+    )
+    before = os.stat(p)
+
+    write_metadata(str(p), {"category": "WEATHER", "description": "Thunder"})
+
+    assert os.stat(p).st_ino != before.st_ino
+    result = read_metadata(str(p))
+    assert result["category"] == "WEATHER"
+    assert result["bext"]["description"] == "Thunder"
+
+
+def test_bext_copied_through_when_not_written(tmp_path, monkeypatch):
+    """An existing BEXT chunk is left untouched when no BEXT field changes."""
+    from app.metadata import writer
+
+    bext = build_bext_data(description="keep me") + b"A=PCM\r\n"
+    p = write_wav(tmp_path, filename="keep_bext.wav", bext_data=bext)
+
+    def _fail(data):
+        raise AssertionError("BEXT unpacked")
+
+    monkeypatch.setattr(writer, "_unpack_bext", _fail)
+    write_metadata(str(p), {"category": "DOORS"})
+
+    assert bext in p.read_bytes()
+    assert read_metadata(str(p))["category"] == "DOORS"
+
+
+def test_new_bext_stamps_origination_date_and_time(tmp_path):
+    """A BEXT chunk created from scratch carries today's date and a HH:MM:SS time."""
+    import re
+    from datetime import date
+
+    p = write_wav(tmp_path, filename="stamp.wav")
+    write_metadata(str(p), {"description": "Stamped"})
+
+    bext = read_metadata(str(p))["bext"]
+    assert bext["originator_date"] == date.today().isoformat()
+    assert re.fullmatch(r"\d\d:\d\d:\d\d", bext["originator_time"])
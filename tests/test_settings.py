@@ -34,6 +34,7 @@ class TestSettingsService:
         assert s.rename_on_save_default is True
         assert s.custom_fields == []
         assert s.llm_api_key is None
+        assert s.clap_int8 is True
         assert s.version == 1
 
     def test_save_reload(self, tmp_path):
@@ -143,7 +144,8 @@ async def test_put_settings_invalid_tag(client):
 
 @pytest.mark.asyncio
 async def test_api_key_masking(client):
-    await client.put("/settings", json={"llm_api_key": "sk-secret-key"})
+    put = await client.put("/settings", json={"llm_api_key": "sk-secret-key"})
+    assert put.json()["llm_api_key"] == "configured"
     resp = await client.get("/settings")
     data = resp.json()
     assert data["llm_api_key"] == "configured"
@@ -160,6 +160,13 @@ def test_enrich_regenerates_filename_with_fx_name():
     assert enriched.fx_name.value in enriched.suggested_filename.value
 
 
+def test_extract_fx_name_skips_articles_and_caps_length():
+    from app.ml.suggestions import _extract_fx_name
+
+    caption = "The sound of a dog barking loudly at 3 cars and the mail truck outside."
+    assert _extract_fx_name(caption) == "Sound Dog Barking Loudly Cars Mail"
+
+
 # ---------------------------------------------------------------------------
 # hydrate_suggestions
 # ---------------------------------------------------------------------------
@@ -216,3 +223,32 @@ def test_hydrate_suggestions_no_analysis_returns_unchanged():
     record = _make_file_record(analysis=None)
     result = hydrate_suggestions(record)
     assert result.suggestions is None
+
+
+def test_hydrate_suggestions_batch_matches_single():
+    from app.ml.suggestions import hydrate_suggestions, hydrate_suggestions_batch
+    from types import SimpleNamespace
+
+    captioned = AnalysisResult(
+        classification=_make_matches(),
+        caption="Ocean waves crashing on a sandy beach.",
+        model_version="2023",
+        analyzed_at="2025-01-01T00:00:00Z",
+    )
+    plain = captioned.model_copy(update={"caption": None})
+    records = [
+        _make_file_record(analysis=captioned),
+        _make_file_record(analysis=None),
+        _make_file_record(analysis=plain),
+    ]
+
+    with patch(
+        "app.ml.suggestions.get_settings",
+        return_value=SimpleNamespace(creator_id="JD", source_id="SRC"),
+    ):
+        batch = hydrate_suggestions_batch(records)
+        single = [hydrate_suggestions(r) for r in records]
+
+    assert batch == single
+    assert batch[1].suggestions is None
+    assert batch[2].suggestions.fx_name is None
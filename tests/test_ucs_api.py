@@ -45,6 +45,25 @@ async def test_get_categories_has_explanations(client):
     assert len(air["explanation"]) > 0
 
 
+@pytest.mark.asyncio
+async def test_get_categories_body_built_once(client):
+    from unittest.mock import patch
+
+    from app.routers import ucs
+
+    ucs._categories_body.cache_clear()
+    with patch(
+        "app.routers.ucs._build_categories_body",
+        wraps=ucs._build_categories_body,
+    ) as build:
+        first = await client.get("/ucs/categories")
+        second = await client.get("/ucs/categories")
+
+    assert first.headers["content-type"] == "application/json"
+    assert first.content == second.content
+    assert build.call_count == 1
+
+
 @pytest.mark.asyncio
 async def test_lookup_valid(client):
     resp = await client.get("/ucs/lookup/DOORWood")
@@ -85,6 +85,19 @@ class TestFuzzyMatch:
         scores = [m.score for m in matches]
         assert scores == sorted(scores, reverse=True)
 
+    def test_name_prefix_matches_both_directions(self):
+        from app.ucs.filename import _match_cat_sub_names
+
+        scores: dict[str, list[str]] = {}
+        _match_cat_sub_names("doors", scores)  # token extends "door"
+        assert "DOORWood" in scores
+        scores.clear()
+        _match_cat_sub_names("woo", scores)  # token prefixes "wood"
+        assert "DOORWood" in scores
+        scores.clear()
+        _match_cat_sub_names("do", scores)  # too short
+        assert scores == {}
+
 
 # ---------------------------------------------------------------------------
 # Filename parser
@@ -467,6 +467,44 @@ async def test_batch_save_with_rename(tmp_path, client):
     assert len(renamed) == 2
 
 
+@pytest.mark.asyncio
+async def test_batch_save_same_rename_target_conflicts(tmp_path, client):
+    """Two files renamed to one name: one is renamed, the other gets 409."""
+    recs = await _seed_multiple(client, tmp_path, 2)
+    for rec in recs:
+        await client.put(
+            f"/files/{rec['id']}/metadata",
+            json={"suggested_filename": "same.wav"},
+        )
+    ids = [r["id"] for r in recs]
+    resp = await client.post(
+        "/files/save-batch", json={"file_ids": ids, "rename": True}
+    )
+    data = resp.json()
+    assert [r["id"] for r in data["results"]] == ids
+    assert data["saved_count"] == 1
+    assert data["failed_count"] == 1
+    assert os.path.exists(recs[0]["path"]) != os.path.exists(recs[1]["path"])
+
+
+@pytest.mark.asyncio
+async def test_batch_save_repeated_id_saves_in_turn(tmp_path, client):
+    """A repeated id is saved twice in sequence; the second rename is a no-op."""
+    rec = await _seed_file(client, tmp_path)
+    await client.put(
+        f"/files/{rec['id']}/metadata",
+        json={"suggested_filename": "renamed.wav"},
+    )
+    ids = [rec["id"], rec["id"]]
+    resp = await client.post(
+        "/files/save-batch", json={"file_ids": ids, "rename": True}
+    )
+    data = resp.json()
+    assert [r["id"] for r in data["results"]] == ids
+    assert data["saved_count"] == 2
+    assert os.path.exists(tmp_path / "renamed.wav")
+
+
 # ---------------------------------------------------------------------------
 # 2B.5 — POST /files/{id}/revert
 # ---------------------------------------------------------------------------